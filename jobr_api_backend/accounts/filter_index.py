@@ -0,0 +1,308 @@
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date
+from threading import Lock
+from typing import Dict, Hashable, Iterable, List, Optional
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+from .models import CustomUser, Employee, EmployeeLanguage, ProfileOption
+
+EMPLOYEE_FILTER_VERSION_KEY = 'accounts:employee_filter:version'
+EMPLOYEE_FILTER_CHANGE_KEY = 'accounts:employee_filter:changes:{}'
+# Indexes further behind than this rebuild instead of replaying the changes
+EMPLOYEE_FILTER_CHANGE_TIMEOUT = 24 * 60 * 60
+MAX_EMPLOYEE_FILTER_CHANGES = 1000
+
+
+def _bitmap(positions: Iterable[int], size: int) -> int:
+    """Return an int with the bits at the given positions set."""
+    bits = np.zeros(size, dtype=bool)
+    bits[np.fromiter(positions, dtype=np.int64)] = True
+    return int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+
+
+class EmployeeFilterIndex:
+    """
+    In-memory bitmap index of the employee users, for EmployeeFilterView.
+
+    Every employee user has a bit position, in user id order. Skills,
+    languages, genders and contract types map to int bitmaps of the users
+    that have them, so a combination of filters is a handful of AND and OR
+    operations on ints. Birth dates are kept sorted with their positions
+    for age ranges. Only the ids of the resulting bitmap are returned, so
+    callers load nothing but the page they show.
+
+    Users that stop being employees keep their position, without bits.
+    The index carries the number of the last change it holds; see
+    ``get_employee_filter_index``.
+    """
+
+    def __init__(self, version: int = None):
+        self.version = version
+        self.user_ids = []
+        # Users that are currently employees
+        self.members = 0
+        # Employee id -> bit position
+        self.positions = {}
+        self.by_skill = {}
+        self.by_language = {}
+        self.by_gender = {}
+        self.by_contract_type = {}
+        # Sorted birth dates and the positions of the users born on them
+        self.birth_dates = []
+        self.birth_positions = np.zeros(0, dtype=np.int64)
+
+    @property
+    def size(self) -> int:
+        return len(self.user_ids)
+
+    @staticmethod
+    def employee_rows(users):
+        return users.filter(role=ProfileOption.EMPLOYEE).order_by('id').values_list(
+            'id', 'employee_profile__id', 'employee_profile__gender',
+            'employee_profile__contract_type_id', 'employee_profile__date_of_birth'
+        )
+
+    def add_rows(self, rows, skill_rows, language_rows) -> None:
+        """Set the bits of the given employee users, which must already have a position."""
+        members = []
+        genders = defaultdict(list)
+        contract_types = defaultdict(list)
+        births = []
+        for user_id, employee_id, gender, contract_type_id, date_of_birth in rows:
+            position = self.position(user_id)
+            members.append(position)
+            if employee_id is None:
+                continue
+            self.positions[employee_id] = position
+            if gender:
+                genders[gender].append(position)
+            if contract_type_id is not None:
+                contract_types[contract_type_id].append(position)
+            if date_of_birth is not None:
+                births.append((date_of_birth, position))
+
+        skills = defaultdict(list)
+        for employee_id, skill_id in skill_rows:
+            if employee_id in self.positions:
+                skills[skill_id].append(self.positions[employee_id])
+        languages = defaultdict(list)
+        for employee_id, language_id in language_rows:
+            if employee_id in self.positions:
+                languages[language_id].append(self.positions[employee_id])
+
+        self.members |= _bitmap(members, self.size)
+        for bitmaps, grouped in [
+            (self.by_skill, skills),
+            (self.by_language, languages),
+            (self.by_gender, genders),
+            (self.by_contract_type, contract_types),
+        ]:
+            for key, positions in grouped.items():
+                bitmaps[key] = bitmaps.get(key, 0) | _bitmap(positions, self.size)
+
+        births.sort()
+        if not self.birth_dates:
+            self.birth_dates = [date_of_birth for date_of_birth, _ in births]
+            self.birth_positions = np.array([position for _, position in births], dtype=np.int64)
+            return
+        for date_of_birth, position in births:
+            at = bisect_right(self.birth_dates, date_of_birth)
+            self.birth_dates.insert(at, date_of_birth)
+            self.birth_positions = np.insert(self.birth_positions, at, position)
+
+    @classmethod
+    def build(cls, version: int = None) -> 'EmployeeFilterIndex':
+        index = cls(version)
+        rows = list(cls.employee_rows(CustomUser.objects.all()))
+        index.user_ids = [row[0] for row in rows]
+        index.add_rows(
+            rows,
+            Employee.skill.through.objects.values_list('employee_id', 'skill_id'),
+            EmployeeLanguage.objects.values_list('employee_id', 'language_id'),
+        )
+        return index
+
+    def patched(self, user_ids: Iterable[int], employee_ids: Iterable[int], version: int) -> Optional['EmployeeFilterIndex']:
+        """
+        Return a copy of the index with the given users and employees read
+        again, or None when a new employee user comes before the last user
+        of the index, which would shift the positions.
+        """
+        user_ids = set(user_ids)
+        unknown = set()
+        for employee_id in employee_ids:
+            if employee_id in self.positions:
+                user_ids.add(self.user_ids[self.positions[employee_id]])
+            else:
+                unknown.add(employee_id)
+        if unknown:
+            user_ids.update(Employee.objects.filter(pk__in=unknown).values_list('user_id', flat=True))
+
+        rows = list(self.employee_rows(CustomUser.objects.filter(pk__in=user_ids)))
+        last = self.user_ids[-1] if self.user_ids else 0
+        if any(row[0] <= last and self.position(row[0]) is None for row in rows):
+            return None
+        changed = [position for position in map(self.position, user_ids) if position is not None]
+
+        index = type(self)(version)
+        index.user_ids = self.user_ids + [row[0] for row in rows if row[0] > last]
+        cleared = ~_bitmap(changed, self.size)
+        index.members = self.members & cleared
+        changed_positions = set(changed)
+        index.positions = {
+            employee_id: position for employee_id, position in self.positions.items()
+            if position not in changed_positions
+        }
+        for attribute in ('by_skill', 'by_language', 'by_gender', 'by_contract_type'):
+            bitmaps = getattr(index, attribute)
+            for key, bitmap in getattr(self, attribute).items():
+                if bitmap & cleared:
+                    bitmaps[key] = bitmap & cleared
+        kept = ~np.isin(self.birth_positions, changed)
+        index.birth_dates = [date_of_birth for date_of_birth, keep in zip(self.birth_dates, kept) if keep]
+        index.birth_positions = self.birth_positions[kept]
+
+        employee_ids = [row[1] for row in rows if row[1] is not None]
+        index.add_rows(
+            rows,
+            Employee.skill.through.objects.filter(employee_id__in=employee_ids).values_list('employee_id', 'skill_id'),
+            EmployeeLanguage.objects.filter(employee_id__in=employee_ids).values_list('employee_id', 'language_id'),
+        )
+        return index
+
+    def position(self, user_id: int) -> Optional[int]:
+        position = bisect_left(self.user_ids, user_id)
+        if position < len(self.user_ids) and self.user_ids[position] == user_id:
+            return position
+        return None
+
+    def everyone(self) -> int:
+        return self.members
+
+    @staticmethod
+    def any_of(bitmaps: Dict[Hashable, int], keys: Iterable[Hashable]) -> int:
+        """Return the users having any of the keys."""
+        result = 0
+        for key in keys:
+            result |= bitmaps.get(key, 0)
+        return result
+
+    @staticmethod
+    def counts(bitmap: int, bitmaps: Dict[Hashable, int]) -> Dict[Hashable, int]:
+        """Return how many users of a bitmap have each key, leaving out keys no one has."""
+        counts = {}
+        for key, users in bitmaps.items():
+            count = (bitmap & users).bit_count()
+            if count:
+                counts[key] = count
+        return counts
+
+    def with_skills(self, skill_ids: Iterable[int]) -> int:
+        return self.any_of(self.by_skill, skill_ids)
+
+    def with_languages(self, language_ids: Iterable[int]) -> int:
+        return self.any_of(self.by_language, language_ids)
+
+    def with_gender(self, gender: str) -> int:
+        return self.by_gender.get(gender, 0)
+
+    def with_contract_type(self, contract_type_id: int) -> int:
+        return self.by_contract_type.get(contract_type_id, 0)
+
+    def born_between(self, earliest: Optional[date] = None, latest: Optional[date] = None) -> int:
+        """Return the users born on or after ``earliest`` and on or before ``latest``."""
+        start = 0 if earliest is None else bisect_left(self.birth_dates, earliest)
+        end = len(self.birth_dates) if latest is None else bisect_right(self.birth_dates, latest)
+        return _bitmap(self.birth_positions[start:end], self.size)
+
+    def employees(self, employee_ids: Iterable[int]) -> int:
+        return _bitmap((self.positions[pk] for pk in employee_ids if pk in self.positions), self.size)
+
+    def ids(self, bitmap: int, after: Optional[int] = None, limit: Optional[int] = None) -> List[int]:
+        """Return the user ids in a bitmap in ascending order, optionally only ``limit`` after a user id."""
+        start = 0 if after is None else bisect_right(self.user_ids, after)
+        bitmap >>= start
+        if not bitmap:
+            return []
+        raw = np.frombuffer(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little'), dtype=np.uint8)
+        positions = np.flatnonzero(np.unpackbits(raw, bitorder='little'))
+        if limit is not None:
+            positions = positions[:limit]
+        return [self.user_ids[start + position] for position in positions.tolist()]
+
+
+_index = None
+_index_lock = Lock()
+
+
+def employee_filter_version() -> int:
+    """Return the number of the latest logged change, shared by every process using the same cache."""
+    version = cache.get(EMPLOYEE_FILTER_VERSION_KEY)
+    if version is None:
+        # Starting from the clock, a cleared cache never reuses a number
+        cache.add(EMPLOYEE_FILTER_VERSION_KEY, time.time_ns() // 1000, timeout=None)
+        version = cache.get(EMPLOYEE_FILTER_VERSION_KEY)
+    return version
+
+
+def _log_employee_filter_change(change: tuple) -> None:
+    employee_filter_version()
+    version = cache.incr(EMPLOYEE_FILTER_VERSION_KEY)
+    cache.set(EMPLOYEE_FILTER_CHANGE_KEY.format(version), change, EMPLOYEE_FILTER_CHANGE_TIMEOUT)
+
+
+def log_employee_filter_changes(kind: str, ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Log that the filter data of the given users or employees (``kind``),
+    or of all of them when ``ids`` is None, changed.
+    """
+    if ids is not None:
+        ids = sorted(ids)
+        if not ids:
+            return
+    change = (kind, ids)
+    # Logged again once committed, so an index caught up by another request
+    # before the commit does not keep the old data
+    _log_employee_filter_change(change)
+    transaction.on_commit(lambda: _log_employee_filter_change(change))
+
+
+def employee_filter_changes(after: int, until: int) -> Optional[List[tuple]]:
+    """
+    Return the (kind, ids) changes logged after number ``after`` up to
+    ``until``, or None when some of them are no longer available.
+    """
+    if not 0 <= until - after <= MAX_EMPLOYEE_FILTER_CHANGES:
+        return None
+    keys = [EMPLOYEE_FILTER_CHANGE_KEY.format(version) for version in range(after + 1, until + 1)]
+    changes = cache.get_many(keys)
+    if len(changes) < len(keys):
+        return None
+    return [changes[key] for key in keys]
+
+
+def _caught_up(index: Optional[EmployeeFilterIndex], version: int) -> EmployeeFilterIndex:
+    changes = None if index is None else employee_filter_changes(index.version, version)
+    if changes is None or any(ids is None for _, ids in changes):
+        return EmployeeFilterIndex.build(version)
+    ids = {'user': set(), 'employee': set()}
+    for kind, changed in changes:
+        ids[kind].update(changed)
+    return index.patched(ids['user'], ids['employee'], version) or EmployeeFilterIndex.build(version)
+
+
+def get_employee_filter_index() -> EmployeeFilterIndex:
+    """
+    Return the process-wide filter index, patching the users changed since
+    it was built or rebuilding it when the changes are not all logged.
+    """
+    global _index
+    version = employee_filter_version()
+    with _index_lock:
+        if _index is None or _index.version != version:
+            _index = _caught_up(_index, version)
+        return _index
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from accounts.filter_index import log_employee_filter_changes
+from accounts.models import Employee
+from common.geo import geocode
+from suggestions.features import refresh_employee_features
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Geocode the city of every employee against the bundled gazetteer'
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        batch = []
+        resolved = unresolved = 0
+        for employee in Employee.objects.only('id', 'city_name', 'latitude', 'longitude').iterator():
+            coordinates = geocode(employee.city_name)
+            if coordinates:
+                resolved += 1
+            elif employee.city_name:
+                unresolved += 1
+            employee.latitude, employee.longitude = coordinates if coordinates else (None, None)
+            # Changed locations are rescored by the next incremental suggestion run
+            employee.updated_at = now
+            batch.append(employee)
+            if len(batch) == BATCH_SIZE:
+                self.save(batch)
+                batch = []
+        if batch:
+            self.save(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Geocoded {resolved} employees ({unresolved} cities not found)'
+        ))
+
+    @staticmethod
+    def save(employees):
+        # bulk_update bypasses the signals, so the feature snapshots (which log
+        # the change for the match indexes) and the filter index follow here
+        employee_ids = [employee.pk for employee in employees]
+        Employee.objects.bulk_update(employees, ['latitude', 'longitude', 'updated_at'])
+        refresh_employee_features(Employee.objects.filter(pk__in=employee_ids))
+        log_employee_filter_changes('employee', employee_ids)
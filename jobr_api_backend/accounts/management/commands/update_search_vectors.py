@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from accounts.search import full_text_search_enabled, update_employee_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search document of every employee'
+
+    def handle(self, *args, **options):
+        if not full_text_search_enabled():
+            self.stdout.write(self.style.WARNING('Full-text search needs PostgreSQL; nothing to update'))
+            return
+        count = update_employee_search_vectors()
+        self.stdout.write(self.style.SUCCESS(f'Updated the search documents of {count} employees'))
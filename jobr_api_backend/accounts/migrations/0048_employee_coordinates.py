@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-17 02:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0047_employee_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='latitude',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=6, help_text='Geocoded from city_name', max_digits=9, null=True),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='longitude',
+            field=models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True),
+        ),
+    ]
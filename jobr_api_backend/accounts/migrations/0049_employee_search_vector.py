@@ -0,0 +1,74 @@
+# Generated by Django 5.1.3 on 2026-10-17 03:00
+
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def fill_search_vectors(apps, schema_editor):
+    # Search vectors are only built on PostgreSQL
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Employee = apps.get_model('accounts', 'Employee')
+    EmployeeLanguage = apps.get_model('accounts', 'EmployeeLanguage')
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    Function = apps.get_model('vacancies', 'Function')
+
+    def names(model, owner_field, name_field):
+        return Subquery(
+            model.objects.filter(**{owner_field: OuterRef('pk')})
+            .values(owner_field)
+            .annotate(names=StringAgg(name_field, ' '))
+            .values('names')
+        )
+
+    Employee.objects.update(search_vector=(
+        SearchVector(
+            Subquery(Function.objects.filter(pk=OuterRef('function_id')).values('name')),
+            names(Employee.skill.through, 'employee_id', 'skill__name'),
+            config='simple', weight='A',
+        ) +
+        SearchVector(
+            names(EmployeeLanguage, 'employee_id', 'language__name'),
+            'city_name',
+            config='simple', weight='B',
+        ) +
+        SearchVector(
+            Subquery(CustomUser.objects.filter(pk=OuterRef('user_id')).values('username')),
+            config='simple', weight='C',
+        ) +
+        SearchVector('biography', config='simple', weight='D')
+    ))
+
+
+def create_search_index(apps, schema_editor):
+    # GIN indexes only exist on PostgreSQL, the only database searched in full text
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX accounts_employee_search_vector_gin '
+            'ON accounts_employee USING gin (search_vector)'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS accounts_employee_search_vector_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0048_employee_coordinates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, help_text='Full-text search document, maintained by accounts.signals', null=True),
+        ),
+        migrations.RunPython(fill_search_vectors, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
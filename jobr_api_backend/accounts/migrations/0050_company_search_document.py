@@ -0,0 +1,71 @@
+# Generated by Django 5.1.3 on 2026-10-17 03:02
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce, Concat, Lower
+
+
+def fill_companies(apps, schema_editor):
+    Company = apps.get_model('accounts', 'Company')
+    Sector = apps.get_model('vacancies', 'Sector')
+    Vacancy = apps.get_model('vacancies', 'Vacancy')
+    parts = [
+        'name', 'city', 'description',
+        Subquery(Sector.objects.filter(pk=OuterRef('sector_id')).values('name')),
+        'vat_number', 'website',
+    ]
+    separated = []
+    for part in parts:
+        separated += [part, Value('\n')]
+    Company.objects.update(
+        search_document=Lower(Concat(*separated[:-1], output_field=TextField())),
+        vacancy_count=Coalesce(
+            Subquery(
+                Vacancy.objects.filter(company_id=OuterRef('pk'))
+                .values('company_id')
+                .annotate(count=Count('pk'))
+                .values('count'),
+                output_field=IntegerField(),
+            ),
+            0,
+        ),
+    )
+
+
+def create_search_index(apps, schema_editor):
+    # Trigram indexes only exist on PostgreSQL
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX accounts_company_search_document_trgm '
+            'ON accounts_company USING gin (search_document gin_trgm_ops)'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS accounts_company_search_document_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0049_employee_search_vector'),
+        ('vacancies', '0029_vacancy_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Name, city, description, sector, VAT number and website, maintained by accounts.signals'),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='vacancy_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, help_text='Number of vacancies, maintained by accounts.signals'),
+        ),
+        TrigramExtension(),
+        migrations.RunPython(fill_companies, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
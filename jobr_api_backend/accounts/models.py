@@ -1,4 +1,5 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import FileExtensionValidator
@@ -9,6 +10,7 @@ from django.db import transaction
 from vacancies.models import Weekday
 from vacancies.models import Language, ContractType, Function, Skill, Sector, Question, ProfileInterest
 
+from common.geo import geocode
 from common.utils import validate_image_size
 
 class ProfileOption(models.TextChoices):
@@ -50,6 +52,15 @@ class Employee(models.Model):
     )
     phone_number = models.CharField(max_length=15, null=True, blank=True, default=None)
     city_name = models.CharField(max_length=100, blank=True, null=True)
+    latitude = models.DecimalField(
+        max_digits=9,
+        decimal_places=6,
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text="Geocoded from city_name"
+    )
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     biography = models.TextField(blank=True, null=True)
     phone_session_counts = models.IntegerField(default=0)
     availability_status = models.CharField(
@@ -106,10 +117,39 @@ class Employee(models.Model):
         ],
         help_text="User's profile banner image (max 5MB, jpg, jpeg, png, gif)"
     )
+    updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Full-text search document, maintained by accounts.signals"
+    )
 
     class Meta:
         ordering = ['id']
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Compared on save, so the city is only geocoded again when it changed
+        instance._loaded_city_name = instance.__dict__.get('city_name', models.DEFERRED)
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Geocode a new or changed city_name offline so the employee can be matched on distance."""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            city_changed = 'city_name' in update_fields
+        else:
+            city_changed = self._state.adding or self.city_name != getattr(self, '_loaded_city_name', models.DEFERRED)
+        if city_changed:
+            coordinates = geocode(self.city_name)
+            self.latitude, self.longitude = coordinates if coordinates else (None, None)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'latitude', 'longitude'}
+        super().save(*args, **kwargs)
+        self._loaded_city_name = self.__dict__.get('city_name', models.DEFERRED)
+
     def __str__(self):
         return self.user.username if self.user else "Not Found"
 
@@ -182,6 +222,18 @@ class Company(models.Model):
         ],
         help_text="Company's profile banner image (max 5MB, jpg, jpeg, png, gif)"
     )
+    search_document = models.TextField(
+        blank=True,
+        default='',
+        editable=False,
+        help_text="Name, city, description, sector, VAT number and website, maintained by accounts.signals"
+    )
+    vacancy_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        db_index=True,
+        help_text="Number of vacancies, maintained by accounts.signals"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -0,0 +1,145 @@
+import re
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Count, F, IntegerField, OuterRef, Q, QuerySet, Subquery, TextField, Value
+from django.db.models.functions import Coalesce, Concat, Lower
+from vacancies.models import Function, Sector, Vacancy
+from .models import Company, CustomUser, Employee, EmployeeLanguage
+
+# The search document mixes languages and names, so words are not stemmed
+SEARCH_CONFIG = 'simple'
+SEARCH_TERM_RE = re.compile(r'\w+')
+
+
+def full_text_search_enabled() -> bool:
+    """Full-text search needs PostgreSQL; other databases fall back to substring matching."""
+    return connection.vendor == 'postgresql'
+
+
+def _names(model, owner_field, name_field):
+    """Subquery of the space separated names related to the outer employee."""
+    return Subquery(
+        model.objects.filter(**{owner_field: OuterRef('pk')})
+        .values(owner_field)
+        .annotate(names=StringAgg(name_field, ' '))
+        .values('names')
+    )
+
+
+def employee_search_vector() -> SearchVector:
+    """
+    Search document of an employee, weighted so the function and skills
+    rank above the languages and city, the username and the biography.
+    """
+    return (
+        SearchVector(
+            Subquery(Function.objects.filter(pk=OuterRef('function_id')).values('name')),
+            _names(Employee.skill.through, 'employee_id', 'skill__name'),
+            config=SEARCH_CONFIG, weight='A',
+        ) +
+        SearchVector(
+            _names(EmployeeLanguage, 'employee_id', 'language__name'),
+            'city_name',
+            config=SEARCH_CONFIG, weight='B',
+        ) +
+        SearchVector(
+            Subquery(CustomUser.objects.filter(pk=OuterRef('user_id')).values('username')),
+            config=SEARCH_CONFIG, weight='C',
+        ) +
+        SearchVector('biography', config=SEARCH_CONFIG, weight='D')
+    )
+
+
+def update_employee_search_vectors(employees: QuerySet = None) -> int:
+    """
+    Rebuild the search documents of the given employees, or of all of them,
+    in a single statement. Returns the number of employees updated, which is
+    0 on databases without full-text search.
+    """
+    if not full_text_search_enabled():
+        return 0
+    employees = Employee.objects.all() if employees is None else employees
+    return Employee.objects.filter(pk__in=employees.values('pk')).update(search_vector=employee_search_vector())
+
+
+def search_query(search: str):
+    """Match every word of the search as a prefix, so results show up while typing."""
+    terms = SEARCH_TERM_RE.findall(search.lower())
+    if not terms:
+        return None
+    return SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config=SEARCH_CONFIG)
+
+
+def search_employees(queryset: QuerySet, search: str) -> QuerySet:
+    """Filter employee users on a search term, best matches first where full-text search is available."""
+    query = search_query(search) if full_text_search_enabled() else None
+    if query is None:
+        return queryset.filter(
+            Q(username__icontains=search) |
+            Q(employee_profile__biography__icontains=search) |
+            Q(employee_profile__city_name__icontains=search) |
+            Q(employee_profile__function__name__icontains=search) |
+            Q(employee_profile__skill__name__icontains=search) |
+            Q(employee_profile__language__name__icontains=search)
+        ).distinct()
+    return queryset.filter(employee_profile__search_vector=query).annotate(
+        rank=SearchRank(F('employee_profile__search_vector'), query)
+    ).order_by('-rank', 'id')
+
+
+def company_search_document() -> Lower:
+    """Lowercased text of a company that company searches match, one field per line."""
+    parts = [
+        'name', 'city', 'description',
+        Subquery(Sector.objects.filter(pk=OuterRef('sector_id')).values('name')),
+        'vat_number', 'website',
+    ]
+    separated = []
+    for part in parts:
+        separated += [part, Value('\n')]
+    return Lower(Concat(*separated[:-1], output_field=TextField()))
+
+
+def company_vacancy_count() -> Coalesce:
+    return Coalesce(
+        Subquery(
+            Vacancy.objects.filter(company_id=OuterRef('pk'))
+            .values('company_id')
+            .annotate(count=Count('pk'))
+            .values('count'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def update_companies(companies: QuerySet = None) -> int:
+    """
+    Rebuild the search documents and vacancy counts of the given companies,
+    or of all of them, in a single statement. Returns the number of
+    companies updated.
+    """
+    companies = Company.objects.all() if companies is None else companies
+    return Company.objects.filter(pk__in=companies.values('pk')).update(
+        search_document=company_search_document(),
+        vacancy_count=company_vacancy_count(),
+    )
+
+
+def search_companies(queryset: QuerySet, search: str) -> QuerySet:
+    """
+    Filter companies on a search term found in their search document. On
+    PostgreSQL, misspelled words match as well and the most similar
+    companies come first; both use the trigram index of the document.
+    """
+    search = search.lower()
+    if not full_text_search_enabled():
+        return queryset.filter(search_document__contains=search)
+    return queryset.filter(
+        Q(search_document__contains=search) |
+        Q(search_document__trigram_word_similar=search)
+    ).annotate(
+        similarity=TrigramWordSimilarity(search, 'search_document')
+    ).order_by('-similarity', 'id')
@@ -603,6 +603,10 @@ class UserSerializer(serializers.ModelSerializer):
                     employee_profile.contract_type_id = contract_type_id
                     employee_profile.save()
 
+                # Rescore the employee's matches once the profile is committed
+                from suggestions.realtime import enqueue_employee_scoring
+                enqueue_employee_scoring(employee_profile.pk)
+
             # Update company profile for employers
             elif instance.role == ProfileOption.EMPLOYER and instance.selected_company:
                 company_data = self.context['request'].data.get('company', {})
@@ -0,0 +1,126 @@
+"""
+Rebuild the full-text search documents of employees when the fields they
+are made of change, on the employee itself or through related tables, and
+the search documents and vacancy counts of companies. Changes to what
+employees are filtered on are logged for the employee filter index.
+"""
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_save
+from django.dispatch import receiver
+from common.signals import changed_m2m_rows
+from vacancies.models import Function, Language, Sector, Skill, Vacancy
+from .filter_index import log_employee_filter_changes
+from .models import Company, CustomUser, Employee, EmployeeLanguage
+from .search import full_text_search_enabled, update_companies, update_employee_search_vectors
+
+
+def refresh(employees):
+    if full_text_search_enabled():
+        update_employee_search_vectors(employees)
+
+
+@receiver(post_save, sender=Employee)
+def employee_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh(Employee.objects.filter(pk=instance.pk))
+
+
+@receiver(m2m_changed, sender=Employee.skill.through)
+def employee_skills_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    employee_ids = changed_m2m_rows(Employee, sender, instance, action, reverse, pk_set)
+    if employee_ids:
+        refresh(Employee.objects.filter(pk__in=employee_ids))
+
+
+@receiver(post_save, sender=EmployeeLanguage)
+@receiver(post_delete, sender=EmployeeLanguage)
+def employee_language_changed(sender, instance, **kwargs):
+    refresh(Employee.objects.filter(pk=instance.employee_id))
+
+
+@receiver(post_save, sender=CustomUser)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # New users get their employee profile after this signal
+    if created or (update_fields is not None and 'username' not in update_fields):
+        return
+    refresh(Employee.objects.filter(user=instance))
+
+
+@receiver(post_save, sender=Function)
+def function_renamed(sender, instance, created, **kwargs):
+    if not created:
+        refresh(Employee.objects.filter(function=instance))
+
+
+@receiver(post_save, sender=Skill)
+def skill_renamed(sender, instance, created, **kwargs):
+    if not created:
+        refresh(Employee.objects.filter(skill=instance))
+
+
+@receiver(post_save, sender=Language)
+def language_renamed(sender, instance, created, **kwargs):
+    if not created:
+        refresh(Employee.objects.filter(language=instance))
+
+
+@receiver(post_save, sender=Company)
+def company_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_companies(Company.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Sector)
+def sector_renamed(sender, instance, created, **kwargs):
+    if not created:
+        update_companies(instance.companies.all())
+
+
+@receiver(pre_save, sender=Vacancy)
+def vacancy_saving(sender, instance, raw=False, **kwargs):
+    # A vacancy moved to another company changes the count of both
+    if not raw and instance.pk:
+        instance._previous_company_id = (
+            Vacancy.objects.filter(pk=instance.pk).values_list('company_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Vacancy)
+@receiver(post_delete, sender=Vacancy)
+def vacancy_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    company_ids = {instance.company_id, getattr(instance, '_previous_company_id', None)} - {None}
+    if company_ids:
+        update_companies(Company.objects.filter(pk__in=company_ids))
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def employee_filter_data_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        log_employee_filter_changes('user', [instance.user_id])
+
+
+@receiver(post_save, sender=EmployeeLanguage)
+@receiver(post_delete, sender=EmployeeLanguage)
+def employee_filter_languages_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        log_employee_filter_changes('employee', [instance.employee_id])
+
+
+@receiver(post_delete, sender=CustomUser)
+def employee_filter_user_deleted(sender, instance, **kwargs):
+    log_employee_filter_changes('user', [instance.pk])
+
+
+@receiver(post_save, sender=CustomUser)
+def user_role_changed(sender, instance, update_fields=None, raw=False, **kwargs):
+    # Logins and company selections do not change the role
+    if raw or (update_fields is not None and 'role' not in update_fields):
+        return
+    log_employee_filter_changes('user', [instance.pk])
+
+
+@receiver(m2m_changed, sender=Employee.skill.through)
+def employee_filter_skills_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    log_employee_filter_changes('employee', changed_m2m_rows(Employee, sender, instance, action, reverse, pk_set))
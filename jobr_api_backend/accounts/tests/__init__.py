@@ -1,6 +1,2 @@
 # Accounts module tests
 # This package contains comprehensive test suites for the accounts module
-
-from .test_models import *
-from .test_serializers import *
-from .test_views import *
\ No newline at end of file
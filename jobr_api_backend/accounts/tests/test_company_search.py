@@ -0,0 +1,65 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from vacancies.models import Sector, Vacancy
+from ..models import Company, CustomUser, ProfileOption
+
+
+class CompanySearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        searcher = CustomUser.objects.create_user(
+            username='searcher',
+            email='searcher@example.com',
+            password='testpass123',
+            role=ProfileOption.EMPLOYEE
+        )
+        self.client.force_authenticate(user=searcher)
+
+        self.sector = Sector.objects.create(name='Hospitality')
+        self.company = Company.objects.create(
+            name='Tech Corp',
+            city='Antwerp',
+            vat_number='BE0123456789',
+            sector=self.sector
+        )
+        self.vacancy = Vacancy.objects.create(company=self.company, title='Developer')
+
+    def search(self, term):
+        response = self.client.get(reverse('employer-search'), {'search': term})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [company['name'] for company in response.data]
+
+    def test_search_document_and_vacancy_count_are_maintained(self):
+        self.company.refresh_from_db()
+        self.assertEqual(self.company.search_document, 'tech corp\nantwerp\n\nhospitality\nbe0123456789\n')
+        self.assertEqual(self.company.vacancy_count, 1)
+
+        self.sector.name = 'Horeca'
+        self.sector.save()
+        Vacancy.objects.create(company=self.company, title='Tester')
+        self.company.refresh_from_db()
+        self.assertIn('\nhoreca\n', self.company.search_document)
+        self.assertEqual(self.company.vacancy_count, 2)
+
+        other = Company.objects.create(name='Other Corp')
+        self.vacancy.company = other
+        self.vacancy.save()
+        self.company.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.company.vacancy_count, other.vacancy_count), (1, 1))
+
+        self.vacancy.delete()
+        other.refresh_from_db()
+        self.assertEqual(other.vacancy_count, 0)
+
+    def test_search_companies_with_vacancies(self):
+        Company.objects.create(name='Tech Start')
+        self.assertEqual(self.search('TECH'), ['Tech Corp'])
+        self.assertEqual(self.search('hospitality'), ['Tech Corp'])
+        self.assertEqual(self.search('BE012'), ['Tech Corp'])
+        self.assertEqual(self.search('Ghent'), [])
+
+        self.vacancy.delete()
+        self.assertEqual(self.search('tech'), [])
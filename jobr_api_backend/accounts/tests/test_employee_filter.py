@@ -0,0 +1,152 @@
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from vacancies.models import ContractType, Language, Skill
+from ..filter_index import EmployeeFilterIndex, employee_filter_version, get_employee_filter_index
+from ..models import CustomUser, Employee, EmployeeLanguage, ProfileOption
+
+
+class EmployeeFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        employer = CustomUser.objects.create_user(
+            username='employer',
+            email='employer@example.com',
+            password='testpass123',
+            role=ProfileOption.EMPLOYER
+        )
+        self.client.force_authenticate(user=employer)
+
+        self.cooking = Skill.objects.create(name='Cooking')
+        self.baking = Skill.objects.create(name='Baking')
+        self.dutch = Language.objects.create(name='Dutch')
+        self.full_time = ContractType.objects.create(name='Full-time')
+        today = date.today()
+        self.ann = self.create_employee('ann', 'female', today - timedelta(days=25 * 365 + 30), [self.cooking])
+        self.bob = self.create_employee('bob', 'male', today - timedelta(days=40 * 365 + 30), [self.baking])
+        self.cas = self.create_employee('cas', 'male', None, [self.cooking, self.baking], self.full_time)
+        EmployeeLanguage.objects.create(employee=Employee.objects.get(user=self.bob), language=self.dutch, mastery='native')
+
+    def create_employee(self, username, gender, date_of_birth, skills, contract_type=None):
+        user = CustomUser.objects.create_user(
+            username=username,
+            email=f'{username}@example.com',
+            password='testpass123',
+            role=ProfileOption.EMPLOYEE
+        )
+        employee = Employee.objects.get(user=user)
+        employee.gender = gender
+        employee.date_of_birth = date_of_birth
+        employee.contract_type = contract_type
+        employee.save()
+        employee.skill.set(skills)
+        return user
+
+    def filter(self, **params):
+        response = self.client.get(reverse('employee-filter'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def usernames(self, **params):
+        return [user['username'] for user in self.filter(**params)]
+
+    def test_bitmaps(self):
+        index = EmployeeFilterIndex.build()
+        ann, bob, cas = self.ann.pk, self.bob.pk, self.cas.pk
+
+        self.assertEqual(index.ids(index.everyone()), [ann, bob, cas])
+        self.assertEqual(index.ids(index.with_skills([self.cooking.pk])), [ann, cas])
+        bitmap = index.with_skills([self.cooking.pk, self.baking.pk]) & index.with_gender('male')
+        self.assertEqual(index.ids(bitmap), [bob, cas])
+        self.assertEqual(index.ids(index.with_languages([self.dutch.pk, 0])), [bob])
+        self.assertEqual(index.ids(index.born_between(latest=date.today() - timedelta(days=30 * 365))), [bob])
+        self.assertEqual(index.ids(index.everyone(), after=ann, limit=1), [bob])
+        self.assertEqual(index.ids(index.with_gender('other')), [])
+
+    def test_filters(self):
+        self.assertEqual(self.usernames(), ['ann', 'bob', 'cas'])
+        self.assertEqual(self.usernames(skills=self.cooking.pk, gender='male'), ['cas'])
+        self.assertEqual(self.usernames(skills=f'{self.cooking.pk},{self.baking.pk}'), ['ann', 'bob', 'cas'])
+        self.assertEqual(self.usernames(languages=self.dutch.pk), ['bob'])
+        self.assertEqual(self.usernames(min_age=30), ['bob'])
+        self.assertEqual(self.usernames(max_age=30), ['ann'])
+        self.assertEqual(self.usernames(contract_type=self.full_time.pk), ['cas'])
+
+        response = self.client.get(reverse('employee-filter'), {'skills': 'cooking'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_pages(self):
+        page = self.filter(page_size=2)
+        self.assertEqual([user['username'] for user in page['results']], ['ann', 'bob'])
+
+        response = self.client.get(page['next'])
+        self.assertEqual([user['username'] for user in response.data['results']], ['cas'])
+        self.assertIsNone(response.data['next'])
+
+    def test_changes_outdate_the_index(self):
+        version = get_employee_filter_index().version
+        self.assertEqual(version, employee_filter_version())
+
+        Employee.objects.get(user=self.ann).skill.add(self.baking)
+        self.assertNotEqual(employee_filter_version(), version)
+        self.assertEqual(self.usernames(skills=self.baking.pk), ['ann', 'bob', 'cas'])
+
+        self.bob.delete()
+        self.assertEqual(self.usernames(skills=self.baking.pk), ['ann', 'cas'])
+
+    def test_changes_patch_the_index(self):
+        get_employee_filter_index()
+        ann = Employee.objects.get(user=self.ann)
+        ann.skill.add(self.baking)
+        ann.gender = 'other'
+        ann.save()
+        EmployeeLanguage.objects.create(employee=ann, language=self.dutch, mastery='basic')
+        self.bob.delete()
+        self.create_employee('dan', 'male', date(1990, 1, 1), [self.cooking])
+
+        with patch.object(EmployeeFilterIndex, 'build', wraps=EmployeeFilterIndex.build) as build:
+            patched = get_employee_filter_index()
+        build.assert_not_called()
+
+        rebuilt = EmployeeFilterIndex.build()
+        self.assertEqual(patched.ids(patched.everyone()), rebuilt.ids(rebuilt.everyone()))
+        self.assertEqual(patched.ids(patched.born_between()), rebuilt.ids(rebuilt.born_between()))
+        for attribute in ('by_skill', 'by_language', 'by_gender', 'by_contract_type'):
+            self.assertEqual(
+                {key: patched.ids(bitmap) for key, bitmap in getattr(patched, attribute).items()},
+                {key: rebuilt.ids(bitmap) for key, bitmap in getattr(rebuilt, attribute).items()},
+            )
+
+    def test_clearing_a_skill_patches_the_index(self):
+        get_employee_filter_index()
+        self.cooking.employee_set.clear()
+
+        with patch.object(EmployeeFilterIndex, 'build', wraps=EmployeeFilterIndex.build) as build:
+            index = get_employee_filter_index()
+        build.assert_not_called()
+        self.assertEqual(index.with_skills([self.cooking.pk]), 0)
+
+    def test_facet_counts(self):
+        response = self.client.get(reverse('employee-filter-facets'), {'skills': self.cooking.pk, 'gender': 'male'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(response.data['total'], 1)
+        facets = response.data['facets']
+        # Skill counts ignore the skill filter, gender counts the gender filter
+        self.assertEqual(facets['skills'], {self.cooking.pk: 1, self.baking.pk: 2})
+        self.assertEqual(facets['gender'], {'female': 1, 'male': 1})
+        self.assertEqual(facets['languages'], {})
+        self.assertEqual(facets['contract_type'], {self.full_time.pk: 1})
+
+    def test_facet_counts_follow_changes(self):
+        url = reverse('employee-filter-facets')
+        self.assertEqual(self.client.get(url).data['facets']['languages'], {self.dutch.pk: 1})
+
+        EmployeeLanguage.objects.create(employee=Employee.objects.get(user=self.ann), language=self.dutch, mastery='basic')
+        self.assertEqual(self.client.get(url).data['facets']['languages'], {self.dutch.pk: 2})
@@ -0,0 +1,88 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from suggestions.models import EmployeeFeatures
+from ..filter_index import employee_filter_version
+from ..models import CustomUser, Employee, ProfileOption
+
+
+class EmployeeLocationTests(TestCase):
+    def create_employee(self, username, city_name):
+        user = CustomUser.objects.create_user(
+            username=username,
+            email=f'{username}@example.com',
+            password='testpass123',
+            role=ProfileOption.EMPLOYEE
+        )
+        employee = Employee.objects.get(user=user)
+        employee.city_name = city_name
+        employee.save()
+        return user
+
+    def test_city_is_geocoded_on_save(self):
+        user = self.create_employee('ghent', '9000 Gent')
+        employee = Employee.objects.get(user=user)
+
+        self.assertAlmostEqual(float(employee.latitude), 51.0543, places=3)
+        self.assertAlmostEqual(float(employee.longitude), 3.7174, places=3)
+
+        employee.city_name = 'Nowhere'
+        employee.save(update_fields=['city_name'])
+        employee.refresh_from_db()
+        self.assertIsNone(employee.latitude)
+
+    def test_city_is_only_geocoded_when_it_changes(self):
+        user = self.create_employee('ghent', '9000 Gent')
+        employee = Employee.objects.get(user=user)
+
+        with patch('accounts.models.geocode', return_value=None) as geocode:
+            employee.biography = 'Cook'
+            employee.save(update_fields=['biography'])
+            employee.save()
+            geocode.assert_not_called()
+
+            employee.city_name = 'Leuven'
+            employee.save()
+            geocode.assert_called_once_with('Leuven')
+
+    def test_geocode_command_refreshes_snapshots_and_filter_index(self):
+        user = self.create_employee('ghent', '')
+        # Queryset updates bypass save(), so the city is not geocoded yet
+        Employee.objects.filter(user=user).update(city_name='9000 Gent')
+        version = employee_filter_version()
+
+        call_command('geocode_employees', stdout=StringIO())
+
+        features = EmployeeFeatures.objects.get(employee__user=user)
+        self.assertAlmostEqual(features.latitude, 51.0543, places=3)
+        self.assertNotEqual(employee_filter_version(), version)
+
+    def test_filter_by_distance_to_selected_company(self):
+        employer = CustomUser.objects.create_user(
+            username='employer',
+            email='employer@example.com',
+            password='testpass123',
+            role=ProfileOption.EMPLOYER
+        )
+        company = employer.selected_company
+        company.latitude, company.longitude = 50.8503, 4.3517  # Brussels
+        company.save()
+
+        nearby = self.create_employee('leuven', 'Leuven')
+        far = self.create_employee('ostend', 'Oostende')
+        self.create_employee('unknown', '')
+
+        client = APIClient()
+        client.force_authenticate(user=employer)
+        response = client.get(reverse('employee-filter'), {'max_distance': 50})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = {user['id'] for user in response.data}
+        self.assertIn(nearby.id, ids)
+        self.assertNotIn(far.id, ids)
+        self.assertEqual(len(ids), 1)
@@ -0,0 +1,84 @@
+from unittest.mock import patch
+
+from django.contrib.postgres.search import SearchQuery
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from vacancies.models import Function, Skill
+from ..models import CustomUser, Employee, ProfileOption
+from ..search import SEARCH_CONFIG, search_query, update_employee_search_vectors
+
+
+class EmployeeSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        searcher = CustomUser.objects.create_user(
+            username='searcher',
+            email='searcher@example.com',
+            password='testpass123',
+            role=ProfileOption.EMPLOYER
+        )
+        self.client.force_authenticate(user=searcher)
+
+        self.user = CustomUser.objects.create_user(
+            username='cook',
+            email='cook@example.com',
+            password='testpass123',
+            role=ProfileOption.EMPLOYEE
+        )
+        self.employee = Employee.objects.get(user=self.user)
+        self.employee.biography = 'Experienced line cook'
+        self.employee.function = Function.objects.create(name='Chef')
+        self.employee.save()
+        self.skill = Skill.objects.create(name='Baking')
+        self.employee.skill.add(self.skill)
+
+    def search(self, term):
+        response = self.client.get(reverse('employee-search'), {'search': term})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [user['username'] for user in response.data]
+
+    def test_search_query_matches_word_prefixes(self):
+        self.assertIsNone(search_query(' !? '))
+        self.assertEqual(
+            search_query("Line C'ook"),
+            SearchQuery('line:* & c:* & ook:*', search_type='raw', config=SEARCH_CONFIG)
+        )
+
+    def test_falls_back_to_substring_matching(self):
+        self.assertEqual(update_employee_search_vectors(), 0)
+        self.assertEqual(self.search('chef'), ['cook'])
+        self.assertEqual(self.search('bak'), ['cook'])
+        self.assertEqual(self.search('line cook'), ['cook'])
+        self.assertEqual(self.search('waiter'), [])
+
+    @patch('accounts.signals.update_employee_search_vectors')
+    @patch('accounts.signals.full_text_search_enabled', return_value=True)
+    def test_related_changes_rebuild_the_search_document(self, enabled, update):
+        def updated_ids():
+            ids = [list(call.args[0].values_list('pk', flat=True)) for call in update.call_args_list]
+            update.reset_mock()
+            return ids
+
+        self.employee.skill.remove(self.skill)
+        self.assertEqual(updated_ids(), [[self.employee.pk]])
+
+        self.skill.name = 'Pastry'
+        self.skill.save()
+        self.employee.function.name = 'Sous-chef'
+        self.employee.function.save()
+        self.assertEqual(updated_ids(), [[], [self.employee.pk]])
+
+        self.user.username = 'chef'
+        self.user.save(update_fields=['username'])
+        self.user.save(update_fields=['last_login'])
+        self.assertEqual(updated_ids(), [[self.employee.pk]])
+
+    @patch('accounts.signals.update_employee_search_vectors')
+    @patch('accounts.signals.full_text_search_enabled', return_value=True)
+    def test_clearing_a_skill_rebuilds_the_search_documents(self, enabled, update):
+        self.skill.employee_set.clear()
+
+        update.assert_called_once()
+        self.assertEqual(list(update.call_args.args[0].values_list('pk', flat=True)), [self.employee.pk])
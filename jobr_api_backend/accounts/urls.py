@@ -16,6 +16,7 @@ from .views import (
     PasswordResetRequestView,
     PasswordResetConfirmCodeView,
     EmployeeFilterView,
+    EmployeeFacetsView,
     GoogleLoginView,
     AppleLoginView
 )
@@ -86,6 +87,7 @@ urlpatterns = [
     # Search and filter endpoints
     path('employees/search/', EmployeeSearchView.as_view(), name='employee-search'),
     path('employees/filter/', EmployeeFilterView.as_view(), name='employee-filter'),
+    path('employees/filter/facets/', EmployeeFacetsView.as_view(), name='employee-filter-facets'),
     path('employers/search/', EmployerSearchView.as_view(), name='employer-search'),
 
     # Employee interaction endpoints
@@ -1,3 +1,4 @@
+from datetime import date, timedelta
 from rest_framework import viewsets, status, generics
 from rest_framework.response import Response
 from rest_framework.decorators import action
@@ -33,8 +34,13 @@ from .serializers import (
     AppleAuthSerializer
 )
 from .services import VATValidationService
+from .filter_index import get_employee_filter_index
+from .search import search_companies, search_employees
+from common.facets import cached_facets
+from common.pagination import KeysetPagination
+from common.geo import bounding_box, haversine_km
 from django.core.cache import cache
-from rest_framework.exceptions import ValidationError, Throttled, PermissionDenied
+from rest_framework.exceptions import ValidationError, Throttled, PermissionDenied, NotFound
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from google.oauth2 import id_token
@@ -782,14 +788,7 @@ class EmployeeSearchView(generics.ListAPIView):
         queryset = CustomUser.objects.filter(role=ProfileOption.EMPLOYEE)
         search = self.request.GET.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(username__icontains=search) |
-                Q(employee_profile__biography__icontains=search) |
-                Q(employee_profile__city_name__icontains=search) |
-                Q(employee_profile__function__name__icontains=search) |
-                Q(employee_profile__skill__name__icontains=search) |
-                Q(employee_profile__language__name__icontains=search)
-            ).distinct()
+            queryset = search_employees(queryset, search)
         return queryset
 
 class EmployerSearchView(generics.ListAPIView):
@@ -800,17 +799,10 @@ class EmployerSearchView(generics.ListAPIView):
 
     def get_queryset(self):
         """Filter companies based on search term and having visible vacancies."""
-        queryset = Company.objects.filter(vacancies__isnull=False).distinct()
+        queryset = Company.objects.filter(vacancy_count__gt=0)
         search = self.request.GET.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(description__icontains=search) |
-                Q(city__icontains=search) |
-                Q(website__icontains=search) |
-                Q(vat_number__icontains=search) |
-                Q(sector__name__icontains=search)
-            ).distinct()
+            queryset = search_companies(queryset, search)
         return queryset
 
 
@@ -879,65 +871,171 @@ class LikedEmployeeView(generics.GenericAPIView):
         liked.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+class EmployeeFilterPagination(KeysetPagination):
+    """Keyset pagination of filtered employee users in id order."""
+    ordering = ('id',)
+
+
 class EmployeeFilterView(generics.ListAPIView):
-    """Filter employees based on various criteria."""
+    """
+    Filter employees based on various criteria.
+
+    Filters are evaluated on the in-memory employee filter index and only
+    the matching users that are returned get loaded. Without a ``cursor``
+    or ``page_size`` parameter every match is returned in a plain list.
+    """
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = None
+    pagination_class = EmployeeFilterPagination
+
+    def get_id_list(self, name):
+        """Return the ids of a repeated or comma-separated query parameter."""
+        values = self.request.query_params.getlist(name)
+        if len(values) == 1:
+            values = values[0].split(',')
+        try:
+            return [int(value) for value in values if value.strip()]
+        except ValueError:
+            raise ValidationError({name: 'Expected a list of ids.'})
+
+    def get_number(self, name, cast=int):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return cast(value)
+        except ValueError:
+            raise ValidationError({name: 'Expected a number.'})
+
+    def get_filters(self):
+        """Return the filters in the query parameters, with unset ones as None or []."""
+        filters = {
+            'near': None,
+            'min_age': self.get_number('min_age'),
+            'max_age': self.get_number('max_age'),
+            'gender': self.request.query_params.get('gender') or None,
+            'languages': self.get_id_list('languages'),
+            'skills': self.get_id_list('skills'),
+            'contract_type': self.get_number('contract_type'),
+        }
 
-    def get_queryset(self):
-        """Filter employees based on query parameters."""
-        queryset = CustomUser.objects.filter(role=ProfileOption.EMPLOYEE)
-        
         # Filter by distance to company
-        max_distance = self.request.query_params.get('max_distance')
-        if max_distance and self.request.user.role == ProfileOption.EMPLOYER and self.request.user.selected_company:
+        max_distance = self.get_number('max_distance', float)
+        user = self.request.user
+        if max_distance and user.role == ProfileOption.EMPLOYER and user.selected_company:
+            company = user.selected_company
             # Skip distance filtering if coordinates aren't available
-            pass
+            if company.latitude is not None and company.longitude is not None:
+                filters['near'] = [float(company.latitude), float(company.longitude), max_distance]
+        return filters
+
+    def filter_bitmaps(self, index, filters):
+        """Return the bitmap of the employee users matching each of the set filters."""
+        bitmaps = {}
+        if filters['near']:
+            bitmaps['near'] = index.employees(self.employees_within(*filters['near']))
 
         # Filter by age range
-        min_age = self.request.query_params.get('min_age')
-        max_age = self.request.query_params.get('max_age')
+        min_age, max_age = filters['min_age'], filters['max_age']
         if min_age or max_age:
-            from datetime import date, timedelta
             today = date.today()
-            if min_age:
-                max_date = today - timedelta(days=int(min_age) * 365)
-                queryset = queryset.filter(employee_profile__date_of_birth__lte=max_date)
-            if max_age:
-                min_date = today - timedelta(days=int(max_age) * 365)
-                queryset = queryset.filter(employee_profile__date_of_birth__gte=min_date)
-
-        # Filter by gender
-        gender = self.request.query_params.get('gender')
-        if gender:
-            queryset = queryset.filter(employee_profile__gender=gender)
-
-        # Filter by languages (expecting a comma-separated list or repeated param)
-        languages = self.request.query_params.getlist('languages')
-        if not languages:
-            # Try comma-separated fallback
-            languages_str = self.request.query_params.get('languages')
-            if languages_str:
-                languages = [lang.strip() for lang in languages_str.split(',') if lang.strip()]
-        if languages:
-            queryset = queryset.filter(employee_profile__language__id__in=languages)
-
-        # Filter by skills (expecting a comma-separated list or repeated param)
-        skills = self.request.query_params.getlist('skills')
-        if not skills:
-            skills_str = self.request.query_params.get('skills')
-            if skills_str:
-                skills = [skill.strip() for skill in skills_str.split(',') if skill.strip()]
-        if skills:
-            queryset = queryset.filter(employee_profile__skill__id__in=skills)
-
-        # Filter by contract type
-        contract_type = self.request.query_params.get('contract_type')
-        if contract_type:
-            queryset = queryset.filter(employee_profile__contract_type_id=contract_type)
-
-        return queryset.distinct()
+            bitmaps['age'] = index.born_between(
+                today - timedelta(days=max_age * 365) if max_age else None,
+                today - timedelta(days=min_age * 365) if min_age else None,
+            )
+
+        if filters['gender']:
+            bitmaps['gender'] = index.with_gender(filters['gender'])
+        # Languages and skills match any of the given ones
+        if filters['languages']:
+            bitmaps['languages'] = index.with_languages(filters['languages'])
+        if filters['skills']:
+            bitmaps['skills'] = index.with_skills(filters['skills'])
+        if filters['contract_type']:
+            bitmaps['contract_type'] = index.with_contract_type(filters['contract_type'])
+        return bitmaps
+
+    @staticmethod
+    def combine(index, bitmaps):
+        """Return the users matching all of the given bitmaps."""
+        bitmap = index.everyone()
+        for other in bitmaps:
+            bitmap &= other
+        return bitmap
+
+    def list(self, request, *args, **kwargs):
+        index = get_employee_filter_index()
+        bitmap = self.combine(index, self.filter_bitmaps(index, self.get_filters()).values())
+        paginator = self.paginator
+        if not any(param in request.query_params for param in (
+            paginator.cursor_query_param, paginator.page_size_query_param
+        )):
+            users = CustomUser.objects.filter(pk__in=index.ids(bitmap))
+            return Response(self.get_serializer(users, many=True).data)
+
+        position = paginator.decode_position(request)
+        after = position[0] if position else None
+        if after is not None and not isinstance(after, int):
+            raise NotFound(paginator.invalid_cursor_message)
+        page_ids = index.ids(
+            bitmap,
+            after=after,
+            limit=paginator.get_page_size(request) + 1,
+        )
+        # Users deleted since the index was built are skipped
+        users = paginator.paginate_rows(list(CustomUser.objects.filter(pk__in=page_ids)), request)
+        return paginator.get_paginated_response(self.get_serializer(users, many=True).data)
+
+    @staticmethod
+    def employees_within(latitude, longitude, radius_km):
+        """
+        Return the ids of the geocoded employees within radius_km of a point.
+        The indexed latitude range narrows the rows before exact distances
+        are computed.
+        """
+        min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+        nearby = Employee.objects.filter(
+            latitude__range=(min_lat, max_lat),
+            longitude__range=(min_lon, max_lon),
+        ).values_list('id', 'latitude', 'longitude')
+        return [
+            employee_id for employee_id, employee_lat, employee_lon in nearby
+            if haversine_km(latitude, longitude, float(employee_lat), float(employee_lon)) <= radius_km
+        ]
+
+class EmployeeFacetsView(EmployeeFilterView):
+    """
+    Count the employees matching the filters of EmployeeFilterView per
+    skill, language, contract type and gender.
+
+    The counts of a facet leave out the facet's own filter, so they tell
+    how many employees an option would add or keep when ticked.
+    """
+    pagination_class = None
+    FACETS = {
+        'skills': 'by_skill',
+        'languages': 'by_language',
+        'contract_type': 'by_contract_type',
+        'gender': 'by_gender',
+    }
+
+    def get(self, request, *args, **kwargs):
+        index = get_employee_filter_index()
+        filters = self.get_filters()
+
+        def compute():
+            bitmaps = self.filter_bitmaps(index, filters)
+            facets = {}
+            for name, attribute in self.FACETS.items():
+                others = self.combine(index, [bitmap for key, bitmap in bitmaps.items() if key != name])
+                facets[name] = index.counts(others, getattr(index, attribute))
+            return {
+                'total': self.combine(index, bitmaps.values()).bit_count(),
+                'facets': facets,
+            }
+
+        return Response(cached_facets('employees', filters, compute, version=index.version))
+
 
 class AISuggestionsView(generics.ListAPIView):
     """Get AI-powered employee suggestions."""
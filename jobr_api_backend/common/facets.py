@@ -0,0 +1,31 @@
+import hashlib
+import json
+from typing import Any, Callable, Dict
+
+from django.core.cache import cache
+
+# Counts may lag this many seconds behind changes that carry no version stamp
+FACET_CACHE_TIMEOUT = 60
+
+
+def filter_signature(filters: Dict[str, Any]) -> str:
+    """
+    Return a stable hash of a filter state. Unset filters are dropped and
+    lists are deduplicated and sorted, so equivalent requests share it.
+    """
+    normalized = {}
+    for name, value in filters.items():
+        if value is None or value == [] or value == '':
+            continue
+        normalized[name] = sorted(set(value)) if isinstance(value, (list, tuple, set)) else value
+    return hashlib.md5(json.dumps(normalized, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def cached_facets(prefix: str, filters: Dict[str, Any], compute: Callable[[], dict], version: str = '') -> dict:
+    """Return the facet counts of a filter state from the cache, computing them on a miss."""
+    key = f'{prefix}:facets:{version}:{filter_signature(filters)}'
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute()
+        cache.set(key, facets, FACET_CACHE_TIMEOUT)
+    return facets
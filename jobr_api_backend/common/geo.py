@@ -0,0 +1,165 @@
+import csv
+import math
+import re
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.db.models import Expression, FloatField, Value
+from django.db.models.functions import ASin, Cast, Cos, Least, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / 'data' / 'gazetteer.csv'
+
+Coordinates = Tuple[float, float]
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Return the great-circle distance between two points in kilometers."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def haversine_expression(lat: float, lon: float, lat_field: str = 'latitude',
+                         lon_field: str = 'longitude') -> Expression:
+    """
+    Return a database expression of the great-circle distance in kilometers
+    between a point and the coordinates in ``lat_field`` and ``lon_field``,
+    the SQL counterpart of ``haversine_km``. Rows without coordinates get NULL.
+    """
+    row_lat = Radians(Cast(lat_field, FloatField()))
+    row_lon = Radians(Cast(lon_field, FloatField()))
+    lat, lon = math.radians(lat), math.radians(lon)
+    a = (
+        Power(Sin((row_lat - Value(lat)) / Value(2.0)), 2) +
+        Value(math.cos(lat)) * Cos(row_lat) * Power(Sin((row_lon - Value(lon)) / Value(2.0)), 2)
+    )
+    # Rounding can push a just above 1 for antipodal points
+    return Value(2.0 * EARTH_RADIUS_KM) * ASin(Sqrt(Least(a, Value(1.0))))
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    Return (min_lat, max_lat, min_lon, max_lon) of a box containing every
+    point within ``radius_km`` of the given point.
+    """
+    delta_lat = radius_km / KM_PER_DEGREE
+    # Longitude degrees shrink towards the poles
+    delta_lon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+    return lat - delta_lat, lat + delta_lat, lon - delta_lon, lon + delta_lon
+
+
+def normalize_place(name: str) -> str:
+    """Lowercase a place name and strip accents and punctuation ('Liège' -> 'liege')."""
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode()
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', name.lower()).split())
+
+
+class Gazetteer:
+    """
+    Offline geocoder for place names and postal codes.
+
+    Places are read from the bundled ``data/gazetteer.csv`` (postal code,
+    name, '|'-separated aliases, latitude, longitude). A postal code that is
+    not listed resolves to the closest listed code in the same postal region,
+    which is close enough for distance scoring.
+    """
+
+    def __init__(self, rows: List[Dict[str, str]]):
+        self.by_postal_code = {}
+        self.by_name = {}
+        for row in rows:
+            coordinates = (float(row['latitude']), float(row['longitude']))
+            self.by_postal_code[int(row['postal_code'])] = coordinates
+            for name in [row['name']] + [alias for alias in row['aliases'].split('|') if alias]:
+                self.by_name.setdefault(normalize_place(name), coordinates)
+        self.postal_codes = sorted(self.by_postal_code)
+
+    @classmethod
+    def load(cls, path: Path = GAZETTEER_PATH) -> 'Gazetteer':
+        with open(path, newline='', encoding='utf-8') as f:
+            return cls(list(csv.DictReader(f)))
+
+    def geocode(self, place: str) -> Optional[Coordinates]:
+        """Return the coordinates of a place name and/or postal code, or None."""
+        if not place:
+            return None
+
+        postal_code = re.search(r'\b(\d{4})\b', place)
+        if postal_code:
+            coordinates = self.lookup_postal_code(int(postal_code.group(1)))
+            if coordinates:
+                return coordinates
+
+        # "9000 Gent", "Gent, Belgium" and "Gent" all resolve to Gent
+        for part in [place] + place.split(','):
+            name = normalize_place(re.sub(r'\d+', ' ', part))
+            if name in self.by_name:
+                return self.by_name[name]
+        return None
+
+    def lookup_postal_code(self, postal_code: int) -> Optional[Coordinates]:
+        if postal_code in self.by_postal_code:
+            return self.by_postal_code[postal_code]
+        region = [code for code in self.postal_codes if code // 100 == postal_code // 100]
+        if not region:
+            return None
+        return self.by_postal_code[min(region, key=lambda code: abs(code - postal_code))]
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer() -> Gazetteer:
+    return Gazetteer.load()
+
+
+def geocode(place: str) -> Optional[Coordinates]:
+    """Geocode a place name or postal code against the bundled gazetteer."""
+    return get_gazetteer().geocode(place)
+
+
+class GridIndex:
+    """
+    Spatial index that buckets points into square latitude/longitude cells.
+
+    A radius query only visits the cells overlapping the query's bounding
+    box and computes the exact haversine distance for the points in them,
+    instead of for every point.
+    """
+
+    def __init__(self, cell_km: float = 10):
+        self.cell_degrees = cell_km / KM_PER_DEGREE
+        self.cells = defaultdict(list)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _cell(self, value: float) -> int:
+        return math.floor(value / self.cell_degrees)
+
+    def add(self, key, lat: float, lon: float) -> None:
+        self.cells[(self._cell(lat), self._cell(lon))].append((key, lat, lon))
+        self.size += 1
+
+    def remove(self, key, lat: float, lon: float) -> None:
+        """Remove a point added with the same key and coordinates."""
+        cell = (self._cell(lat), self._cell(lon))
+        self.cells[cell].remove((key, lat, lon))
+        if not self.cells[cell]:
+            del self.cells[cell]
+        self.size -= 1
+
+    def within(self, lat: float, lon: float, radius_km: float) -> Iterator[Tuple[object, float]]:
+        """Yield (key, distance in km) for every point within ``radius_km``."""
+        min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+        for row in range(self._cell(min_lat), self._cell(max_lat) + 1):
+            for col in range(self._cell(min_lon), self._cell(max_lon) + 1):
+                for key, point_lat, point_lon in self.cells.get((row, col), ()):
+                    distance = haversine_km(lat, lon, point_lat, point_lon)
+                    if distance <= radius_km:
+                        yield key, distance
@@ -1,4 +1,8 @@
-from rest_framework.pagination import PageNumberPagination
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination
 from rest_framework.response import Response
 
 class NoLimitPagination(PageNumberPagination):
@@ -38,4 +42,93 @@ class NoLimitPagination(PageNumberPagination):
                 },
                 'results': schema,
             },
-        }
\ No newline at end of file
+        }
+
+class KeysetPagination(CursorPagination):
+    """
+    Forward-only cursor pagination on a unique ordering, e.g. ('-score', '-id').
+
+    Unlike CursorPagination, whose cursor holds the first ordering field and
+    an offset past the rows tied on it, the cursor holds every ordering value
+    of the last row of a page, so the next page starts right after them with
+    no offset, whatever the ties. That is also what lets rows that are
+    already in memory, like a cached feed or the ids of a bitmap, be
+    paginated with ``paginate_rows``.
+    """
+    ordering = ('-id',)
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def __init__(self):
+        self.fields = [field.lstrip('-') for field in self.ordering]
+        self.descending = [field.startswith('-') for field in self.ordering]
+        self.next_position = None
+        self.has_next = self.has_previous = False
+        self.request = None
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return None
+        try:
+            position = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if cursor.offset or cursor.reverse or not isinstance(position, list) or len(position) != len(self.fields):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor._replace(position=position)
+
+    def decode_position(self, request):
+        """Return the ordering values of the cursor in the request, or None."""
+        cursor = self.decode_cursor(request)
+        return None if cursor is None else cursor.position
+
+    def encode_cursor(self, cursor):
+        return super().encode_cursor(cursor._replace(position=json.dumps(cursor.position)))
+
+    def get_position(self, row):
+        """Return the ordering values of a model instance or dict."""
+        if isinstance(row, dict):
+            return [row[field] for field in self.fields]
+        return [getattr(row, field) for field in self.fields]
+
+    def follows(self, row, position) -> bool:
+        """Whether a row comes after the given position in the ordering."""
+        for value, cursor_value, descending in zip(self.get_position(row), position, self.descending):
+            if value != cursor_value:
+                return value < cursor_value if descending else value > cursor_value
+        return False
+
+    def after(self, position) -> Q:
+        """Return the condition selecting the rows after the given position."""
+        condition = Q()
+        for i, (field, descending) in enumerate(zip(self.fields, self.descending)):
+            equal = {name: value for name, value in zip(self.fields[:i], position[:i])}
+            condition |= Q(**equal, **{f'{field}__{"lt" if descending else "gt"}': position[i]})
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        position = self.decode_position(request)
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+        return self.paginate_rows(list(queryset[:self.get_page_size(request) + 1]), request)
+
+    def paginate_rows(self, rows, request):
+        """Paginate rows that are already in order and after the cursor."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.page = rows[:self.page_size]
+        self.has_next = len(rows) > self.page_size
+        self.next_position = self.get_position(self.page[-1]) if self.has_next else None
+        self.display_page_controls = self.has_next
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self.next_position))
+
+    def get_previous_link(self):
+        return None
@@ -0,0 +1,24 @@
+"""Helpers for signal receivers shared between apps."""
+
+
+def changed_m2m_rows(model, sender, instance, action, reverse, pk_set):
+    """
+    Return the ids of the ``model`` rows whose relation through ``sender``
+    changed, once the change is made.
+
+    Clearing the reverse side sends no pk_set, so the rows related to the
+    cleared instance are looked up on pre_clear and kept on the instance
+    for every post_clear receiver.
+    """
+    if not reverse:
+        return [instance.pk] if action in ('post_add', 'post_remove', 'post_clear') else []
+    if action == 'pre_clear':
+        field = next(field.name for field in model._meta.many_to_many if field.remote_field.through is sender)
+        instance.__dict__.setdefault('_cleared_m2m_rows', {})[sender] = list(
+            model.objects.filter(**{field: instance}).values_list('id', flat=True)
+        )
+    elif action == 'post_clear':
+        return instance.__dict__.get('_cleared_m2m_rows', {}).get(sender, [])
+    elif action in ('post_add', 'post_remove'):
+        return pk_set or []
+    return []
@@ -0,0 +1,27 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from common.facets import cached_facets, filter_signature
+
+
+class FacetCacheTests(SimpleTestCase):
+    def tearDown(self):
+        cache.clear()
+
+    def test_equivalent_filters_share_a_signature(self):
+        self.assertEqual(
+            filter_signature({'skills': [3, 1, 3], 'gender': 'male', 'languages': [], 'min_age': None}),
+            filter_signature({'gender': 'male', 'skills': [1, 3]}),
+        )
+        self.assertNotEqual(filter_signature({'skills': [1]}), filter_signature({'languages': [1]}))
+
+    def test_counts_are_cached_per_signature_and_version(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {'total': len(calls)}
+
+        self.assertEqual(cached_facets('test', {'skills': [1, 2]}, compute), {'total': 1})
+        self.assertEqual(cached_facets('test', {'skills': [2, 1]}, compute), {'total': 1})
+        self.assertEqual(cached_facets('test', {'skills': [2, 1]}, compute, version='2'), {'total': 2})
+        self.assertEqual(len(calls), 2)
@@ -0,0 +1,73 @@
+import random
+
+from django.test import SimpleTestCase, TestCase
+from common.geo import GridIndex, bounding_box, geocode, haversine_expression, haversine_km
+from vacancies.models import Vacancy
+
+
+class HaversineTests(SimpleTestCase):
+    def test_brussels_to_antwerp(self):
+        self.assertAlmostEqual(haversine_km(50.8503, 4.3517, 51.2194, 4.4025), 41.2, places=0)
+
+    def test_bounding_box_contains_radius(self):
+        min_lat, max_lat, min_lon, max_lon = bounding_box(50.85, 4.35, 10)
+        self.assertAlmostEqual(haversine_km(50.85, 4.35, max_lat, 4.35), 10, places=6)
+        self.assertAlmostEqual(haversine_km(50.85, 4.35, 50.85, max_lon), 10, delta=0.01)
+
+
+class GazetteerTests(SimpleTestCase):
+    def test_postal_code_and_names(self):
+        ghent = geocode('Gent')
+        self.assertEqual(geocode('9000'), ghent)
+        self.assertEqual(geocode('9000 Gent'), ghent)
+        self.assertEqual(geocode('Ghent, Belgium'), ghent)
+        self.assertEqual(geocode('Liège'), geocode('LIEGE'))
+
+    def test_unlisted_postal_code_resolves_within_region(self):
+        self.assertEqual(geocode('9050'), geocode('9070'))
+
+    def test_unknown_place(self):
+        self.assertIsNone(geocode('Atlantis'))
+        self.assertIsNone(geocode(''))
+        self.assertIsNone(geocode(None))
+
+
+class GridIndexTests(SimpleTestCase):
+    def test_within_matches_brute_force(self):
+        rng = random.Random(1)
+        points = [(i, rng.uniform(49.5, 51.5), rng.uniform(2.5, 6.4)) for i in range(500)]
+        grid = GridIndex(cell_km=7)
+        for key, lat, lon in points:
+            grid.add(key, lat, lon)
+
+        for lat, lon, radius in ((50.85, 4.35, 25), (51.2, 3.2, 60), (50.0, 5.7, 5)):
+            expected = {key for key, point_lat, point_lon in points if haversine_km(lat, lon, point_lat, point_lon) <= radius}
+            self.assertEqual({key for key, _ in grid.within(lat, lon, radius)}, expected)
+
+    def test_remove(self):
+        grid = GridIndex()
+        grid.add(1, 50.85, 4.35)
+        grid.add(2, 50.86, 4.36)
+
+        grid.remove(1, 50.85, 4.35)
+
+        self.assertEqual(len(grid), 1)
+        self.assertEqual([key for key, _ in grid.within(50.85, 4.35, 5)], [2])
+
+
+class HaversineExpressionTests(TestCase):
+    def test_matches_haversine_km(self):
+        rng = random.Random(2)
+        points = [(rng.uniform(49.5, 51.5), rng.uniform(2.5, 6.4)) for _ in range(20)]
+        for lat, lon in points:
+            Vacancy.objects.create(title='Point', latitude=round(lat, 6), longitude=round(lon, 6))
+        Vacancy.objects.create(title='Nowhere')
+
+        distances = Vacancy.objects.annotate(
+            distance=haversine_expression(50.8503, 4.3517)
+        ).values_list('latitude', 'longitude', 'distance')
+        for lat, lon, distance in distances:
+            if lat is None:
+                self.assertIsNone(distance)
+            else:
+                self.assertAlmostEqual(distance, haversine_km(50.8503, 4.3517, float(lat), float(lon)), places=6)
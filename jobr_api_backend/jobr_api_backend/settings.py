@@ -84,6 +84,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "django_extensions",
     "rest_framework",
     "rest_framework_simplejwt",
@@ -156,6 +157,15 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Shared by every worker and management command: the suggestion feature change
+# log, the employee filter index version and the suggestion feeds live here
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://127.0.0.1:6379/1",
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -230,3 +240,7 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
     "UPDATE_LAST_LOGIN": True,
 }
+
+# AI suggestion generation. The defaults of every option are documented in
+# suggestions/conf.py; only set the ones this deployment changes here.
+SUGGESTIONS = {}
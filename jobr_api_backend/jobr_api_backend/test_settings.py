@@ -7,6 +7,12 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 # Disable Sentry in test mode
 SENTRY_DSN = None
 
@@ -23,4 +29,11 @@ class DisableMigrations:
     def __getitem__(self, item):
         return None
 
-MIGRATION_MODULES = DisableMigrations()
\ No newline at end of file
+MIGRATION_MODULES = DisableMigrations()
+
+# Score suggestions with the deterministic local LLM stub
+SUGGESTIONS = {
+    **SUGGESTIONS,
+    'LLM_BACKEND': 'suggestions.llm.StubBackend',
+    'LLM_RETRY_BACKOFF': 0,
+}
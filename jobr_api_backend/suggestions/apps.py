@@ -7,7 +7,4 @@ class SuggestionsConfig(AppConfig):
     verbose_name = 'AI Suggestions'
 
     def ready(self):
-        try:
-            import suggestions.signals  # noqa
-        except ImportError:
-            pass
+        import suggestions.signals  # noqa
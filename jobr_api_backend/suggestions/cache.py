@@ -0,0 +1,80 @@
+import hashlib
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .conf import get_setting
+from .models import LLMScoreCache
+
+
+class ScoreCache:
+    """
+    Content-addressed cache of LLM match scores backed by ``LLMScoreCache``.
+
+    Keys are a hash of the model name and the exact prompts, so any change in
+    the employee or vacancy text produces a new key and stale entries simply
+    stop being used until they are evicted. Hits and misses are counted per
+    instance so a run can report them.
+    """
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or get_setting('LLM_CACHE_MAX_ENTRIES')
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, prompt: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model or '', system_prompt, prompt):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Tuple[float, str]]:
+        """Return the cached (score, explanation) of every known key."""
+        keys = set(keys)
+        if not keys:
+            return {}
+        entries = {
+            key: (score, explanation)
+            for key, score, explanation in LLMScoreCache.objects.filter(key__in=keys)
+            .values_list('key', 'score', 'explanation')
+        }
+        if entries:
+            LLMScoreCache.objects.filter(key__in=entries).update(last_used_at=timezone.now())
+        self.hits += len(entries)
+        self.misses += len(keys) - len(entries)
+        return entries
+
+    def get(self, key: str) -> Optional[Tuple[float, str]]:
+        return self.get_many([key]).get(key)
+
+    def set_many(self, entries: Dict[str, Tuple[str, float, str]]) -> None:
+        """Store (model, score, explanation) entries, keeping existing keys."""
+        LLMScoreCache.objects.bulk_create(
+            [
+                LLMScoreCache(key=key, model=model, score=score, explanation=explanation)
+                for key, (model, score, explanation) in entries.items()
+            ],
+            ignore_conflicts=True,
+        )
+
+    def set(self, key: str, model: str, score: float, explanation: str) -> None:
+        self.set_many({key: (model, score, explanation)})
+
+    def evict(self) -> int:
+        """Delete the least recently used entries beyond ``max_entries``."""
+        # The oldest entry that is still kept; everything used before it goes
+        boundary = (
+            LLMScoreCache.objects.order_by('-last_used_at', '-id')
+            .values('id', 'last_used_at')[self.max_entries - 1:self.max_entries]
+            .first()
+        )
+        if boundary is None:
+            return 0
+        deleted, _ = LLMScoreCache.objects.filter(
+            Q(last_used_at__lt=boundary['last_used_at']) |
+            Q(last_used_at=boundary['last_used_at'], id__lt=boundary['id'])
+        ).delete()
+        return deleted
@@ -0,0 +1,74 @@
+from django.conf import settings
+
+
+DEFAULTS = {
+    # Dotted path to the LLMBackend used for qualitative scoring
+    'LLM_BACKEND': 'suggestions.llm.OpenAIBackend',
+    'LLM_MODEL': 'gpt-4',
+    # Maximum number of LLM requests running at the same time
+    'LLM_MAX_IN_FLIGHT': 8,
+    # Retries after a failed LLM request, with exponential backoff in seconds
+    'LLM_MAX_RETRIES': 3,
+    'LLM_RETRY_BACKOFF': 1.0,
+    # Timeout of a single LLM request in seconds
+    'LLM_TIMEOUT': 30,
+    # Reuse stored LLM scores for prompts that were scored before
+    'LLM_CACHE': True,
+    'LLM_CACHE_MAX_ENTRIES': 500000,
+    # Only the best quantitative matches per employee and per vacancy get a
+    # qualitative score; None disables the limit
+    'CANDIDATES_PER_EMPLOYEE': 50,
+    'CANDIDATES_PER_VACANCY': 50,
+    # Weigh the skills of a vacancy by the FunctionSkill weights of its
+    # function instead of counting them equally; rerun with --full after
+    # changing this
+    'FUNCTION_SKILL_WEIGHTS': False,
+    # Weigh the quantitative and the qualitative score in the total score by
+    # the summed quantitative and qualitative SuggestionWeight weights instead
+    # of evenly; this changes every total score, so rerun with --full after
+    # changing it
+    'BLEND_CONFIGURED_WEIGHTS': False,
+    # Seconds between checks of a running process's match index for feature
+    # snapshots older than their row, e.g. after queryset updates that bypass
+    # the signals
+    'STALE_FEATURES_CHECK_INTERVAL': 60,
+    # Weight of the local text similarity of biography and vacancy
+    # description, relative to the quantitative score, when ranking the pairs
+    # worth an LLM call; 0 ranks on the quantitative score alone
+    'TEXT_RANKING_WEIGHT': 0,
+    # Use the local text similarity as the qualitative score instead of
+    # calling the LLM
+    'TEXT_PROXY': False,
+    # Number of vacancies an employee is scored against in one LLM call;
+    # e.g. 10 cuts the calls tenfold. Vacancies missing from a batched
+    # response are scored one by one. 1 sends every pair on its own
+    'LLM_BATCH_SIZE': 1,
+    # Budget of LLM calls and of estimated LLM tokens per run, split evenly
+    # over its worker processes; pairs left when it runs out are scored by the
+    # next run. None is unlimited
+    'LLM_CALL_BUDGET': None,
+    'LLM_TOKEN_BUDGET': None,
+    # Within the budget, pairs are scored by their candidate ranking score
+    # plus this weight times the recency of the latest change to either
+    # profile, from 100 for a change just now halving every half life in days
+    'LLM_PRIORITY_RECENCY_WEIGHT': 0.5,
+    'LLM_PRIORITY_HALF_LIFE_DAYS': 7,
+    # Number of best suggestions per user kept in the cached suggestion feed,
+    # and how long a feed is cached in seconds
+    'FEED_SIZE': 200,
+    'FEED_CACHE_TIMEOUT': 3600,
+    # Score a vacancy created or updated through the API, or an employee
+    # whose profile was updated, against its best candidates as soon as the
+    # change is committed, on this many background threads per process; 0
+    # runs the job in the request. Queued jobs are lost when the process
+    # stops and left to the next generation run
+    'REALTIME_SCORING': True,
+    'REALTIME_WORKERS': 2,
+    # Number of suggestions written per bulk upsert statement
+    'WRITE_CHUNK_SIZE': 1000,
+}
+
+
+def get_setting(name):
+    """Return a suggestion setting from ``settings.SUGGESTIONS`` or its default."""
+    return getattr(settings, 'SUGGESTIONS', {}).get(name, DEFAULTS[name])
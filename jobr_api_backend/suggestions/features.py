@@ -0,0 +1,233 @@
+import time
+from collections import defaultdict
+from typing import Iterable, List, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q, QuerySet
+from accounts.models import Employee, EmployeeLanguage
+from vacancies.models import Vacancy
+from .models import EmployeeFeatures, VacancyFeatures
+from .scoring import MASTERY_VALUES, mastery_value
+
+EMPLOYEE_FEATURE_FIELDS = [
+    'is_active', 'skill_ids', 'language_ids', 'language_masteries', 'interest_ids',
+    'function_id', 'contract_type_id', 'latitude', 'longitude', 'updated_at',
+]
+VACANCY_FEATURE_FIELDS = [
+    'skill_ids', 'language_ids', 'language_masteries', 'contract_type_ids',
+    'function_id', 'mastery_level', 'latitude', 'longitude', 'updated_at',
+]
+
+FEATURE_CHANGE_SEQUENCE_KEY = 'suggestions:feature_changes:sequence'
+FEATURE_CHANGE_KEY = 'suggestions:feature_changes:{}'
+# Logged changes expire after a day; readers further behind than that, or
+# than MAX_FEATURE_CHANGES changes, start over from the snapshots
+FEATURE_CHANGE_TIMEOUT = 24 * 60 * 60
+MAX_FEATURE_CHANGES = 1000
+
+
+def feature_change_sequence() -> int:
+    """
+    Return the number of the latest logged snapshot change.
+
+    The log lives in the default cache, which ``CACHES`` shares between the
+    web workers and the management commands, so every process sees it.
+    """
+    sequence = cache.get(FEATURE_CHANGE_SEQUENCE_KEY)
+    if sequence is None:
+        # Starting from the clock, a cleared cache never reuses a sequence number
+        cache.add(FEATURE_CHANGE_SEQUENCE_KEY, time.time_ns() // 1000, timeout=None)
+        sequence = cache.get(FEATURE_CHANGE_SEQUENCE_KEY)
+    return sequence
+
+
+def _log_feature_change(change: tuple) -> None:
+    feature_change_sequence()
+    sequence = cache.incr(FEATURE_CHANGE_SEQUENCE_KEY)
+    cache.set(FEATURE_CHANGE_KEY.format(sequence), change, FEATURE_CHANGE_TIMEOUT)
+
+
+def log_feature_changes(kind: str, ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Log that the snapshots of the given employees or vacancies (``kind``),
+    or of all of them when ``ids`` is None, were rebuilt or deleted.
+    """
+    if ids is not None:
+        ids = sorted(ids)
+        if not ids:
+            return
+    change = (kind, ids)
+    # Logged again once committed, so an index updated by another request
+    # before the commit does not keep the old data
+    _log_feature_change(change)
+    transaction.on_commit(lambda: _log_feature_change(change))
+
+
+def feature_changes(after: int, until: int) -> Optional[List[tuple]]:
+    """
+    Return the (kind, ids) changes logged after sequence number ``after``
+    up to ``until``, or None when some of them are no longer available.
+    """
+    if not 0 <= until - after <= MAX_FEATURE_CHANGES:
+        return None
+    keys = [FEATURE_CHANGE_KEY.format(sequence) for sequence in range(after + 1, until + 1)]
+    changes = cache.get_many(keys)
+    if len(changes) < len(keys):
+        return None
+    return [changes[key] for key in keys]
+
+
+def _coordinates(latitude, longitude):
+    if latitude is None or longitude is None:
+        return None
+    return float(latitude), float(longitude)
+
+
+def _languages(rows, duplicates: bool = False):
+    """
+    Group (owner_id, language_id, mastery label) rows into sorted id and mastery arrays.
+
+    A language listed twice keeps its highest mastery, unless ``duplicates``
+    is set: a vacancy requirement listed twice counts twice, as it does in
+    ``QuantitativeScorer``.
+    """
+    languages = defaultdict(list)
+    for owner_id, language_id, mastery in rows:
+        # Unknown mastery labels cannot be scored
+        if mastery and mastery.lower() in MASTERY_VALUES:
+            languages[owner_id].append((language_id, mastery_value(mastery)))
+    grouped = {}
+    for owner_id, entries in languages.items():
+        if not duplicates:
+            masteries = {}
+            for language_id, value in entries:
+                masteries[language_id] = max(masteries.get(language_id, 0), value)
+            entries = masteries.items()
+        entries = sorted(entries)
+        grouped[owner_id] = ([language_id for language_id, _ in entries], [value for _, value in entries])
+    return grouped
+
+
+def _grouped(rows):
+    grouped = defaultdict(list)
+    for owner_id, related_id in rows:
+        grouped[owner_id].append(related_id)
+    return {owner_id: sorted(ids) for owner_id, ids in grouped.items()}
+
+
+def refresh_employee_features(employees: QuerySet = None) -> int:
+    """
+    Rebuild the feature snapshots of the given employees, or of all of them.
+
+    Every related table is read once for the whole set and the snapshots
+    are upserted in one statement, so this is as cheap for one employee as
+    it is for a backfill. The rebuilt snapshots are logged for the match
+    indexes, see ``log_feature_changes``.
+    """
+    everyone = employees is None
+    employees = Employee.objects.all() if employees is None else employees
+    ids = employees.values('pk')
+    skills = _grouped(
+        Employee.skill.through.objects.filter(employee_id__in=ids).values_list('employee_id', 'skill_id')
+    )
+    interests = _grouped(
+        Employee.interests.through.objects.filter(employee_id__in=ids).values_list('employee_id', 'profileinterest_id')
+    )
+    languages = _languages(
+        EmployeeLanguage.objects.filter(employee_id__in=ids).values_list('employee_id', 'language_id', 'mastery')
+    )
+
+    snapshots = []
+    for employee_id, is_active, function_id, contract_type_id, latitude, longitude in Employee.objects.filter(
+        pk__in=ids
+    ).values_list('id', 'user__is_active', 'function_id', 'contract_type_id', 'latitude', 'longitude'):
+        language_ids, language_masteries = languages.get(employee_id, ([], []))
+        coordinates = _coordinates(latitude, longitude) or (None, None)
+        snapshots.append(EmployeeFeatures(
+            employee_id=employee_id,
+            is_active=bool(is_active),
+            skill_ids=skills.get(employee_id, []),
+            language_ids=language_ids,
+            language_masteries=language_masteries,
+            interest_ids=interests.get(employee_id, []),
+            function_id=function_id,
+            contract_type_id=contract_type_id,
+            latitude=coordinates[0],
+            longitude=coordinates[1],
+        ))
+    EmployeeFeatures.objects.bulk_create(
+        snapshots,
+        update_conflicts=True,
+        unique_fields=['employee'],
+        update_fields=EMPLOYEE_FEATURE_FIELDS,
+    )
+    log_feature_changes('employee', None if everyone else [snapshot.employee_id for snapshot in snapshots])
+    return len(snapshots)
+
+
+def refresh_vacancy_features(vacancies: QuerySet = None) -> int:
+    """Rebuild the feature snapshots of the given vacancies, or of all of them."""
+    everyone = vacancies is None
+    vacancies = Vacancy.objects.all() if vacancies is None else vacancies
+    ids = vacancies.values('pk')
+    skills = _grouped(
+        Vacancy.skill.through.objects.filter(vacancy_id__in=ids).values_list('vacancy_id', 'skill_id')
+    )
+    contract_types = _grouped(
+        Vacancy.contract_type.through.objects.filter(vacancy_id__in=ids).values_list('vacancy_id', 'contracttype_id')
+    )
+    languages = _languages(
+        Vacancy.languages.through.objects.filter(vacancy_id__in=ids).values_list(
+            'vacancy_id', 'vacancylanguage__language_id', 'vacancylanguage__mastery'
+        ),
+        duplicates=True,
+    )
+
+    snapshots = []
+    for vacancy_id, function_id, mastery, *coordinates in Vacancy.objects.filter(pk__in=ids).values_list(
+        'id', 'function_id', 'expected_mastery', 'latitude', 'longitude', 'company__latitude', 'company__longitude'
+    ):
+        language_ids, language_masteries = languages.get(vacancy_id, ([], []))
+        # A vacancy without its own location is where its company is
+        location = _coordinates(*coordinates[:2]) or _coordinates(*coordinates[2:]) or (None, None)
+        snapshots.append(VacancyFeatures(
+            vacancy_id=vacancy_id,
+            skill_ids=skills.get(vacancy_id, []),
+            language_ids=language_ids,
+            language_masteries=language_masteries,
+            contract_type_ids=contract_types.get(vacancy_id, []),
+            function_id=function_id,
+            mastery_level=mastery.lower() if mastery else None,
+            latitude=location[0],
+            longitude=location[1],
+        ))
+    VacancyFeatures.objects.bulk_create(
+        snapshots,
+        update_conflicts=True,
+        unique_fields=['vacancy'],
+        update_fields=VACANCY_FEATURE_FIELDS,
+    )
+    log_feature_changes('vacancy', None if everyone else [snapshot.vacancy_id for snapshot in snapshots])
+    return len(snapshots)
+
+
+def refresh_stale_features() -> tuple:
+    """
+    Rebuild the snapshots that are missing or older than their row, e.g.
+    after bulk inserts or queryset updates that bypass the signals.
+    Returns the number of employee and vacancy snapshots rebuilt.
+    """
+    employees = Employee.objects.filter(
+        Q(features__isnull=True) |
+        Q(features__updated_at__lt=F('updated_at'))
+    )
+    vacancies = Vacancy.objects.filter(
+        Q(features__isnull=True) |
+        Q(features__updated_at__lt=F('updated_at')) |
+        Q(features__updated_at__lt=F('company__updated_at'))
+    )
+    return (
+        refresh_employee_features(employees) if employees.exists() else 0,
+        refresh_vacancy_features(vacancies) if vacancies.exists() else 0,
+    )
@@ -0,0 +1,56 @@
+from typing import Iterable
+
+from django.core.cache import cache
+from django.db.models import QuerySet
+from common.pagination import KeysetPagination
+from .models import AISuggestion, SuggestionGenerationLog
+
+FEED_CACHE_KEY = 'suggestions:feed:{user_id}:{stamp}'
+
+
+class SuggestionFeedPagination(KeysetPagination):
+    """Keyset pagination of suggestions, best first."""
+    ordering = ('-total_score', '-id')
+
+
+def suggestions_for(user) -> QuerySet:
+    """
+    Return the suggestions a user may see: their own as an employee, those
+    of the vacancies of their companies as an employer, or all as staff.
+    """
+    queryset = AISuggestion.objects.all()
+    if user.role == 'employee':
+        return queryset.filter(employee__user=user)
+    if user.role == 'employer':
+        # Employers are linked to their companies through CompanyUser
+        return queryset.filter(vacancy__company__companyuser__user=user)
+    if user.is_staff:
+        return queryset
+    return queryset.none()
+
+
+def run_stamp() -> str:
+    """Return a stamp of the latest completed generation run."""
+    run = (
+        SuggestionGenerationLog.objects.filter(completed_at__isnull=False)
+        .order_by('-completed_at')
+        .values_list('pk', 'completed_at')
+        .first()
+    )
+    return f'{run[0]}.{run[1].timestamp()}' if run else 'none'
+
+
+def feed_cache_key(user) -> str:
+    """
+    Return the cache key of a user's suggestion feed.
+
+    The key contains the latest completed generation run, so cached feeds
+    are invalidated as soon as a run completes, in every process.
+    """
+    return FEED_CACHE_KEY.format(user_id=user.pk, stamp=run_stamp())
+
+
+def invalidate_feeds(user_ids: Iterable[int]) -> None:
+    """Drop the cached feeds of the given users, after their suggestions changed outside a run."""
+    stamp = run_stamp()
+    cache.delete_many([FEED_CACHE_KEY.format(user_id=user_id, stamp=stamp) for user_id in user_ids])
@@ -0,0 +1,410 @@
+import time
+from bisect import bisect_left, insort
+from collections import defaultdict
+from contextlib import contextmanager
+from threading import Lock
+from typing import List, Dict, Any, Iterable, Iterator
+
+from common.geo import GridIndex
+from .conf import get_setting
+from .features import feature_change_sequence, feature_changes, refresh_stale_features
+from .models import EmployeeFeatures, VacancyFeatures
+from .scoring import MAX_DISTANCE_KM, distance_score
+from .skill_weights import clear_function_skill_weights, get_function_skill_weights
+from .weights import WeightProfile
+
+EMPLOYEE_COLUMNS = ('employee_id', 'skill_ids', 'language_ids', 'language_masteries', 'latitude', 'longitude')
+VACANCY_COLUMNS = (
+    'vacancy_id', 'function_id', 'mastery_level', 'skill_ids', 'language_ids', 'language_masteries',
+    'latitude', 'longitude',
+)
+# Past this many changed rows, rebuilding the index is cheaper than updating it row by row
+MAX_INDEX_UPDATE = 1000
+
+
+def _discard(postings: dict, key, row_id) -> None:
+    """Drop a row from the posting list of a key, and the list once it is empty."""
+    rows = postings.get(key)
+    if rows is None:
+        return
+    if isinstance(rows, dict):
+        rows.pop(row_id, None)
+    else:
+        rows.discard(row_id)
+    if not rows:
+        del postings[key]
+
+
+def _remove_id(ids: List[int], row_id: int) -> bool:
+    """Remove an id from a sorted list; returns whether it was there."""
+    position = bisect_left(ids, row_id)
+    if position < len(ids) and ids[position] == row_id:
+        del ids[position]
+        return True
+    return False
+
+
+class MatchIndex:
+    """
+    In-memory inverted index of the quantitative matching data.
+
+    Skills and languages are keyed by id and map to posting lists of the
+    vacancies that require them and the active employees that have them.
+    Overlap counting for one employee walks the posting lists of that
+    employee's skills and languages instead of scanning every vacancy.
+
+    Vacancies are also bucketed in a spatial grid on their own coordinates,
+    or their company's, and employees on theirs, so distance scores only
+    look at nearby rows.
+
+    The index is built from the ``EmployeeFeatures`` and ``VacancyFeatures``
+    snapshots, with a fixed number of queries independent of the number of
+    employees and vacancies, and updated row by row from the snapshots that
+    changed since; see ``match_index``. With the ``FUNCTION_SKILL_WEIGHTS``
+    setting the required skills of a vacancy carry the ``FunctionSkill``
+    weights of its function.
+    """
+
+    def __init__(self):
+        # Sequence number of the last snapshot change the index holds
+        self.sequence = None
+
+        # skill_id -> {ids}; language_id -> {id: mastery value}, or for
+        # vacancies {id: [mastery values]} since a language can be required twice
+        self.vacancies_by_skill = defaultdict(set)
+        self.employees_by_skill = defaultdict(set)
+        self.vacancies_by_language = defaultdict(dict)
+        self.employees_by_language = defaultdict(dict)
+
+        # Forward maps with mastery values, used for profiles and score denominators
+        self.employee_skills = {}
+        self.employee_languages = {}
+        self.vacancy_skills = {}
+        self.vacancy_languages = {}
+        self.vacancy_functions = {}
+        # vacancy_id -> {skill_id: weight}, only when skills are weighted
+        self.vacancy_skill_weights = {}
+        # vacancy_id -> expected mastery, and its row in a WeightProfile
+        self.vacancy_masteries = {}
+        self.vacancy_levels = {}
+
+        # id -> (latitude, longitude), for the rows that have coordinates
+        self.employee_coordinates = {}
+        self.vacancy_coordinates = {}
+        self.vacancy_grid = GridIndex()
+        self.employee_grid = GridIndex()
+
+        # Sorted ids of the indexed rows
+        self.employee_ids = []
+        self.vacancy_ids = []
+        # Vacancies without a skill or language requirement score on that part for everyone
+        self.open_vacancy_ids = set()
+
+    @classmethod
+    def build(cls) -> 'MatchIndex':
+        # Snapshots missed by the signals are brought up to date first
+        refresh_stale_features()
+
+        index = cls()
+        index.sequence = feature_change_sequence()
+        index.add_employees(
+            EmployeeFeatures.objects.filter(is_active=True).order_by('employee_id').values_list(*EMPLOYEE_COLUMNS)
+        )
+        index.add_vacancies(VacancyFeatures.objects.order_by('vacancy_id').values_list(*VACANCY_COLUMNS))
+        return index
+
+    def add_employees(self, rows: Iterable[tuple]) -> None:
+        """Add employees from ``EMPLOYEE_COLUMNS`` rows of their snapshots."""
+        for employee_id, skill_ids, language_ids, masteries, latitude, longitude in rows:
+            insort(self.employee_ids, employee_id)
+            if latitude is not None and longitude is not None:
+                self.employee_coordinates[employee_id] = (latitude, longitude)
+                self.employee_grid.add(employee_id, latitude, longitude)
+            self.employee_skills[employee_id] = list(skill_ids)
+            for skill_id in skill_ids:
+                self.employees_by_skill[skill_id].add(employee_id)
+            self.employee_languages[employee_id] = dict(zip(language_ids, masteries))
+            for language_id, mastery in zip(language_ids, masteries):
+                self.employees_by_language[language_id][employee_id] = mastery
+
+    def remove_employee(self, employee_id: int) -> None:
+        if not _remove_id(self.employee_ids, employee_id):
+            return
+        coordinates = self.employee_coordinates.pop(employee_id, None)
+        if coordinates is not None:
+            self.employee_grid.remove(employee_id, *coordinates)
+        for skill_id in self.employee_skills.pop(employee_id):
+            _discard(self.employees_by_skill, skill_id, employee_id)
+        for language_id in self.employee_languages.pop(employee_id):
+            _discard(self.employees_by_language, language_id, employee_id)
+
+    def update_employees(self, employee_ids: Iterable[int]) -> None:
+        """Reload employees from their snapshots; deleted and inactive employees leave the index."""
+        employee_ids = list(employee_ids)
+        for employee_id in employee_ids:
+            self.remove_employee(employee_id)
+        self.add_employees(
+            EmployeeFeatures.objects.filter(employee_id__in=employee_ids, is_active=True).values_list(*EMPLOYEE_COLUMNS)
+        )
+
+    def add_vacancies(self, rows: Iterable[tuple]) -> None:
+        """Add vacancies from ``VACANCY_COLUMNS`` rows of their snapshots."""
+        function_weights = get_function_skill_weights() if get_setting('FUNCTION_SKILL_WEIGHTS') else None
+        for vacancy_id, function_id, level, skill_ids, language_ids, masteries, latitude, longitude in rows:
+            insort(self.vacancy_ids, vacancy_id)
+            self.vacancy_functions[vacancy_id] = function_id
+            self.vacancy_masteries[vacancy_id] = level
+            self.vacancy_levels[vacancy_id] = WeightProfile.level(level)
+            if latitude is not None and longitude is not None:
+                self.vacancy_coordinates[vacancy_id] = (latitude, longitude)
+                self.vacancy_grid.add(vacancy_id, latitude, longitude)
+            self.vacancy_skills[vacancy_id] = list(skill_ids)
+            for skill_id in skill_ids:
+                self.vacancies_by_skill[skill_id].add(vacancy_id)
+            self.vacancy_languages[vacancy_id] = list(zip(language_ids, masteries))
+            for language_id, mastery in zip(language_ids, masteries):
+                self.vacancies_by_language[language_id].setdefault(vacancy_id, []).append(mastery)
+            if function_weights is not None and skill_ids:
+                self.vacancy_skill_weights[vacancy_id] = dict(zip(
+                    skill_ids, function_weights.weights(function_id, skill_ids)
+                ))
+            if not language_ids or not self.required_skill_weight(vacancy_id):
+                self.open_vacancy_ids.add(vacancy_id)
+
+    def remove_vacancy(self, vacancy_id: int) -> None:
+        if not _remove_id(self.vacancy_ids, vacancy_id):
+            return
+        coordinates = self.vacancy_coordinates.pop(vacancy_id, None)
+        if coordinates is not None:
+            self.vacancy_grid.remove(vacancy_id, *coordinates)
+        for skill_id in self.vacancy_skills.pop(vacancy_id):
+            _discard(self.vacancies_by_skill, skill_id, vacancy_id)
+        for language_id, _ in self.vacancy_languages.pop(vacancy_id):
+            _discard(self.vacancies_by_language, language_id, vacancy_id)
+        for forward in (self.vacancy_functions, self.vacancy_masteries, self.vacancy_levels, self.vacancy_skill_weights):
+            forward.pop(vacancy_id, None)
+        self.open_vacancy_ids.discard(vacancy_id)
+
+    def update_vacancies(self, vacancy_ids: Iterable[int]) -> None:
+        """Reload vacancies from their snapshots; deleted vacancies leave the index."""
+        vacancy_ids = list(vacancy_ids)
+        for vacancy_id in vacancy_ids:
+            self.remove_vacancy(vacancy_id)
+        self.add_vacancies(VacancyFeatures.objects.filter(vacancy_id__in=vacancy_ids).values_list(*VACANCY_COLUMNS))
+
+    def skill_weight(self, vacancy_id: int, skill_id: int) -> float:
+        return self.vacancy_skill_weights.get(vacancy_id, {}).get(skill_id, 1)
+
+    def required_skill_weight(self, vacancy_id: int) -> float:
+        """Return the total weight of a vacancy's required skills."""
+        return sum(self.skill_weight(vacancy_id, skill_id) for skill_id in self.vacancy_skills.get(vacancy_id, []))
+
+    def employee_profile(self, employee_id: int) -> Dict[str, Any]:
+        """Return the quantitative profile of an employee, keyed by ids."""
+        return {
+            'languages': [
+                {'language': language_id, 'mastery': mastery}
+                for language_id, mastery in self.employee_languages.get(employee_id, {}).items()
+            ],
+            'skills': list(self.employee_skills.get(employee_id, [])),
+            'coordinates': self.employee_coordinates.get(employee_id),
+        }
+
+    def vacancy_profile(self, vacancy_id: int) -> Dict[str, Any]:
+        """Return the quantitative profile of a vacancy, keyed by ids."""
+        profile = {
+            'languages': [
+                {'language': language_id, 'mastery': mastery}
+                for language_id, mastery in self.vacancy_languages.get(vacancy_id, [])
+            ],
+            'skills': list(self.vacancy_skills.get(vacancy_id, [])),
+            'coordinates': self.vacancy_coordinates.get(vacancy_id),
+            'mastery': self.vacancy_masteries.get(vacancy_id),
+        }
+        if vacancy_id in self.vacancy_skill_weights:
+            profile['skill_weights'] = self.vacancy_skill_weights[vacancy_id]
+        return profile
+
+    def vacancy_overlap(self, employee_id: int) -> Dict[int, int]:
+        """Count the skills and languages each vacancy shares with an employee."""
+        overlap = defaultdict(int)
+        for skill_id in self.employee_skills.get(employee_id, []):
+            for vacancy_id in self.vacancies_by_skill.get(skill_id, ()):
+                overlap[vacancy_id] += 1
+        for language_id in self.employee_languages.get(employee_id, {}):
+            for vacancy_id in self.vacancies_by_language.get(language_id, {}):
+                overlap[vacancy_id] += 1
+        return dict(overlap)
+
+    def employee_overlap(self, vacancy_id: int) -> Dict[int, int]:
+        """Count the skills and languages each active employee shares with a vacancy."""
+        overlap = defaultdict(int)
+        for skill_id in self.vacancy_skills.get(vacancy_id, []):
+            for employee_id in self.employees_by_skill.get(skill_id, ()):
+                overlap[employee_id] += 1
+        for language_id in {language_id for language_id, _ in self.vacancy_languages.get(vacancy_id, [])}:
+            for employee_id in self.employees_by_language.get(language_id, {}):
+                overlap[employee_id] += 1
+        return dict(overlap)
+
+    def matches_for_employee(self, employee_id: int, profile: WeightProfile, limit: int = None) -> List[tuple]:
+        """
+        Return (vacancy_id, quantitative score) pairs for an employee, best first.
+
+        Scores are those of ``QuantitativeScorer.quantitative_scores``. Only
+        vacancies sharing a skill or language, within reach, or missing one
+        kind of requirement altogether, are scored; every other vacancy
+        scores 0 and is left out.
+        """
+        # Sum of min(100, employee / required * 100) per vacancy language requirement
+        language_totals = defaultdict(float)
+        for language_id, value in self.employee_languages.get(employee_id, {}).items():
+            for vacancy_id, requirements in self.vacancies_by_language.get(language_id, {}).items():
+                for required in requirements:
+                    language_totals[vacancy_id] += min(100, value / required * 100)
+        skill_matches = defaultdict(float)
+        for skill_id in set(self.employee_skills.get(employee_id, [])):
+            for vacancy_id in self.vacancies_by_skill.get(skill_id, ()):
+                skill_matches[vacancy_id] += self.skill_weight(vacancy_id, skill_id)
+
+        distance_scores = {}
+        if employee_id in self.employee_coordinates:
+            coordinates = self.employee_coordinates[employee_id]
+            for vacancy_id, distance in self.vacancy_grid.within(*coordinates, MAX_DISTANCE_KM):
+                distance_scores[vacancy_id] = distance_score(distance)
+
+        candidates = set(language_totals) | set(skill_matches) | set(distance_scores) | self.open_vacancy_ids
+
+        matches = []
+        for vacancy_id in candidates:
+            score = self.weighted_score(
+                vacancy_id, profile,
+                distance_scores.get(vacancy_id, 0), language_totals[vacancy_id], skill_matches[vacancy_id],
+            )
+            if score > 0:
+                matches.append((vacancy_id, score))
+
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches[:limit] if limit else matches
+
+    def matches_for_vacancy(self, vacancy_id: int, profile: WeightProfile, limit: int = None) -> List[tuple]:
+        """
+        Return (employee_id, quantitative score) pairs for a vacancy, best first.
+
+        The counterpart of ``matches_for_employee``: only active employees
+        sharing a skill or language or within reach are scored, unless the
+        vacancy lacks one kind of requirement and every employee matches it.
+        """
+        if vacancy_id not in self.vacancy_levels:
+            return []
+
+        language_totals = defaultdict(float)
+        for language_id, required in self.vacancy_languages.get(vacancy_id, []):
+            for employee_id, value in self.employees_by_language.get(language_id, {}).items():
+                language_totals[employee_id] += min(100, value / required * 100)
+        skill_matches = defaultdict(float)
+        for skill_id in set(self.vacancy_skills.get(vacancy_id, [])):
+            for employee_id in self.employees_by_skill.get(skill_id, ()):
+                skill_matches[employee_id] += self.skill_weight(vacancy_id, skill_id)
+
+        distance_scores = {}
+        if vacancy_id in self.vacancy_coordinates:
+            coordinates = self.vacancy_coordinates[vacancy_id]
+            for employee_id, distance in self.employee_grid.within(*coordinates, MAX_DISTANCE_KM):
+                distance_scores[employee_id] = distance_score(distance)
+
+        if vacancy_id in self.open_vacancy_ids:
+            candidates = self.employee_ids
+        else:
+            candidates = set(language_totals) | set(skill_matches) | set(distance_scores)
+
+        matches = []
+        for employee_id in candidates:
+            score = self.weighted_score(
+                vacancy_id, profile,
+                distance_scores.get(employee_id, 0), language_totals[employee_id], skill_matches[employee_id],
+            )
+            if score > 0:
+                matches.append((employee_id, score))
+
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches[:limit] if limit else matches
+
+    def weighted_score(self, vacancy_id: int, profile: WeightProfile, distance: float,
+                       language_total: float, skill_match: float) -> float:
+        """
+        Combine the distance score of a pair with its summed language scores
+        and matched skill weight into the quantitative score, weighted for
+        the vacancy's mastery level; 0 when all weights are 0.
+        """
+        required_languages = len(self.vacancy_languages.get(vacancy_id, []))
+        required_skills = self.required_skill_weight(vacancy_id)
+        language_score = language_total / required_languages if required_languages else 100
+        skills_score = skill_match / required_skills * 100 if required_skills else 100
+        distance_weight, language_weight, skills_weight = profile.matrix[self.vacancy_levels[vacancy_id], :3]
+        total_weight = distance_weight + language_weight + skills_weight
+        if not total_weight:
+            return 0
+        return (
+            distance * distance_weight +
+            language_score * language_weight +
+            skills_score * skills_weight
+        ) / total_weight
+
+
+_index = None
+_index_lock = Lock()
+# Monotonic time the snapshots were last checked for rows that changed without signals
+_stale_checked_at = 0.0
+
+
+def _current_match_index() -> MatchIndex:
+    global _index, _stale_checked_at
+    if _index is not None and time.monotonic() - _stale_checked_at >= get_setting('STALE_FEATURES_CHECK_INTERVAL'):
+        # The rebuilt snapshots are logged and so picked up below
+        refresh_stale_features()
+        _stale_checked_at = time.monotonic()
+    sequence = feature_change_sequence()
+    if _index is not None and _index.sequence != sequence:
+        changes = feature_changes(_index.sequence, sequence)
+        employee_ids, vacancy_ids = set(), set()
+        for kind, ids in changes or []:
+            if ids is None:
+                # Every snapshot of a kind was rebuilt
+                changes = None
+                break
+            (employee_ids if kind == 'employee' else vacancy_ids).update(ids)
+        if changes is None or len(employee_ids) + len(vacancy_ids) > MAX_INDEX_UPDATE:
+            _index = None
+        else:
+            if vacancy_ids:
+                # FunctionSkill changes in other processes also show up as vacancy changes
+                clear_function_skill_weights()
+            _index.update_employees(employee_ids)
+            _index.update_vacancies(vacancy_ids)
+            _index.sequence = sequence
+    if _index is None:
+        clear_function_skill_weights()
+        _index = MatchIndex.build()
+        _stale_checked_at = time.monotonic()
+    return _index
+
+
+@contextmanager
+def match_index() -> Iterator[MatchIndex]:
+    """
+    Hold the process-wide match index for the duration of a block.
+
+    Feature snapshots log the employees and vacancies they rebuild, on
+    profile, company location and user activity changes alike, so the
+    index reloads just those rows from their snapshots. Checking for
+    changes is a single cache lookup. Rows changed without signals, by
+    queryset updates or bulk inserts, are looked for every
+    ``STALE_FEATURES_CHECK_INTERVAL`` seconds. The index is only rebuilt on
+    first use, when changes are no longer logged, or when more than
+    ``MAX_INDEX_UPDATE`` rows changed at once.
+
+    Updates happen in place, so the index is only used while holding it.
+    """
+    with _index_lock:
+        yield _current_match_index()
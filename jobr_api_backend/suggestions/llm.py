@@ -0,0 +1,258 @@
+import hashlib
+import json
+import math
+import re
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .conf import get_setting
+
+
+SYSTEM_PROMPT = "You are an expert HR professional. Always respond with a Score and Explanation."
+BATCH_SYSTEM_PROMPT = "You are an expert HR professional. Always respond with a JSON array of scores and explanations."
+
+BATCH_ITEM_RE = re.compile(r'^\s*Vacancy (\d+):$', re.MULTILINE)
+
+
+def build_prompt(employee_data: Dict[str, Any], vacancy_data: Dict[str, Any]) -> str:
+    """Build the match prompt for one employee/vacancy pair."""
+    return f"""
+        You are an expert HR professional. Analyze the following employee and vacancy data and provide:
+        1. A match score (0-100) - this must be a number between 0 and 100, nothing else
+        2. A brief explanation of why this match would be good or not good.
+
+        Employee:
+        - Biography: {employee_data['biography']}
+        - Interests: {', '.join(employee_data['interests'])}
+        - Education: {employee_data['education']}
+
+        Vacancy:
+        - Description: {vacancy_data['description']}
+        - Questions: {', '.join(vacancy_data['questions'])}
+        - Company Description: {vacancy_data['company_description']}
+
+        You must respond in exactly this format:
+        Score: [a number between 0 and 100]
+        Explanation: [your explanation]
+
+        If you cannot determine a score, use 50 as a default score.
+        """
+
+
+def format_employee(employee_data: Dict[str, Any]) -> str:
+    return (
+        f"- Biography: {employee_data['biography']}\n"
+        f"- Interests: {', '.join(employee_data['interests'])}\n"
+        f"- Education: {employee_data['education']}"
+    )
+
+
+def format_vacancy(vacancy_data: Dict[str, Any]) -> str:
+    return (
+        f"- Description: {vacancy_data['description']}\n"
+        f"- Questions: {', '.join(vacancy_data['questions'])}\n"
+        f"- Company Description: {vacancy_data['company_description']}"
+    )
+
+
+def build_batch_prompt(employee_data: Dict[str, Any], vacancies_data: List[Dict[str, Any]]) -> str:
+    """Build one match prompt for an employee and several vacancies, numbered from 1."""
+    vacancies = '\n\n'.join(
+        f"Vacancy {number}:\n{format_vacancy(vacancy_data)}"
+        for number, vacancy_data in enumerate(vacancies_data, start=1)
+    )
+    return f"""You are an expert HR professional. Analyze how well the following employee matches each of the vacancies below. For every vacancy provide:
+1. A match score (0-100) - this must be a number between 0 and 100, nothing else
+2. A brief explanation of why this match would be good or not good.
+
+Employee:
+{format_employee(employee_data)}
+
+{vacancies}
+
+You must respond with only a JSON array holding one object per vacancy, in exactly this format:
+[{{"vacancy": 1, "score": <a number between 0 and 100>, "explanation": "<your explanation>"}}]
+
+If you cannot determine a score for a vacancy, use 50 as its score.
+"""
+
+
+def parse_batch_response(text: str, count: int) -> Dict[int, Tuple[float, str]]:
+    """
+    Extract the (score, explanation) per vacancy from a batched LLM response,
+    keyed by the 0-based position of the vacancy in the prompt.
+
+    Vacancies that are missing, repeated or have no numeric score are left
+    out, so the caller can score them separately.
+    """
+    start, end = text.find('['), text.rfind(']')
+    try:
+        items = json.loads(text[start:end + 1]) if 0 <= start < end else []
+    except ValueError:
+        print(f"    Warning: Could not parse batched response: {text}")
+        items = []
+
+    scores = {}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        try:
+            index = int(item['vacancy']) - 1
+            score = float(item['score'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if not 0 <= index < count or index in scores or math.isnan(score):
+            continue
+        explanation = str(item.get('explanation') or 'No detailed explanation available')
+        scores[index] = (max(0, min(100, score)), explanation)
+    return scores
+
+
+def parse_response(text: str) -> Tuple[float, str]:
+    """Extract the score and explanation from an LLM response."""
+    # Extract score
+    try:
+        score_line = next((line for line in text.split('\n') if line.startswith('Score:')), 'Score: 50')
+        score_text = score_line.split(':')[1].strip()
+        score = float(score_text)
+        # Ensure score is between 0 and 100
+        score = max(0, min(100, score))
+    except (ValueError, IndexError):
+        print(f"    Warning: Could not parse score from response: {text}")
+        score = 50.0
+
+    # Extract explanation
+    try:
+        explanation_line = next((line for line in text.split('\n') if line.startswith('Explanation:')), 'Explanation: No detailed explanation available')
+        explanation = explanation_line.split(':')[1].strip()
+    except (ValueError, IndexError):
+        explanation = "No detailed explanation available"
+
+    return score, explanation
+
+
+class LLMBackend(ABC):
+    """
+    Interface for the language model used in qualitative scoring.
+
+    Backends receive a system prompt and a user prompt and return the raw
+    completion text. They must be safe to call from multiple threads.
+    """
+    model = None
+
+    @abstractmethod
+    def complete(self, system_prompt: str, prompt: str, timeout: float) -> str:
+        """Return the completion of a prompt, raising on failure."""
+
+
+class OpenAIBackend(LLMBackend):
+    """Backend calling the OpenAI chat completions API."""
+
+    def __init__(self, model: str = None):
+        import openai
+        from jobr_api_backend.my_secrets import open_ai_key
+
+        self.model = model or get_setting('LLM_MODEL')
+        # Retries are handled by complete_with_retry
+        self.client = openai.OpenAI(api_key=open_ai_key, max_retries=0)
+
+    def complete(self, system_prompt: str, prompt: str, timeout: float) -> str:
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            timeout=timeout,
+        )
+        return response.choices[0].message.content
+
+
+class StubBackend(LLMBackend):
+    """
+    Deterministic local backend for tests and benchmarks.
+
+    The score is derived from a hash of the prompt, so the same pair always
+    gets the same score without any network access.
+    """
+    model = 'stub'
+
+    def complete(self, system_prompt: str, prompt: str, timeout: float) -> str:
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        if system_prompt == BATCH_SYSTEM_PROMPT:
+            return json.dumps([
+                {
+                    'vacancy': int(number),
+                    'score': int(digest[:8], 16) * int(number) % 101,
+                    'explanation': f'Stub score for vacancy {number} of prompt {digest[:8]}',
+                }
+                for number in BATCH_ITEM_RE.findall(prompt)
+            ])
+        return f"Score: {int(digest[:8], 16) % 101}\nExplanation: Stub score for prompt {digest[:8]}"
+
+
+@lru_cache(maxsize=None)
+def get_backend() -> LLMBackend:
+    """Return the process-wide backend configured in ``SUGGESTIONS['LLM_BACKEND']``."""
+    return import_string(get_setting('LLM_BACKEND'))()
+
+
+@receiver(setting_changed)
+def reset_backend(setting, **kwargs):
+    if setting == 'SUGGESTIONS':
+        get_backend.cache_clear()
+
+
+def complete_with_retry(backend: LLMBackend, system_prompt: str, prompt: str) -> str:
+    """
+    Call the backend with a per-call timeout, retrying failed calls with
+    exponential backoff. The last error is raised when all retries fail.
+    """
+    max_retries = get_setting('LLM_MAX_RETRIES')
+    backoff = get_setting('LLM_RETRY_BACKOFF')
+    timeout = get_setting('LLM_TIMEOUT')
+
+    for attempt in range(max_retries + 1):
+        try:
+            return backend.complete(system_prompt, prompt, timeout)
+        except Exception as e:
+            if attempt == max_retries:
+                raise
+            delay = backoff * 2 ** attempt
+            print(f"    LLM call failed ({str(e)}), retrying in {delay}s")
+            time.sleep(delay)
+
+
+class ConcurrentScorer:
+    """
+    Run a scoring function over many inputs on a thread pool.
+
+    At most ``max_in_flight`` calls run or wait at the same time, so inputs
+    are consumed lazily and memory stays bounded for large pair streams.
+    Results are yielded in completion order together with their key.
+    """
+
+    def __init__(self, max_in_flight: int = None):
+        self.max_in_flight = max_in_flight or get_setting('LLM_MAX_IN_FLIGHT')
+
+    def map(self, fn: Callable, items: Iterable[Tuple[Any, tuple]]) -> Iterator[Tuple[Any, Any]]:
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            pending = {}
+            for key, args in items:
+                if len(pending) >= self.max_in_flight:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield pending.pop(future), future.result()
+                pending[executor.submit(fn, *args)] = key
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
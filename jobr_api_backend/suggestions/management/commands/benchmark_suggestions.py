@@ -0,0 +1,178 @@
+import json
+import os
+import random
+import resource
+import sys
+import time
+from contextlib import redirect_stdout
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from accounts.models import CustomUser, Employee, EmployeeLanguage, Company
+from vacancies.models import (
+    Vacancy, VacancyLanguage, VacancyQuestion, Skill, Language, Function, FunctionSkill, ProfileInterest
+)
+from suggestions.services import SuggestionService
+
+EMPLOYEE_MASTERIES = ['beginner', 'intermediate', 'advanced', 'native']
+VACANCY_MASTERIES = ['Beginner', 'Intermediate', 'Advanced', 'Expert']
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident set size of this process in megabytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark suggestion generation on a synthetic population with the stub LLM backend '
+        'and print the results as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=200, help='Number of synthetic employees')
+        parser.add_argument('--vacancies', type=int, default=200, help='Number of synthetic vacancies')
+        parser.add_argument('--skills', type=int, default=50, help='Number of synthetic skills')
+        parser.add_argument('--languages', type=int, default=10, help='Number of synthetic languages')
+        parser.add_argument('--functions', type=int, default=10, help='Number of synthetic functions')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed of the synthetic population')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        # A run scores every employee and vacancy, so real rows would be rescored
+        # along with the synthetic ones and skew the measurements
+        if Employee.objects.exists() or Vacancy.objects.exists():
+            raise CommandError('The benchmark needs a database without employees or vacancies')
+        rng = random.Random(options['seed'])
+
+        # The stub backend scores instantly, so the benchmark measures our own overhead
+        suggestions = {
+            **getattr(settings, 'SUGGESTIONS', {}),
+            'LLM_BACKEND': 'suggestions.llm.StubBackend',
+            'LLM_CACHE': False,
+            'LLM_RETRY_BACKOFF': 0,
+        }
+        with transaction.atomic(), override_settings(SUGGESTIONS=suggestions):
+            seed_start = time.perf_counter()
+            self.seed(rng, options)
+            seed_seconds = time.perf_counter() - seed_start
+
+            # Keep the per-pair progress output of the run out of the report
+            with open(os.devnull, 'w') as devnull, \
+                    redirect_stdout(devnull if options['verbosity'] < 2 else sys.stdout):
+                start = time.perf_counter()
+                with CaptureQueriesContext(connection) as queries:
+                    log = SuggestionService.generate_suggestions(full=True)
+                seconds = time.perf_counter() - start
+
+            # The synthetic population and its suggestions are never kept
+            transaction.set_rollback(True)
+
+        pairs = log.suggestions_created + log.suggestions_updated + log.pairs_pruned + log.pairs_deferred
+        report = {
+            'population': {
+                name: options[name] for name in ('employees', 'vacancies', 'skills', 'languages', 'functions', 'seed')
+            },
+            'pairs': pairs,
+            'llm_pairs': log.suggestions_created + log.suggestions_updated,
+            'pairs_pruned': log.pairs_pruned,
+            'seconds': round(seconds, 4),
+            'seed_seconds': round(seed_seconds, 4),
+            'pairs_per_second': round(pairs / seconds, 1) if seconds else None,
+            'queries': len(queries),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            'stage_seconds': {stage: round(value, 4) for stage, value in sorted(log.stage_seconds.items())},
+        }
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def seed(self, rng, options):
+        """Create the synthetic population with a few bulk inserts per model."""
+        skills = Skill.objects.bulk_create(
+            Skill(name=f'Benchmark skill {i}') for i in range(options['skills'])
+        )
+        languages = Language.objects.bulk_create(
+            Language(name=f'Benchmark language {i}') for i in range(options['languages'])
+        )
+        interests = ProfileInterest.objects.bulk_create(
+            ProfileInterest(name=f'Benchmark interest {i}') for i in range(10)
+        )
+        functions = Function.objects.bulk_create(
+            Function(name=f'Benchmark function {i}') for i in range(options['functions'])
+        )
+        FunctionSkill.objects.bulk_create(
+            FunctionSkill(function=function, skill=skill, weight=rng.randint(0, 10))
+            for function in functions
+            for skill in rng.sample(skills, min(len(skills), 5))
+        )
+
+        # Users are inserted in bulk, so their employee profiles are created explicitly
+        users = CustomUser.objects.bulk_create(
+            CustomUser(
+                username=f'benchmark-{i}@example.com',
+                email=f'benchmark-{i}@example.com',
+                password='!',
+                role='employee',
+            )
+            for i in range(options['employees'])
+        )
+        employees = Employee.objects.bulk_create(
+            Employee(user=user, biography=f'Synthetic employee {i}') for i, user in enumerate(users)
+        )
+        Employee.skill.through.objects.bulk_create(
+            Employee.skill.through(employee=employee, skill=skill)
+            for employee in employees
+            for skill in rng.sample(skills, min(len(skills), rng.randint(0, 8)))
+        )
+        Employee.interests.through.objects.bulk_create(
+            Employee.interests.through(employee=employee, profileinterest=interest)
+            for employee in employees
+            for interest in rng.sample(interests, rng.randint(0, 3))
+        )
+        EmployeeLanguage.objects.bulk_create(
+            EmployeeLanguage(employee=employee, language=language, mastery=rng.choice(EMPLOYEE_MASTERIES))
+            for employee in employees
+            for language in rng.sample(languages, min(len(languages), rng.randint(0, 3)))
+        )
+
+        company = Company.objects.create(name='Benchmark Company', description='Synthetic company')
+        vacancies = Vacancy.objects.bulk_create(
+            Vacancy(
+                company=company,
+                title=f'Synthetic vacancy {i}',
+                description=f'Synthetic vacancy description {i}',
+                function=rng.choice(functions) if functions else None,
+            )
+            for i in range(options['vacancies'])
+        )
+        Vacancy.skill.through.objects.bulk_create(
+            Vacancy.skill.through(vacancy=vacancy, skill=skill)
+            for vacancy in vacancies
+            for skill in rng.sample(skills, min(len(skills), rng.randint(1, 6)))
+        )
+        questions = VacancyQuestion.objects.bulk_create(
+            VacancyQuestion(question=f'Synthetic question {i}') for i in range(len(vacancies))
+        )
+        Vacancy.questions.through.objects.bulk_create(
+            Vacancy.questions.through(vacancy=vacancy, vacancyquestion=question)
+            for vacancy, question in zip(vacancies, questions)
+        )
+        requirements = [
+            (vacancy, VacancyLanguage(language=language, mastery=rng.choice(VACANCY_MASTERIES)))
+            for vacancy in vacancies
+            for language in rng.sample(languages, min(len(languages), rng.randint(0, 2)))
+        ]
+        VacancyLanguage.objects.bulk_create(requirement for _, requirement in requirements)
+        Vacancy.languages.through.objects.bulk_create(
+            Vacancy.languages.through(vacancy=vacancy, vacancylanguage=requirement)
+            for vacancy, requirement in requirements
+        )
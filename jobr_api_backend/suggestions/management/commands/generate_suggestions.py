@@ -1,17 +1,64 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from suggestions.services import SuggestionService
 
 
+def parse_shard(value):
+    """Parse a shard given as 'index/count', e.g. '0/4' for the first of four shards."""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise CommandError(f"Invalid shard '{value}', expected the form i/N")
+    if count < 1 or not 0 <= index < count:
+        raise CommandError(f"Invalid shard '{value}', expected 0 <= i < N")
+    return index, count
+
+
 class Command(BaseCommand):
     help = 'Generate AI suggestions for all employees and vacancies'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Rescore all pairs instead of only those changed since the last successful run',
+        )
+        parser.add_argument(
+            '--shard',
+            help='Only process shard i of N of the employees, given as i/N (e.g. 0/4)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Split the run over this many worker processes',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue the last run from its checkpoints if it failed',
+        )
+
     def handle(self, *args, **options):
+        shard = parse_shard(options['shard']) if options['shard'] else None
+        workers = options['workers']
+        if workers < 1:
+            raise CommandError('--workers must be at least 1')
+        if shard and workers > 1:
+            raise CommandError('--shard and --workers cannot be combined')
+        if options['full'] and options['resume']:
+            raise CommandError('--full and --resume cannot be combined')
+
         self.stdout.write('Starting suggestion generation...')
-        
+
         try:
-            SuggestionService.generate_suggestions()
-            self.stdout.write(self.style.SUCCESS('Successfully generated suggestions'))
+            log = SuggestionService.generate_suggestions(
+                full=options['full'], shard=shard, workers=workers, resume=options['resume']
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'Successfully generated suggestions '
+                f'({log.suggestions_created} created, {log.suggestions_updated} updated)'
+            ))
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f'Error generating suggestions: {str(e)}')
-            )
\ No newline at end of file
+            )
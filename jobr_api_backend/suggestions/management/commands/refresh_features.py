@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from suggestions.features import refresh_employee_features, refresh_stale_features, refresh_vacancy_features
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the employee and vacancy feature snapshots used for matching'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stale',
+            action='store_true',
+            help='Only rebuild snapshots that are missing or older than their employee or vacancy',
+        )
+
+    def handle(self, *args, **options):
+        if options['stale']:
+            employees, vacancies = refresh_stale_features()
+        else:
+            employees, vacancies = refresh_employee_features(), refresh_vacancy_features()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt the features of {employees} employees and {vacancies} vacancies'
+        ))
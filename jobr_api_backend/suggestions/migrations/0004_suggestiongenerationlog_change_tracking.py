@@ -0,0 +1,44 @@
+# Generated by Django 5.1.3 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("suggestions", "0003_suggestiongenerationlog_alter_aisuggestion_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="suggestiongenerationlog",
+            name="suggestions_updated",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="suggestiongenerationlog",
+            name="is_full_rebuild",
+            field=models.BooleanField(
+                default=False,
+                help_text="Whether all pairs were rescored instead of only changed ones",
+            ),
+        ),
+        migrations.AddField(
+            model_name="suggestiongenerationlog",
+            name="watermark",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Profiles changed after this moment are rescored by the next run",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="suggestiongenerationlog",
+            name="weights",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Suggestion weights used in this run; a change triggers a full rescore",
+            ),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.1.3 on 2026-10-17 11:40
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("suggestions", "0004_suggestiongenerationlog_change_tracking"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LLMScoreCache",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "key",
+                    models.CharField(
+                        help_text="SHA-256 of the model name and prompt",
+                        max_length=64,
+                        unique=True,
+                    ),
+                ),
+                ("model", models.CharField(max_length=100)),
+                (
+                    "score",
+                    models.FloatField(
+                        validators=[
+                            django.core.validators.MinValueValidator(0),
+                            django.core.validators.MaxValueValidator(100),
+                        ]
+                    ),
+                ),
+                ("explanation", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "last_used_at",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        db_index=True,
+                        help_text="Least recently used entries are evicted first",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "LLM Score Cache Entry",
+                "verbose_name_plural": "LLM Score Cache",
+            },
+        ),
+        migrations.AddField(
+            model_name="suggestiongenerationlog",
+            name="llm_cache_hits",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="suggestiongenerationlog",
+            name="llm_cache_misses",
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.3 on 2026-10-17 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("suggestions", "0005_llmscorecache_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="suggestiongenerationlog",
+            name="pairs_pruned",
+            field=models.IntegerField(
+                default=0,
+                help_text="Changed pairs skipped by candidate retrieval instead of being sent to the LLM",
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-17 02:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suggestions', '0006_suggestiongenerationlog_pairs_pruned'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='suggestiongenerationlog',
+            name='changed_since',
+            field=models.DateTimeField(blank=True, help_text='Watermark of the run this one continued from; empty for a full rebuild', null=True),
+        ),
+        migrations.AddField(
+            model_name='suggestiongenerationlog',
+            name='shard_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='suggestiongenerationlog',
+            name='shard_index',
+            field=models.PositiveIntegerField(blank=True, help_text='Shard of the employees covered by this run; empty when it covered all of them', null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-17 02:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suggestions', '0007_suggestiongenerationlog_shards'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='suggestiongenerationlog',
+            name='stage_seconds',
+            field=models.JSONField(blank=True, default=dict, help_text='Seconds spent per stage of the run, summed over its shards'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.3 on 2026-10-17 02:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suggestions', '0008_suggestiongenerationlog_stage_seconds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='suggestiongenerationlog',
+            name='resumed_from',
+            field=models.ForeignKey(blank=True, help_text='Failed run this one continued from its checkpoints', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='resumes', to='suggestions.suggestiongenerationlog'),
+        ),
+        migrations.CreateModel(
+            name='SuggestionCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard_index', models.PositiveIntegerField()),
+                ('shard_count', models.PositiveIntegerField()),
+                ('last_employee_id', models.IntegerField(help_text='Every employee of the shard up to this id has been scored')),
+                ('pairs_done', models.IntegerField(default=0, help_text='Pairs written by this shard so far')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('log', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints', to='suggestions.suggestiongenerationlog')),
+            ],
+            options={
+                'verbose_name': 'Suggestion Checkpoint',
+                'verbose_name_plural': 'Suggestion Checkpoints',
+                'ordering': ['log', 'shard_index'],
+                'unique_together': {('log', 'shard_index', 'shard_count')},
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.3 on 2026-10-17 02:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0048_employee_coordinates'),
+        ('suggestions', '0009_suggestioncheckpoint'),
+        ('vacancies', '0029_vacancy_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeFeatures',
+            fields=[
+                ('employee', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='features', serialize=False, to='accounts.employee')),
+                ('is_active', models.BooleanField(default=True)),
+                ('skill_ids', models.JSONField(default=list)),
+                ('language_ids', models.JSONField(default=list)),
+                ('language_masteries', models.JSONField(default=list)),
+                ('interest_ids', models.JSONField(default=list)),
+                ('function_id', models.IntegerField(blank=True, null=True)),
+                ('contract_type_id', models.IntegerField(blank=True, null=True)),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Employee Features',
+                'verbose_name_plural': 'Employee Features',
+            },
+        ),
+        migrations.CreateModel(
+            name='VacancyFeatures',
+            fields=[
+                ('vacancy', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='features', serialize=False, to='vacancies.vacancy')),
+                ('skill_ids', models.JSONField(default=list)),
+                ('language_ids', models.JSONField(default=list)),
+                ('language_masteries', models.JSONField(default=list)),
+                ('contract_type_ids', models.JSONField(default=list)),
+                ('function_id', models.IntegerField(blank=True, null=True)),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Vacancy Features',
+                'verbose_name_plural': 'Vacancy Features',
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.3 on 2026-10-17 02:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0048_employee_coordinates'),
+        ('suggestions', '0010_feature_snapshots'),
+        ('vacancies', '0029_vacancy_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aisuggestion',
+            index=models.Index(fields=['employee', '-total_score', '-id'], name='suggestion_employee_feed'),
+        ),
+        migrations.AddIndex(
+            model_name='aisuggestion',
+            index=models.Index(fields=['vacancy', '-total_score', '-id'], name='suggestion_vacancy_feed'),
+        ),
+        migrations.AddIndex(
+            model_name='aisuggestion',
+            index=models.Index(fields=['-total_score', '-id'], name='suggestion_feed'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.3 on 2026-10-17 02:44
+
+from django.db import migrations, models
+
+
+def drop_vacancy_features(apps, schema_editor):
+    # Snapshots without the new field are rebuilt by the next match index build
+    apps.get_model('suggestions', 'VacancyFeatures').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('suggestions', '0011_suggestion_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacancyfeatures',
+            name='mastery_level',
+            field=models.CharField(blank=True, help_text='Expected mastery of the vacancy, lowercased; selects its suggestion weights', max_length=20, null=True),
+        ),
+        migrations.RunPython(drop_vacancy_features, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.3 on 2026-10-17 02:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0048_employee_coordinates'),
+        ('suggestions', '0012_vacancyfeatures_mastery_level'),
+        ('vacancies', '0029_vacancy_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='suggestiongenerationlog',
+            name='llm_calls',
+            field=models.IntegerField(default=0, help_text='LLM calls made within the budget of this run'),
+        ),
+        migrations.AddField(
+            model_name='suggestiongenerationlog',
+            name='llm_tokens',
+            field=models.IntegerField(default=0, help_text='Estimated tokens of the LLM calls made in this run'),
+        ),
+        migrations.AddField(
+            model_name='suggestiongenerationlog',
+            name='pairs_deferred',
+            field=models.IntegerField(default=0, help_text='Pairs left to the next run because the LLM budget ran out'),
+        ),
+        migrations.CreateModel(
+            name='DeferredPair',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('priority', models.FloatField(help_text='Priority of the pair when it was deferred')),
+                ('deferred_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deferred_pairs', to='accounts.employee')),
+                ('log', models.ForeignKey(blank=True, help_text='Run that last deferred this pair', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deferred_pairs', to='suggestions.suggestiongenerationlog')),
+                ('vacancy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deferred_pairs', to='vacancies.vacancy')),
+            ],
+            options={
+                'verbose_name': 'Deferred Pair',
+                'verbose_name_plural': 'Deferred Pairs',
+                'ordering': ['-priority'],
+                'unique_together': {('employee', 'vacancy')},
+            },
+        ),
+    ]
@@ -41,6 +41,12 @@ class AISuggestion(models.Model):
         verbose_name = 'AI Suggestion'
         verbose_name_plural = 'AI Suggestions'
         unique_together = ['employee', 'vacancy']
+        indexes = [
+            # Keyset pagination of the suggestion feeds, best first
+            models.Index(fields=['employee', '-total_score', '-id'], name='suggestion_employee_feed'),
+            models.Index(fields=['vacancy', '-total_score', '-id'], name='suggestion_vacancy_feed'),
+            models.Index(fields=['-total_score', '-id'], name='suggestion_feed'),
+        ]
 
     def __str__(self):
         return f'Match: {self.employee} - {self.vacancy} (Score: {self.total_score})'
@@ -120,8 +126,65 @@ class SuggestionGenerationLog(models.Model):
     started_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     suggestions_created = models.IntegerField(default=0)
+    suggestions_updated = models.IntegerField(default=0)
+    llm_cache_hits = models.IntegerField(default=0)
+    llm_cache_misses = models.IntegerField(default=0)
+    pairs_pruned = models.IntegerField(
+        default=0,
+        help_text='Changed pairs skipped by candidate retrieval instead of being sent to the LLM'
+    )
+    llm_calls = models.IntegerField(
+        default=0,
+        help_text='LLM calls made within the budget of this run'
+    )
+    llm_tokens = models.IntegerField(
+        default=0,
+        help_text='Estimated tokens of the LLM calls made in this run'
+    )
+    pairs_deferred = models.IntegerField(
+        default=0,
+        help_text='Pairs left to the next run because the LLM budget ran out'
+    )
     error_message = models.TextField(blank=True, null=True)
     is_successful = models.BooleanField(default=False)
+    is_full_rebuild = models.BooleanField(
+        default=False,
+        help_text='Whether all pairs were rescored instead of only changed ones'
+    )
+    watermark = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='Profiles changed after this moment are rescored by the next run'
+    )
+    weights = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text='Suggestion weights used in this run; a change triggers a full rescore'
+    )
+    changed_since = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='Watermark of the run this one continued from; empty for a full rebuild'
+    )
+    shard_index = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text='Shard of the employees covered by this run; empty when it covered all of them'
+    )
+    shard_count = models.PositiveIntegerField(null=True, blank=True)
+    stage_seconds = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text='Seconds spent per stage of the run, summed over its shards'
+    )
+    resumed_from = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='resumes',
+        help_text='Failed run this one continued from its checkpoints'
+    )
 
     class Meta:
         ordering = ['-started_at']
@@ -131,3 +194,184 @@ class SuggestionGenerationLog(models.Model):
     def __str__(self):
         status = 'Successful' if self.is_successful else 'Failed'
         return f'Generation on {self.started_at.date()} - {status}'
+
+    @property
+    def pairs_done(self) -> int:
+        return sum(checkpoint.pairs_done for checkpoint in self.checkpoints.all())
+
+
+class SuggestionCheckpoint(models.Model):
+    """
+    Progress of one shard of a suggestion generation run.
+
+    Employees are processed in id order, so every employee of the shard up
+    to ``last_employee_id`` has had all of its pairs written. A resumed run
+    skips those employees.
+    """
+    log = models.ForeignKey(
+        SuggestionGenerationLog,
+        on_delete=models.CASCADE,
+        related_name='checkpoints'
+    )
+    shard_index = models.PositiveIntegerField()
+    shard_count = models.PositiveIntegerField()
+    last_employee_id = models.IntegerField(
+        help_text='Every employee of the shard up to this id has been scored'
+    )
+    pairs_done = models.IntegerField(
+        default=0,
+        help_text='Pairs written by this shard so far'
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['log', 'shard_index']
+        verbose_name = 'Suggestion Checkpoint'
+        verbose_name_plural = 'Suggestion Checkpoints'
+        unique_together = ['log', 'shard_index', 'shard_count']
+
+    def __str__(self):
+        return f'Run {self.log_id} shard {self.shard_index}/{self.shard_count}: employee {self.last_employee_id}'
+
+    def covers(self, employee_id: int) -> bool:
+        """Whether the given employee belongs to this shard and was already scored."""
+        return employee_id % self.shard_count == self.shard_index and employee_id <= self.last_employee_id
+
+
+class DeferredPair(models.Model):
+    """
+    Pair that was due for an LLM score but did not fit in the budget of a run.
+
+    The next run scores it, highest priority first like any other pending
+    pair, even if neither profile changed since.
+    """
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name='deferred_pairs'
+    )
+    vacancy = models.ForeignKey(
+        Vacancy,
+        on_delete=models.CASCADE,
+        related_name='deferred_pairs'
+    )
+    log = models.ForeignKey(
+        SuggestionGenerationLog,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='deferred_pairs',
+        help_text='Run that last deferred this pair'
+    )
+    priority = models.FloatField(
+        help_text='Priority of the pair when it was deferred'
+    )
+    deferred_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-priority']
+        verbose_name = 'Deferred Pair'
+        verbose_name_plural = 'Deferred Pairs'
+        unique_together = ['employee', 'vacancy']
+
+    def __str__(self):
+        return f'{self.employee} - {self.vacancy}: {self.priority:.1f}'
+
+
+class LLMScoreCache(models.Model):
+    """
+    Persistent cache of LLM match scores keyed by a hash of the exact prompt
+    and model, so unchanged pairs are not sent to the LLM again.
+    """
+    key = models.CharField(
+        max_length=64,
+        unique=True,
+        help_text='SHA-256 of the model name and prompt'
+    )
+    model = models.CharField(max_length=100)
+    score = models.FloatField(
+        validators=[MinValueValidator(0), MaxValueValidator(100)]
+    )
+    explanation = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        help_text='Least recently used entries are evicted first'
+    )
+
+    class Meta:
+        verbose_name = 'LLM Score Cache Entry'
+        verbose_name_plural = 'LLM Score Cache'
+
+    def __str__(self):
+        return f'{self.model} {self.key[:12]}: {self.score}'
+
+
+class EmployeeFeatures(models.Model):
+    """
+    Denormalized snapshot of the matching features of an employee.
+
+    Related rows are stored as sorted id arrays, with the language masteries
+    as numeric values parallel to ``language_ids``, so all employees can be
+    loaded with one scan of this table. Kept current by the suggestion
+    signals and refreshed when older than the employee.
+    """
+    employee = models.OneToOneField(
+        Employee,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='features'
+    )
+    is_active = models.BooleanField(default=True)
+    skill_ids = models.JSONField(default=list)
+    language_ids = models.JSONField(default=list)
+    language_masteries = models.JSONField(default=list)
+    interest_ids = models.JSONField(default=list)
+    function_id = models.IntegerField(null=True, blank=True)
+    contract_type_id = models.IntegerField(null=True, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Employee Features'
+        verbose_name_plural = 'Employee Features'
+
+    def __str__(self):
+        return f'Features of employee {self.employee_id}'
+
+
+class VacancyFeatures(models.Model):
+    """
+    Denormalized snapshot of the matching features of a vacancy, stored like
+    ``EmployeeFeatures``. The coordinates are the vacancy's own or else its
+    company's.
+    """
+    vacancy = models.OneToOneField(
+        Vacancy,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='features'
+    )
+    skill_ids = models.JSONField(default=list)
+    language_ids = models.JSONField(default=list)
+    language_masteries = models.JSONField(default=list)
+    contract_type_ids = models.JSONField(default=list)
+    function_id = models.IntegerField(null=True, blank=True)
+    mastery_level = models.CharField(
+        max_length=20,
+        null=True,
+        blank=True,
+        help_text='Expected mastery of the vacancy, lowercased; selects its suggestion weights'
+    )
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Vacancy Features'
+        verbose_name_plural = 'Vacancy Features'
+
+    def __str__(self):
+        return f'Features of vacancy {self.vacancy_id}'
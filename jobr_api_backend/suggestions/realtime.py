@@ -0,0 +1,196 @@
+"""
+Score a changed employee or vacancy against its best candidates right after
+the change, instead of waiting for the next generation run.
+
+Jobs run on a thread pool inside the web process that enqueued them. They
+are not persisted: jobs still queued or running when the process stops are
+lost, and each process loads its own match index. Nothing is missed for
+good, since the next generation run rescores the changed rows, but
+deployments with many web workers may prefer ``REALTIME_WORKERS = 0`` or
+turning ``REALTIME_SCORING`` off and relying on the runs.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from threading import Lock
+from typing import List, Tuple
+
+from django.db import close_old_connections, transaction
+from accounts.models import CompanyUser, Employee
+from vacancies.models import Vacancy
+from .cache import ScoreCache
+from .conf import get_setting
+from .feed import invalidate_feeds
+from .index import match_index
+from .llm import SYSTEM_PROMPT, ConcurrentScorer, build_prompt, get_backend
+from .services import LLM_FALLBACK_SCORE, SuggestionService
+from .text import employee_text, text_similarity, vacancy_text
+from .weights import QUANTITATIVE_FIELDS, get_weight_profile
+from .writer import SuggestionWriter
+
+
+def score_pairs(pairs: List[Tuple[int, int, float]]) -> int:
+    """
+    Score (employee_id, vacancy_id, quantitative score) pairs and upsert
+    their suggestions, the way a generation run does. Returns the number of
+    suggestions written.
+
+    Cached LLM scores are looked up and stored around the concurrent LLM
+    calls, so the worker threads never touch the database.
+    """
+    if not pairs:
+        return 0
+    employees = Employee.objects.select_related('user').prefetch_related('interests').in_bulk(
+        {employee_id for employee_id, _, _ in pairs}
+    )
+    vacancies = Vacancy.objects.select_related('company').prefetch_related('questions', 'descriptions').in_bulk(
+        {vacancy_id for _, vacancy_id, _ in pairs}
+    )
+    pairs = [pair for pair in pairs if pair[0] in employees and pair[1] in vacancies]
+    employee_data = {pk: SuggestionService.get_employee_data(employee) for pk, employee in employees.items()}
+    vacancy_data = {pk: SuggestionService.get_vacancy_data(vacancy) for pk, vacancy in vacancies.items()}
+
+    text_proxy = get_setting('TEXT_PROXY')
+    backend = get_backend()
+    cache = ScoreCache() if get_setting('LLM_CACHE') and not text_proxy else None
+    known = {}
+    keys = {}
+    if text_proxy:
+        rows = {pk: row for row, pk in enumerate(employees)}
+        cols = {pk: col for col, pk in enumerate(vacancies)}
+        similarity = text_similarity(
+            [employee_text(employee) for employee in employees.values()],
+            [vacancy_text(vacancy) for vacancy in vacancies.values()],
+        )
+        for employee_id, vacancy_id, _ in pairs:
+            known[employee_id, vacancy_id] = SuggestionService.get_text_proxy_score(
+                similarity[rows[employee_id], cols[vacancy_id]]
+            )
+    elif cache is not None:
+        for employee_id, vacancy_id, _ in pairs:
+            keys[employee_id, vacancy_id] = ScoreCache.make_key(
+                backend.model, SYSTEM_PROMPT, build_prompt(employee_data[employee_id], vacancy_data[vacancy_id])
+            )
+        cached = cache.get_many(keys.values())
+        known = {pair: cached[key] for pair, key in keys.items() if key in cached}
+
+    def score_pair(employee_id, vacancy_id):
+        if (employee_id, vacancy_id) in known:
+            return known[employee_id, vacancy_id]
+        return SuggestionService.get_llm_score(employee_data[employee_id], vacancy_data[vacancy_id], backend)
+
+    profile = get_weight_profile()
+    new_cache_entries = {}
+    with SuggestionWriter() as writer:
+        results = ConcurrentScorer().map(score_pair, ((pair, pair[:2]) for pair in pairs))
+        for (employee_id, vacancy_id, quantitative_score), (qualitative_score, explanation) in results:
+            if cache is not None and (employee_id, vacancy_id) not in known and (
+                (qualitative_score, explanation) != LLM_FALLBACK_SCORE
+            ):
+                new_cache_entries[keys[employee_id, vacancy_id]] = (backend.model, qualitative_score, explanation)
+            quantitative_weight, qualitative_weight = profile.weights_for(
+                vacancies[vacancy_id].expected_mastery
+            )[len(QUANTITATIVE_FIELDS):].tolist()
+            total_score = (
+                quantitative_score * quantitative_weight +
+                qualitative_score * qualitative_weight
+            ) / (quantitative_weight + qualitative_weight)
+            writer.add(employee_id, vacancy_id, quantitative_score, qualitative_score, total_score, explanation)
+    if new_cache_entries:
+        cache.set_many(new_cache_entries)
+
+    # Cached feeds of the employees and of the employers of the vacancies are outdated
+    user_ids = {employees[employee_id].user_id for employee_id, _, _ in pairs}
+    user_ids.update(CompanyUser.objects.filter(
+        company_id__in={vacancies[vacancy_id].company_id for _, vacancy_id, _ in pairs}
+    ).values_list('user_id', flat=True))
+    invalidate_feeds(user_ids)
+    return writer.created + writer.updated
+
+
+def score_employee(employee_id: int) -> int:
+    """
+    Score an active employee against its best candidate vacancies in the
+    match index. The employee is reloaded in the index first, so the job
+    matches its latest snapshot without waiting for the logged change.
+    """
+    if not Employee.objects.filter(pk=employee_id, user__is_active=True).exists():
+        return 0
+    with match_index() as index:
+        index.update_employees([employee_id])
+        matches = index.matches_for_employee(
+            employee_id, get_weight_profile(), get_setting('CANDIDATES_PER_EMPLOYEE')
+        )
+    return score_pairs([(employee_id, vacancy_id, score) for vacancy_id, score in matches])
+
+
+def score_vacancy(vacancy_id: int) -> int:
+    """Score a vacancy, reloaded in the match index first, against its best candidate employees."""
+    with match_index() as index:
+        index.update_vacancies([vacancy_id])
+        matches = index.matches_for_vacancy(
+            vacancy_id, get_weight_profile(), get_setting('CANDIDATES_PER_VACANCY')
+        )
+    return score_pairs([(employee_id, vacancy_id, score) for employee_id, score in matches])
+
+
+JOBS = {
+    'employee': score_employee,
+    'vacancy': score_vacancy,
+}
+
+# Jobs submitted to the executor that have not started yet
+_queued = set()
+_queued_lock = Lock()
+
+
+@lru_cache(maxsize=None)
+def get_executor() -> ThreadPoolExecutor:
+    """Return the process-wide pool of ``REALTIME_WORKERS`` threads running scoring jobs."""
+    return ThreadPoolExecutor(max_workers=get_setting('REALTIME_WORKERS'), thread_name_prefix='suggestions')
+
+
+def run_job(kind: str, pk: int, background: bool = False) -> None:
+    if background:
+        with _queued_lock:
+            _queued.discard((kind, pk))
+        # Worker threads keep their own connections, which may have gone stale
+        close_old_connections()
+    try:
+        count = JOBS[kind](pk)
+        print(f"Real-time scoring of {kind} {pk}: {count} suggestions written")
+    except Exception as e:
+        print(f"Error in real-time scoring of {kind} {pk}: {str(e)}")
+    finally:
+        if background:
+            close_old_connections()
+
+
+def submit(kind: str, pk: int) -> None:
+    """Run a scoring job on the executor, or right away without ``REALTIME_WORKERS``."""
+    if not get_setting('REALTIME_WORKERS'):
+        run_job(kind, pk)
+        return
+    with _queued_lock:
+        # A job that has not started yet will see this change as well
+        if (kind, pk) in _queued:
+            return
+        _queued.add((kind, pk))
+    get_executor().submit(run_job, kind, pk, True)
+
+
+def enqueue(kind: str, pk: int) -> None:
+    """
+    Score an employee or vacancy in the background once the current
+    transaction commits, so the job sees the committed changes and the
+    request does not wait for it.
+    """
+    if get_setting('REALTIME_SCORING'):
+        transaction.on_commit(lambda: submit(kind, pk))
+
+
+def enqueue_employee_scoring(employee_id: int) -> None:
+    enqueue('employee', employee_id)
+
+
+def enqueue_vacancy_scoring(vacancy_id: int) -> None:
+    enqueue('vacancy', vacancy_id)
@@ -0,0 +1,103 @@
+import heapq
+import math
+from datetime import datetime
+from itertools import count
+from typing import Any, Iterator, List, Optional, Tuple
+
+# Rough size of a "Score: ...\nExplanation: ..." completion, and of one
+# vacancy's object in a batched JSON completion
+ESTIMATED_RESPONSE_TOKENS = 150
+ESTIMATED_BATCH_ITEM_TOKENS = 80
+
+
+def estimate_tokens(*texts: str, response_tokens: int = ESTIMATED_RESPONSE_TOKENS) -> int:
+    """Estimate the tokens of an LLM call from its prompt texts, at about four characters per token."""
+    return sum(math.ceil(len(text) / 4) for text in texts) + response_tokens
+
+
+def recency(changed_at: datetime, now: datetime, half_life_days: float) -> float:
+    """Return 100 for a profile changed just now, halving every ``half_life_days``."""
+    age_days = max((now - changed_at).total_seconds(), 0) / 86400
+    return 100 * 0.5 ** (age_days / half_life_days)
+
+
+class LLMScheduler:
+    """
+    Priority queue of the pairs waiting for an LLM call, drained within a budget.
+
+    Pairs are pushed with a priority and an estimated token cost. ``drain``
+    yields them highest priority first, skipping the pairs that would exceed
+    the call or token budget; those are returned by ``deferred``.
+    A budget of None is unlimited, and without any budget pairs are not
+    queued at all, so they stream to the LLM as they are produced.
+
+    With a ``batch_size`` above 1, pairs of the same ``group`` share calls:
+    a pair that finds no started batch of its group with room left opens a
+    new one, costing a call and the ``batch_tokens`` sent once per call, and
+    the next pairs of the group join it for their own tokens only.
+    """
+
+    def __init__(self, max_calls: Optional[int] = None, max_tokens: Optional[int] = None, batch_size: int = 1):
+        self.max_calls = max_calls
+        self.max_tokens = max_tokens
+        self.batch_size = batch_size
+        self.calls = 0
+        self.tokens = 0
+        self.heap = []
+        # Pairs of equal priority keep their push order
+        self.order = count()
+        # Pairs that can still join the last started batch of every group
+        self.open_slots = {}
+
+    def __len__(self):
+        return len(self.heap)
+
+    @property
+    def unlimited(self) -> bool:
+        return self.max_calls is None and self.max_tokens is None
+
+    def cost(self, tokens: float, batch_tokens: float = 0, group: Any = None) -> Tuple[float, int]:
+        """Return the (tokens, calls) that scoring one more pair would cost."""
+        if group is not None and self.open_slots.get(group):
+            return tokens, 0
+        return tokens + batch_tokens, 1
+
+    def fits(self, tokens: float, calls: int = 1) -> bool:
+        """Whether spending the given cost stays within the budget."""
+        if self.max_calls is not None and self.calls + calls > self.max_calls:
+            return False
+        return self.max_tokens is None or self.tokens + tokens <= self.max_tokens
+
+    def spend(self, tokens: float, batch_tokens: float = 0, group: Any = None) -> None:
+        """Account for scoring one more pair."""
+        tokens, calls = self.cost(tokens, batch_tokens, group)
+        if group is not None:
+            self.open_slots[group] = self.batch_size - 1 if calls else self.open_slots[group] - 1
+        self.calls += calls
+        self.tokens += tokens
+
+    def push(self, priority: float, tokens: float, item: Any, batch_tokens: float = 0, group: Any = None) -> None:
+        heapq.heappush(self.heap, (-priority, next(self.order), (tokens, batch_tokens, group), item))
+
+    def drain(self) -> Iterator[Any]:
+        """
+        Yield the queued pairs highest priority first as long as they fit in
+        the budget. Lower priority pairs that still fit once a pair did not,
+        e.g. cheaper ones or ones joining a started batch, are yielded too.
+        """
+        skipped = []
+        while self.heap:
+            entry = heapq.heappop(self.heap)
+            if self.fits(*self.cost(*entry[2])):
+                self.spend(*entry[2])
+                yield entry[3]
+            else:
+                skipped.append(entry)
+        # Popped in order, so the skipped pairs still form a heap
+        self.heap = skipped
+
+    def deferred(self) -> List[Tuple[float, Any]]:
+        """Remove and return the (priority, pair) left over after ``drain``."""
+        left = [(-priority, item) for priority, _, _, item in sorted(self.heap)]
+        self.heap = []
+        return left
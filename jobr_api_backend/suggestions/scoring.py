@@ -0,0 +1,292 @@
+from typing import Callable, List, Dict, Any, Hashable
+
+import numpy as np
+from scipy import sparse
+from common.geo import GridIndex
+
+
+MASTERY_VALUES = {
+    'beginner': 25,
+    'intermediate': 50,
+    'advanced': 75,
+    'native': 100,
+    'expert': 100,
+}
+
+
+# Distances at or beyond this score 0
+MAX_DISTANCE_KM = 100
+
+
+def distance_score(distance_km: float) -> float:
+    """Convert a distance to a score: 100 next door, falling linearly to 0 at MAX_DISTANCE_KM."""
+    return max(0, 100 - (distance_km / MAX_DISTANCE_KM) * 100)
+
+
+def mastery_value(mastery) -> int:
+    """
+    Convert a mastery label to its numeric value.
+
+    Employee languages use lowercase labels ('native') while vacancy
+    languages use ``MasteryOption`` values ('Expert'), so the lookup is
+    case-insensitive and treats 'expert' as the highest level. Numeric
+    values, as stored in feature snapshots, are returned as they are.
+    """
+    if isinstance(mastery, (int, float)):
+        return mastery
+    return MASTERY_VALUES[mastery.lower()]
+
+
+class QuantitativeScorer:
+    """
+    Batch scoring engine for the quantitative part of the suggestion algorithm.
+
+    Employees and vacancies are encoded once as sparse matrices over a shared
+    vocabulary of languages and skills, after which the language and skills
+    scores for every employee × vacancy pair are computed with a handful of
+    matrix products. The results are identical to
+    ``SuggestionService.calculate_language_score`` and
+    ``SuggestionService.calculate_skills_score`` applied pair by pair.
+
+    Profiles are plain dictionaries in the same shape the per-pair functions
+    expect:
+        {'languages': [{'language': ..., 'mastery': ...}], 'skills': [...]}
+    A vacancy profile may also carry ``'skill_weights': {skill: weight}`` to
+    weigh its required skills, as ``calculate_skills_score`` does. Profiles
+    with ``'coordinates': (latitude, longitude)`` are scored on distance;
+    pairs missing coordinates on either side score 0 there. The expected
+    ``'mastery'`` of a vacancy profile selects its weights.
+
+    The score methods take ``rows``, a slice or an array of employee
+    positions, to compute only those rows of the matrix.
+    """
+
+    def __init__(self, employee_profiles: List[Dict[str, Any]], vacancy_profiles: List[Dict[str, Any]]):
+        self.n_employees = len(employee_profiles)
+        self.n_vacancies = len(vacancy_profiles)
+        self.vacancy_masteries = [profile.get('mastery') for profile in vacancy_profiles]
+        self._encode_languages(employee_profiles, vacancy_profiles)
+        self._encode_skills(employee_profiles, vacancy_profiles)
+        self._encode_distances(employee_profiles, vacancy_profiles)
+
+    @staticmethod
+    def _vocabulary(values) -> Dict[Hashable, int]:
+        vocabulary = {}
+        for value in values:
+            vocabulary.setdefault(value, len(vocabulary))
+        return vocabulary
+
+    def _encode_languages(self, employee_profiles, vacancy_profiles):
+        vocabulary = self._vocabulary(
+            lang['language']
+            for profile in employee_profiles + vacancy_profiles
+            for lang in profile['languages']
+        )
+        n_languages = max(len(vocabulary), 1)
+
+        # Employee mastery matrix (employees × languages). Duplicate entries for
+        # the same language keep the highest mastery, which is what the per-pair
+        # "best match" loop selects.
+        mastery = {}
+        for row, profile in enumerate(employee_profiles):
+            for lang in profile['languages']:
+                key = (row, vocabulary[lang['language']])
+                mastery[key] = max(mastery.get(key, 0), mastery_value(lang['mastery']))
+        self.employee_languages = self._csr(mastery, (self.n_employees, n_languages))
+
+        # One requirement count matrix (languages × vacancies) per required
+        # mastery level, so a requirement repeated on a vacancy counts twice
+        # in the average just like in the per-pair loop.
+        requirements = {}
+        required_counts = np.zeros(self.n_vacancies)
+        for col, profile in enumerate(vacancy_profiles):
+            for lang in profile['languages']:
+                level = mastery_value(lang['mastery'])
+                counts = requirements.setdefault(level, {})
+                key = (vocabulary[lang['language']], col)
+                counts[key] = counts.get(key, 0) + 1
+                required_counts[col] += 1
+        self.language_requirements = {
+            level: self._csr(counts, (n_languages, self.n_vacancies))
+            for level, counts in requirements.items()
+        }
+        self.required_language_counts = required_counts
+
+    def _encode_skills(self, employee_profiles, vacancy_profiles):
+        vocabulary = self._vocabulary(
+            skill
+            for profile in employee_profiles + vacancy_profiles
+            for skill in profile['skills']
+        )
+        n_skills = max(len(vocabulary), 1)
+
+        # Employees are binary: the per-pair function intersects sets. Vacancy
+        # entries hold the skill weight, 1 unless the profile weighs its skills.
+        self.employee_skills = self._csr(
+            {(row, vocabulary[skill]): 1 for row, profile in enumerate(employee_profiles) for skill in profile['skills']},
+            (self.n_employees, n_skills),
+        )
+        self.vacancy_skills = self._csr(
+            {
+                (vocabulary[skill], col): self._skill_weight(profile, skill)
+                for col, profile in enumerate(vacancy_profiles) for skill in profile['skills']
+            },
+            (n_skills, self.n_vacancies),
+        )
+        # The denominator is the weight of the vacancy's skill list, duplicates included.
+        self.required_skill_counts = np.array(
+            [sum(self._skill_weight(profile, skill) for skill in profile['skills']) for profile in vacancy_profiles],
+            dtype=float
+        )
+
+    def _encode_distances(self, employee_profiles, vacancy_profiles):
+        # Only vacancies in grid cells near an employee can score above 0, so
+        # the haversine distance is computed for those pairs only.
+        grid = GridIndex()
+        for col, profile in enumerate(vacancy_profiles):
+            if profile.get('coordinates'):
+                grid.add(col, *profile['coordinates'])
+
+        scores = {}
+        if len(grid):
+            for row, profile in enumerate(employee_profiles):
+                if profile.get('coordinates'):
+                    for col, distance in grid.within(*profile['coordinates'], MAX_DISTANCE_KM):
+                        scores[(row, col)] = distance_score(distance)
+        self.distance_score_matrix = self._csr(scores, (self.n_employees, self.n_vacancies))
+
+    @staticmethod
+    def _skill_weight(profile, skill) -> float:
+        return profile.get('skill_weights', {}).get(skill, 1)
+
+    @staticmethod
+    def _csr(entries: Dict[tuple, float], shape: tuple) -> sparse.csr_matrix:
+        if not entries:
+            return sparse.csr_matrix(shape, dtype=float)
+        rows, cols = zip(*entries.keys())
+        return sparse.csr_matrix((list(entries.values()), (rows, cols)), shape=shape, dtype=float)
+
+    @staticmethod
+    def _rows(matrix, rows: slice):
+        return matrix if rows is None else matrix[rows]
+
+    def language_scores(self, rows=None) -> np.ndarray:
+        """Return the language score matrix (employees × vacancies)."""
+        employee_languages = self._rows(self.employee_languages, rows)
+        totals = np.zeros((employee_languages.shape[0], self.n_vacancies))
+
+        for level, requirement_counts in self.language_requirements.items():
+            # min(100, employee / required * 100) for every spoken language;
+            # unspoken languages stay 0 so the matrix remains sparse.
+            level_scores = employee_languages.multiply(100 / level)
+            level_scores.data = np.minimum(level_scores.data, 100)
+            totals += (level_scores @ requirement_counts).toarray()
+
+        required = self.required_language_counts
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = totals / required
+        scores[:, required == 0] = 100
+        return scores
+
+    def skills_scores(self, rows=None) -> np.ndarray:
+        """Return the skills score matrix (employees × vacancies)."""
+        employee_skills = self._rows(self.employee_skills, rows)
+        matched = (employee_skills @ self.vacancy_skills).toarray()
+
+        required = self.required_skill_counts
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = matched / required * 100
+        scores[:, required == 0] = 100
+        return scores
+
+    def distance_scores(self, rows=None) -> np.ndarray:
+        """Return the distance score matrix (employees × vacancies)."""
+        return self._rows(self.distance_score_matrix, rows).toarray()
+
+    def quantitative_scores(self, profile, rows=None) -> np.ndarray:
+        """
+        Return the weighted quantitative score matrix (employees × vacancies).
+
+        ``profile`` is a ``WeightProfile``; every vacancy column is weighed
+        with the weights of its expected mastery.
+        """
+        weights = profile.vacancy_weights(self.vacancy_masteries)
+        distance_weight, language_weight, skills_weight = weights[:, 0], weights[:, 1], weights[:, 2]
+        total_weight = distance_weight + language_weight + skills_weight
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = (
+                self.distance_scores(rows) * distance_weight +
+                self.language_scores(rows) * language_weight +
+                self.skills_scores(rows) * skills_weight
+            ) / total_weight
+        scores[:, total_weight == 0] = 0
+        return scores
+
+
+def best_rows(rank_rows: Callable[[np.ndarray], np.ndarray], n_rows: int, n_columns: int, k: int,
+              chunk_size: int = 1000) -> np.ndarray:
+    """
+    Return the positions of the ``k`` best ranked rows of every column, best
+    first: a (k × columns) array, with fewer rows when there are fewer than
+    ``k``. Ties go to the lower position.
+
+    ``rank_rows(rows)`` returns the ranking of the rows at the given
+    positions. Rows are ranked ``chunk_size`` at a time, so the full matrix
+    is never held at once.
+    """
+    if k >= n_rows:
+        return np.repeat(np.arange(n_rows)[:, np.newaxis], n_columns, axis=1)
+
+    best_scores = np.empty((0, n_columns))
+    best = np.empty((0, n_columns), dtype=int)
+    for start in range(0, n_rows, chunk_size):
+        rows = np.arange(start, min(start + chunk_size, n_rows))
+        scores = np.vstack([best_scores, rank_rows(rows)])
+        positions = np.vstack([best, np.repeat(rows[:, np.newaxis], n_columns, axis=1)])
+        # The best rows so far come first and chunks are ranked in order, so a
+        # stable sort keeps the lower positions ahead among equal scores
+        order = np.argsort(-scores, axis=0, kind='stable')[:k]
+        best_scores = np.take_along_axis(scores, order, axis=0)
+        best = np.take_along_axis(positions, order, axis=0)
+    return best
+
+
+def select_candidates(scores: np.ndarray, per_employee: int = None, per_vacancy: int = None,
+                      rows: np.ndarray = None, vacancy_best: np.ndarray = None) -> np.ndarray:
+    """
+    Return a boolean mask of the pairs worth a qualitative score.
+
+    A pair is a candidate when the vacancy is among the ``per_employee`` best
+    quantitative scores of the employee, or the employee is among the
+    ``per_vacancy`` best scores of the vacancy. A limit of None disables that
+    side; without any limit every pair is a candidate. Ties go to the lower
+    vacancy or employee position.
+
+    ``scores`` may hold only some rows of the full matrix, at the sorted
+    positions ``rows``; ``vacancy_best`` then holds the ``best_rows`` of
+    every vacancy over the full matrix.
+    """
+    if not per_employee and not per_vacancy:
+        return np.ones(scores.shape, dtype=bool)
+    if rows is None:
+        rows = np.arange(scores.shape[0])
+        if per_vacancy:
+            vacancy_best = best_rows(lambda block: scores[block], scores.shape[0], scores.shape[1], per_vacancy)
+
+    mask = np.zeros(scores.shape, dtype=bool)
+    if per_employee and scores.shape[1]:
+        if per_employee >= scores.shape[1]:
+            return np.ones(scores.shape, dtype=bool)
+        best = np.argsort(-scores, axis=1, kind='stable')[:, :per_employee]
+        np.put_along_axis(mask, best, True, axis=1)
+    if per_vacancy and len(rows):
+        if len(vacancy_best) < per_vacancy:
+            # Every employee is among the best of every vacancy
+            return np.ones(scores.shape, dtype=bool)
+        # Rows of the best employees that are among the given rows
+        found = np.minimum(np.searchsorted(rows, vacancy_best), len(rows) - 1)
+        hit = rows[found] == vacancy_best
+        columns = np.broadcast_to(np.arange(scores.shape[1]), vacancy_best.shape)
+        mask[found[hit], columns[hit]] = True
+    return mask
@@ -1,10 +1,62 @@
+import multiprocessing
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
 from typing import List, Dict, Any
+import numpy as np
 from django.db.models import Q
+from django.db.models.functions import Mod
 from django.conf import settings
+from django.utils import timezone
 from accounts.models import Employee
+from common.geo import haversine_km
 from vacancies.models import Vacancy
-from .models import AISuggestion, SuggestionWeight
-import openai
+from .models import AISuggestion, DeferredPair, SuggestionGenerationLog, SuggestionCheckpoint
+from .scoring import QuantitativeScorer, best_rows, distance_score, mastery_value, select_candidates
+from .cache import ScoreCache
+from .index import MatchIndex
+from .conf import get_setting
+from .llm import (
+    BATCH_SYSTEM_PROMPT, SYSTEM_PROMPT, ConcurrentScorer, LLMBackend, build_batch_prompt, build_prompt,
+    complete_with_retry, format_vacancy, get_backend, parse_batch_response, parse_response
+)
+from .scheduling import ESTIMATED_BATCH_ITEM_TOKENS, LLMScheduler, estimate_tokens, recency
+from .text import TextSimilarity, employee_text, vacancy_text
+from .weights import QUANTITATIVE_FIELDS, WeightProfile, clear_weight_profile, get_weight_profile
+from .writer import SuggestionWriter
+from .workers import run_shard_process
+
+
+# Counters a run (or each of its shards) reports on SuggestionGenerationLog
+RUN_COUNTERS = [
+    'suggestions_created', 'suggestions_updated', 'llm_cache_hits', 'llm_cache_misses', 'pairs_pruned',
+    'llm_calls', 'llm_tokens', 'pairs_deferred',
+]
+
+
+def merge_counts(total: Dict[str, Any], counts: Dict[str, Any]) -> None:
+    """Add the counters and stage timings of one shard to those of the run."""
+    for name, value in counts.items():
+        if name == 'stage_seconds':
+            for stage, seconds in value.items():
+                total[name][stage] = total[name].get(stage, 0) + seconds
+        else:
+            total[name] += value
+
+
+@contextmanager
+def timed(timings: Dict[str, float], stage: str):
+    """Add the wall-clock seconds spent in the block to ``timings[stage]``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0) + time.perf_counter() - start
+
+
+# Neutral score used when the LLM cannot be reached; never cached
+LLM_FALLBACK_SCORE = (50.0, "Error occurred while generating score")
 
 
 class SuggestionService:
@@ -13,21 +65,7 @@ class SuggestionService:
     @staticmethod
     def calculate_distance_score(employee_coords: tuple, vacancy_coords: tuple) -> float:
         """Calculate score based on distance between employee and vacancy."""
-        from math import radians, sin, cos, sqrt, atan2
-
-        lat1, lon1 = map(radians, employee_coords)
-        lat2, lon2 = map(radians, vacancy_coords)
-
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * atan2(sqrt(a), sqrt(1-a))
-        distance = 6371 * c  # Earth's radius in km
-
-        # Convert distance to score (0-100)
-        # Assuming max reasonable distance is 100km
-        return max(0, 100 - (distance / 100) * 100)
+        return distance_score(haversine_km(*employee_coords, *vacancy_coords))
 
     @staticmethod
     def calculate_language_score(employee_languages: List[Dict], vacancy_languages: List[Dict]) -> float:
@@ -40,14 +78,8 @@ class SuggestionService:
             best_match = 0
             for e_lang in employee_languages:
                 if e_lang['language'] == v_lang['language']:
-                    mastery_values = {
-                        'beginner': 25,
-                        'intermediate': 50,
-                        'advanced': 75,
-                        'native': 100
-                    }
-                    employee_mastery = mastery_values[e_lang['mastery']]
-                    required_mastery = mastery_values[v_lang['mastery']]
+                    employee_mastery = mastery_value(e_lang['mastery'])
+                    required_mastery = mastery_value(v_lang['mastery'])
                     match_score = min(100, (employee_mastery / required_mastery) * 100)
                     best_match = max(best_match, match_score)
             total_score += best_match
@@ -55,175 +87,694 @@ class SuggestionService:
         return total_score / len(vacancy_languages)
 
     @staticmethod
-    def calculate_skills_score(employee_skills: List[str], vacancy_skills: List[str]) -> float:
-        """Calculate score based on skill matches."""
+    def calculate_skills_score(employee_skills: List[str], vacancy_skills: List[str],
+                               skill_weights: Dict[Any, float] = None) -> float:
+        """
+        Calculate score based on skill matches.
+
+        With ``skill_weights`` every required skill counts with its weight
+        (1 when missing) instead of equally, e.g. its ``FunctionSkill`` weight.
+        """
         if not vacancy_skills:
             return 100  # If vacancy doesn't require skills, perfect score
 
         matched_skills = set(employee_skills) & set(vacancy_skills)
-        return (len(matched_skills) / len(vacancy_skills)) * 100
+        if skill_weights is None:
+            return (len(matched_skills) / len(vacancy_skills)) * 100
+
+        required = sum(skill_weights.get(skill, 1) for skill in vacancy_skills)
+        if not required:
+            return 100  # Skills that do not matter for the function cannot be missed
+        return sum(skill_weights.get(skill, 1) for skill in matched_skills) / required * 100
 
     @staticmethod
-    def get_llm_score(employee_data: Dict[str, Any], vacancy_data: Dict[str, Any]) -> tuple:
-        """Get qualitative score and explanation from LLM."""
-        from django.conf import settings
-        from jobr_api_backend.my_secrets import open_ai_key
+    def get_llm_score(employee_data: Dict[str, Any], vacancy_data: Dict[str, Any],
+                      backend: LLMBackend = None, cache: ScoreCache = None) -> tuple:
+        """
+        Get qualitative score and explanation from LLM.
 
-        prompt = f"""
-        You are an expert HR professional. Analyze the following employee and vacancy data and provide:
-        1. A match score (0-100) - this must be a number between 0 and 100, nothing else
-        2. A brief explanation of why this match would be good or not good.
+        Uses the configured backend unless one is passed; failed calls are
+        retried before falling back to a neutral score. When a cache is given
+        it is consulted before calling out, and new scores are stored in it.
+        """
+        backend = backend or get_backend()
+        prompt = build_prompt(employee_data, vacancy_data)
 
-        Employee:
-        - Biography: {employee_data['biography']}
-        - Interests: {', '.join(employee_data['interests'])}
-        - Education: {employee_data['education']}
+        if cache is not None:
+            key = ScoreCache.make_key(backend.model, SYSTEM_PROMPT, prompt)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
 
-        Vacancy:
-        - Description: {vacancy_data['description']}
-        - Questions: {', '.join(vacancy_data['questions'])}
-        - Company Description: {vacancy_data['company_description']}
+        try:
+            text = complete_with_retry(backend, SYSTEM_PROMPT, prompt)
+            score, explanation = parse_response(text)
+        except Exception as e:
+            print(f"    Error in get_llm_score: {str(e)}")
+            return LLM_FALLBACK_SCORE
 
-        You must respond in exactly this format:
-        Score: [a number between 0 and 100]
-        Explanation: [your explanation]
+        if cache is not None:
+            cache.set(key, backend.model, score, explanation)
+        return score, explanation
 
-        If you cannot determine a score, use 50 as a default score.
+    @classmethod
+    def get_llm_batch_scores(cls, employee_data: Dict[str, Any], vacancies_data: List[Dict[str, Any]],
+                             backend: LLMBackend = None) -> tuple:
         """
+        Get the qualitative scores of one employee against several vacancies
+        from a single LLM call.
 
-        try:
-            client = openai.OpenAI(api_key=open_ai_key)
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an expert HR professional. Always respond with a Score and Explanation."},
-                    {"role": "user", "content": prompt}
-                ]
-            )
-
-            text = response.choices[0].message.content
-            
-            # Extract score
-            try:
-                score_line = next((line for line in text.split('\n') if line.startswith('Score:')), 'Score: 50')
-                score_text = score_line.split(':')[1].strip()
-                score = float(score_text)
-                # Ensure score is between 0 and 100
-                score = max(0, min(100, score))
-            except (ValueError, IndexError):
-                print(f"    Warning: Could not parse score from response: {text}")
-                score = 50.0
-
-            # Extract explanation
+        Returns the (score, explanation) per vacancy and the number of LLM
+        calls made. Vacancies missing from the response, or all of them when
+        the batched call fails, are scored with ``get_llm_score`` instead.
+        """
+        backend = backend or get_backend()
+        scores = {}
+        if len(vacancies_data) > 1:
             try:
-                explanation_line = next((line for line in text.split('\n') if line.startswith('Explanation:')), 'Explanation: No detailed explanation available')
-                explanation = explanation_line.split(':')[1].strip()
-            except (ValueError, IndexError):
-                explanation = "No detailed explanation available"
+                text = complete_with_retry(
+                    backend, BATCH_SYSTEM_PROMPT, build_batch_prompt(employee_data, vacancies_data)
+                )
+                scores = parse_batch_response(text, len(vacancies_data))
+            except Exception as e:
+                print(f"    Error in get_llm_batch_scores: {str(e)}")
 
-            return score, explanation
-        except Exception as e:
-            print(f"    Error in get_llm_score: {str(e)}")
-            return 50.0, "Error occurred while generating score"
+        calls = 1 if len(vacancies_data) > 1 else 0
+        for i, vacancy_data in enumerate(vacancies_data):
+            if i not in scores:
+                scores[i] = cls.get_llm_score(employee_data, vacancy_data, backend)
+                calls += 1
+        return [scores[i] for i in range(len(vacancies_data))], calls
+
+    @staticmethod
+    def get_text_proxy_score(similarity: float) -> tuple:
+        """Return the local stand-in for an LLM score: the text similarity of the pair."""
+        return (
+            round(float(similarity), 2),
+            f'Estimated from the text similarity of the profile and the vacancy ({similarity:.0f}/100)',
+        )
+
+    @staticmethod
+    def get_employee_data(employee: Employee) -> Dict[str, Any]:
+        """Collect the qualitative matching data of an employee for the LLM."""
+        return {
+            'biography': employee.biography or '',
+            'interests': [i.name for i in employee.interests.all()],
+            'education': []  # Education field not available yet
+        }
+
+    @staticmethod
+    def get_vacancy_data(vacancy: Vacancy) -> Dict[str, Any]:
+        """Collect the qualitative matching data of a vacancy for the LLM."""
+        return {
+            'description': vacancy.description or '',
+            'questions': [q.question for q in vacancy.questions.all()],
+            'company_description': vacancy.company.description if vacancy.company else '',
+        }
+
+    @staticmethod
+    def get_changed_since(watermark) -> tuple:
+        """
+        Return the ids of active employees and vacancies whose matching data
+        changed after the given watermark.
+        """
+        employee_ids = set(
+            Employee.objects.filter(user__is_active=True, updated_at__gt=watermark)
+            .values_list('id', flat=True)
+        )
+        vacancy_ids = set(
+            Vacancy.objects.filter(Q(updated_at__gt=watermark) | Q(company__updated_at__gt=watermark))
+            .values_list('id', flat=True)
+        )
+        return employee_ids, vacancy_ids
+
+    @staticmethod
+    def get_last_run(log: SuggestionGenerationLog):
+        """
+        Return the latest successful run that covered the employees of the
+        given run, either unsharded or with the same shard partition.
+        """
+        return SuggestionGenerationLog.objects.filter(
+            Q(shard_count__isnull=True) | Q(shard_index=log.shard_index, shard_count=log.shard_count),
+            is_successful=True,
+            watermark__isnull=False,
+        ).exclude(pk=log.pk).first()
+
+    @staticmethod
+    def get_resumable_run(log: SuggestionGenerationLog):
+        """
+        Return the latest run over the same employees as the given run if it
+        did not succeed, so the given run can continue from its checkpoints.
+        """
+        previous = SuggestionGenerationLog.objects.filter(
+            shard_index=log.shard_index,
+            shard_count=log.shard_count,
+        ).exclude(pk=log.pk).first()
+        if previous is None or previous.is_successful:
+            return None
+        return previous
+
+    @staticmethod
+    def get_checkpoints(log: SuggestionGenerationLog) -> List[SuggestionCheckpoint]:
+        """Return the checkpoints of the failed runs the given run continues from."""
+        checkpoints = []
+        run = log.resumed_from
+        while run is not None:
+            checkpoints.extend(run.checkpoints.all())
+            run = run.resumed_from
+        return checkpoints
 
     @classmethod
-    def generate_suggestions(cls) -> None:
-        """Generate AI suggestions for all employees and vacancies."""
+    def generate_suggestions(cls, full: bool = False, shard: tuple = None, workers: int = 1,
+                             resume: bool = False) -> SuggestionGenerationLog:
+        """
+        Generate AI suggestions for employees and vacancies.
+
+        Only pairs whose employee or vacancy changed since the last successful
+        run are rescored, unless ``full`` is set, there is no previous run or
+        the suggestion weights changed. Existing suggestions are updated in
+        place, so the suggestion endpoints keep serving results during a run.
+
+        ``shard`` is an (index, count) tuple restricting the run to one
+        partition of the employees; ``workers`` splits the run over that many
+        processes and merges their counts into this run's log.
+
+        Every shard checkpoints the employees it finished. With ``resume``, a
+        run following a failed run over the same employees continues from its
+        checkpoints, with the scope and weights of the failed run.
+        """
+        shard_index, shard_count = shard or (0, 1)
+        # Profiles changed while this run is in progress are picked up next time
+        log = SuggestionGenerationLog.objects.create(
+            watermark=timezone.now(),
+            shard_index=shard_index if shard else None,
+            shard_count=shard_count if shard else None,
+        )
         try:
             print("Starting suggestion generation process...")
             
-            # Get weights for current calculations
-            weights = {w.name: w.weight for w in SuggestionWeight.objects.all()}
-            default_weight = 20  # Default weight if not specified
+            # Compile the weights afresh, they may have been changed in another process
+            clear_weight_profile()
+            weights = get_weight_profile().as_dict()
             print(f"Loaded weights: {weights}")
 
-            # Clear existing suggestions
-            AISuggestion.objects.all().delete()
-            print("Cleared existing suggestions")
-
-            # Get all active employees and vacancies
-            employees = Employee.objects.filter(user__is_active=True)
-            vacancies = Vacancy.objects.all()
-            print(f"Found {employees.count()} active employees and {vacancies.count()} vacancies")
-
-            for employee in employees:
-                print(f"\nProcessing employee: {employee}")
-                for vacancy in vacancies:
-                    try:
-                        print(f"  Processing vacancy: {vacancy}")
-                        # Calculate quantitative scores
-                        # Skip distance calculation if location data is missing
-                        distance_score = 0
-                        if hasattr(employee, 'city_name') and vacancy.latitude and vacancy.longitude:
-                            # For now, skip distance score as employee doesn't have coordinates
-                            distance_score = 0
-
-                        language_score = cls.calculate_language_score(
-                            [{'language': l.language.name, 'mastery': l.mastery} for l in employee.language.all()],
-                            [{'language': l.language.name, 'mastery': l.mastery} for l in vacancy.languages.all()]
-                        )
-                        print(f"    Language score: {language_score}")
+            resumed = cls.get_resumable_run(log) if resume else None
+            if resumed is not None:
+                print(f"Resuming run {resumed.pk} from its checkpoints")
+                # Changes made since the failed run started are left to the next run
+                log.resumed_from = resumed
+                log.watermark = resumed.watermark
+                log.is_full_rebuild = resumed.is_full_rebuild
+                log.changed_since = resumed.changed_since
+                log.weights = resumed.weights
+            else:
+                last_run = cls.get_last_run(log)
+                log.is_full_rebuild = full or last_run is None or last_run.weights != weights
+                log.changed_since = None if log.is_full_rebuild else last_run.watermark
+                log.weights = weights
+            # Shard processes read the run configuration from the database
+            log.save()
 
-                        skills_score = cls.calculate_skills_score(
-                            [s.name for s in employee.skill.all()],
-                            [s.name for s in vacancy.skill.all()]
-                        )
-                        print(f"    Skills score: {skills_score}")
-
-                        # Calculate weighted quantitative score
-                        quantitative_score = (
-                            distance_score * weights.get('distance', default_weight) +
-                            language_score * weights.get('language', default_weight) +
-                            skills_score * weights.get('skills', default_weight)
-                        ) / (
-                            weights.get('distance', default_weight) +
-                            weights.get('language', default_weight) +
-                            weights.get('skills', default_weight)
-                        )
-                        print(f"    Quantitative score: {quantitative_score}")
-
-                        # Get qualitative score from LLM
-                        employee_data = {
-                            'biography': employee.biography or '',
-                            'interests': [i.name for i in employee.interests.all()] if employee.interests.exists() else [],
-                            'education': []  # Education field not available yet
-                        }
-                        vacancy_data = {
-                            'description': vacancy.description or '',
-                            'questions': [q.question for q in vacancy.questions.all()],
-                            'company_description': vacancy.company.description if vacancy.company else '',
-                        }
-                        print("    Getting LLM score...")
-                        qualitative_score, explanation = cls.get_llm_score(employee_data, vacancy_data)
-                        print(f"    Qualitative score: {qualitative_score}")
-
-                        # Calculate total score
-                        total_score = (
-                            quantitative_score * weights.get('quantitative', 50) +
-                            qualitative_score * weights.get('qualitative', 50)
-                        ) / (
-                            weights.get('quantitative', 50) +
-                            weights.get('qualitative', 50)
-                        )
-                        print(f"    Total score: {total_score}")
-
-                        # Create suggestion
-                        suggestion = AISuggestion.objects.create(
-                            employee=employee,
-                            vacancy=vacancy,
-                            quantitative_score=quantitative_score,
-                            qualitative_score=qualitative_score,
-                            total_score=total_score,
-                            message=explanation
-                        )
-                        print(f"    Created suggestion with ID: {suggestion.id}")
-                    except Exception as e:
-                        print(f"    Error processing vacancy: {str(e)}")
-                        import traceback
-                        print(traceback.format_exc())
-                        continue  # Continue with next vacancy even if this one fails
+            # Drop suggestions and deferred pairs of employees that are no longer active
+            AISuggestion.objects.filter(employee__user__is_active=False).delete()
+            DeferredPair.objects.filter(employee__user__is_active=False).delete()
+
+            if workers > 1:
+                counts = cls.run_shards_in_processes(log, workers)
+            else:
+                counts = cls.run_shard(log, shard_index, shard_count)
+            for name, value in counts.items():
+                setattr(log, name, value)
+
+            if get_setting('LLM_CACHE'):
+                with timed(log.stage_seconds, 'cache_eviction'):
+                    evicted = ScoreCache().evict()
+                print(f"LLM cache: {log.llm_cache_hits} hits, {log.llm_cache_misses} misses, {evicted} evicted")
+            print(f"Pruned {log.pairs_pruned} pairs before qualitative scoring")
+            print(f"Made {log.llm_calls} LLM calls (~{log.llm_tokens} tokens), deferred {log.pairs_deferred} pairs")
+
+            log.is_successful = True
+            return log
         except Exception as e:
+            log.error_message = str(e)
             print(f"Error in generate_suggestions: {str(e)}")
             import traceback
             print(traceback.format_exc())
-            raise
\ No newline at end of file
+            raise
+        finally:
+            log.completed_at = timezone.now()
+            log.save()
+
+    @staticmethod
+    def run_shards_in_processes(log: SuggestionGenerationLog, workers: int) -> Dict[str, int]:
+        """
+        Run every shard of the given run in its own process and sum their counts.
+
+        Processes are spawned rather than forked so each one sets up Django and
+        opens its own database connection.
+        """
+        counts = dict.fromkeys(RUN_COUNTERS, 0)
+        counts['stage_seconds'] = {}
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = [
+                executor.submit(run_shard_process, log.pk, shard_index, workers)
+                for shard_index in range(workers)
+            ]
+            for future in as_completed(futures):
+                merge_counts(counts, future.result())
+        return counts
+
+    @staticmethod
+    def run_shard(log: SuggestionGenerationLog, shard_index: int = 0, shard_count: int = 1) -> Dict[str, int]:
+        """Score the pairs of the employees in one shard and return the run counters; see ``ShardRun``."""
+        return ShardRun(log, shard_index, shard_count).run()
+
+
+class ShardRun:
+    """
+    One shard of a suggestion generation run, in stages that ``run`` goes
+    through in order and that can be run and inspected one by one:
+
+    ``load``
+        Loads the shard's employees, assigned to shards by
+        ``id % shard_count``, every vacancy and which of their pairs to
+        rescore. Employees covered by the checkpoints of a resumed run are
+        skipped.
+    ``rank``
+        Scores the shard's rows of the employee × vacancy matrix and selects
+        the candidates among them. Candidate retrieval per vacancy ranks
+        against all active employees, a chunk of rows at a time, so no shard
+        holds the full matrix. The local text similarity of biographies and
+        vacancy descriptions is computed when ``TEXT_RANKING_WEIGHT`` blends
+        it into the ranking or ``TEXT_PROXY`` uses it instead of the LLM.
+    ``pending_pairs``, ``scheduled_pairs``, ``batched_pairs``
+        Yield the pairs to score, in the order the LLM budget allows,
+        grouped into LLM calls.
+    ``score``
+        Gets the qualitative scores and writes the suggestions.
+
+    Pairs that need an LLM call are scored highest priority first within
+    the run's ``LLM_CALL_BUDGET`` and ``LLM_TOKEN_BUDGET``: their ranking
+    score plus a bonus for recently changed profiles. Pairs that do not fit
+    are stored as ``DeferredPair`` and rescored by the next run. With
+    ``LLM_BATCH_SIZE`` above 1, the pairs of an employee share LLM calls.
+
+    Employees are processed in id order and the shard's checkpoint is moved
+    past every employee whose pairs are all written, each time the writer
+    flushes.
+    """
+
+    def __init__(self, log: SuggestionGenerationLog, shard_index: int = 0, shard_count: int = 1):
+        self.log = log
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.profile = WeightProfile.from_dict(log.weights)
+        self.text_ranking_weight = get_setting('TEXT_RANKING_WEIGHT')
+        self.text_proxy = get_setting('TEXT_PROXY')
+        self.batch_size = get_setting('LLM_BATCH_SIZE')
+        self.counts = dict.fromkeys(RUN_COUNTERS, 0)
+        self.counts['stage_seconds'] = self.timings = {}
+
+        # Worker processes of one run share its budget
+        budget_share = 1 if log.shard_count else shard_count
+        self.scheduler = LLMScheduler(*(
+            None if budget is None else budget // budget_share
+            for budget in (get_setting('LLM_CALL_BUDGET'), get_setting('LLM_TOKEN_BUDGET'))
+        ), batch_size=self.batch_size)
+        self.backend = get_backend()
+        self.cache = ScoreCache() if get_setting('LLM_CACHE') and not self.text_proxy else None
+        self.new_cache_entries = {}
+        self.writer = SuggestionWriter(on_flush=self.save_checkpoint)
+        # Deferred pairs that got scored or pruned; those the LLM failed on stay deferred
+        self.resolved = []
+        # Employees whose pairs are all queued, in id order, and their pairs still being scored
+        self.queued = deque()
+        self.outstanding = Counter()
+        self.progress = {'last_employee_id': None, 'pairs_done': 0}
+
+    def run(self) -> Dict[str, int]:
+        with timed(self.timings, 'load'):
+            self.load()
+        self.rank()
+        with timed(self.timings, 'qualitative'):
+            self.score()
+        return self.counts
+
+    def in_shard(self, queryset, field: str = 'id'):
+        """Filter a queryset in SQL to the rows whose employee id, ``field``, is in this shard."""
+        if self.shard_count == 1:
+            return queryset
+        return queryset.alias(shard=Mod(field, self.shard_count)).filter(shard=self.shard_index)
+
+    def load(self) -> None:
+        """Load the shard's employees, every vacancy and what this run rescores of them."""
+        log = self.log
+        # Load the active employees and the vacancies with the relations the LLM
+        # prompts need, so the scoring loop does not query per pair
+        employees = list(
+            self.in_shard(Employee.objects.filter(user__is_active=True)).order_by('id')
+            .select_related('user').prefetch_related('interests')
+        )
+        vacancies = Vacancy.objects.select_related('company').prefetch_related('questions')
+        if self.text_ranking_weight or self.text_proxy:
+            vacancies = vacancies.prefetch_related('descriptions')
+        self.vacancies = list(vacancies)
+        print(f"Found {len(employees)} active employees in the shard and {len(self.vacancies)} vacancies")
+
+        # Pairs that earlier runs had no budget left for
+        self.deferred = defaultdict(dict)
+        for pk, employee_id, vacancy_id in self.in_shard(DeferredPair.objects, 'employee_id').values_list(
+            'pk', 'employee_id', 'vacancy_id'
+        ):
+            self.deferred[employee_id][vacancy_id] = pk
+        if self.deferred:
+            print(f"Rescoring {sum(map(len, self.deferred.values()))} deferred pairs")
+
+        if log.changed_since is None:
+            self.changed_employees = {employee.id for employee in employees}
+            self.changed_vacancies = {vacancy.id for vacancy in self.vacancies}
+            print("Rescoring all pairs")
+        else:
+            self.changed_employees, self.changed_vacancies = SuggestionService.get_changed_since(log.changed_since)
+            print(
+                f"Rescoring pairs of {len(self.changed_employees)} changed employees "
+                f"and {len(self.changed_vacancies)} changed vacancies"
+            )
+            if not self.changed_employees and not self.changed_vacancies and not self.deferred:
+                employees = []
+
+        # Employees already scored by the failed runs this run continues from
+        checkpoints = SuggestionService.get_checkpoints(log)
+        self.employees = [
+            employee for employee in employees
+            if not any(checkpoint.covers(employee.id) for checkpoint in checkpoints)
+        ]
+
+        # Vacancies the shard's employees have suggestions for. An incremental
+        # run shifts the candidates of unchanged pairs as well: suggestions no
+        # longer among them are pruned, and candidates without one are scored.
+        self.suggested = defaultdict(set)
+        if log.changed_since is not None and self.employees:
+            for employee_id, vacancy_id in self.in_shard(AISuggestion.objects, 'employee_id').values_list(
+                'employee_id', 'vacancy_id'
+            ):
+                self.suggested[employee_id].add(vacancy_id)
+
+    def rank(self) -> None:
+        """
+        Compute the quantitative scores, the ranking and the candidate mask of
+        the shard's employees (rows) × every vacancy (columns).
+        """
+        shape = (len(self.employees), len(self.vacancies))
+        self.quantitative_scores = self.ranking = self.text_scores = np.zeros(shape)
+        self.candidates = np.zeros(shape, dtype=bool)
+        if not self.employees:
+            return
+
+        with timed(self.timings, 'quantitative'):
+            index = MatchIndex.build()
+            # The shard's employees are rows of the ranking of all active employees
+            population = index.employee_ids
+            positions = {employee_id: row for row, employee_id in enumerate(population)}
+            self.employees = [employee for employee in self.employees if employee.id in positions]
+            rows = np.array([positions[employee.id] for employee in self.employees], dtype=int)
+            scorer = QuantitativeScorer(
+                [index.employee_profile(employee_id) for employee_id in population],
+                [index.vacancy_profile(vacancy.id) for vacancy in self.vacancies],
+            )
+
+        similarity = None
+        if self.text_ranking_weight or self.text_proxy:
+            with timed(self.timings, 'text'):
+                # Every biography is needed for the n-gram frequencies and the ranking per vacancy
+                biographies = {
+                    employee.id: employee_text(employee)
+                    for employee in Employee.objects.filter(user__is_active=True).only('id', 'biography')
+                }
+                similarity = TextSimilarity(
+                    [biographies.get(employee_id, '') for employee_id in population],
+                    [vacancy_text(vacancy) for vacancy in self.vacancies],
+                )
+                self.text_scores = similarity.scores(rows)
+                print("Calculated text similarity of the shard")
+
+        def ranking(rows, text_scores=None):
+            scores = scorer.quantitative_scores(self.profile, rows)
+            if not self.text_ranking_weight:
+                return scores
+            if text_scores is None:
+                text_scores = similarity.scores(rows)
+            # Pairs that read alike go to the LLM before pairs that only match on paper
+            return (scores + self.text_ranking_weight * text_scores) / (1 + self.text_ranking_weight)
+
+        with timed(self.timings, 'quantitative'):
+            self.quantitative_scores = scorer.quantitative_scores(self.profile, rows)
+            self.ranking = self.quantitative_scores
+            if self.text_ranking_weight:
+                self.ranking = ranking(rows, self.text_scores)
+
+            # Only the best matches go on to the qualitative stage
+            per_employee = get_setting('CANDIDATES_PER_EMPLOYEE')
+            per_vacancy = get_setting('CANDIDATES_PER_VACANCY')
+            vacancy_best = best_rows(ranking, len(population), len(self.vacancies), per_vacancy) if per_vacancy else None
+            self.candidates = select_candidates(self.ranking, per_employee, per_vacancy, rows, vacancy_best)
+            print("Calculated quantitative scores of the shard")
+
+    def save_checkpoint(self) -> None:
+        """Move the checkpoint past the employees whose pairs are all written."""
+        last_employee_id = self.progress['last_employee_id']
+        while self.queued and not self.outstanding[self.queued[0]]:
+            last_employee_id = self.queued.popleft()
+        pairs_done = self.writer.created + self.writer.updated
+        if last_employee_id is None or self.progress == {
+            'last_employee_id': last_employee_id, 'pairs_done': pairs_done
+        }:
+            return
+        self.progress.update(last_employee_id=last_employee_id, pairs_done=pairs_done)
+        SuggestionCheckpoint.objects.update_or_create(
+            log=self.log, shard_index=self.shard_index, shard_count=self.shard_count, defaults=self.progress
+        )
+
+    def with_cached_scores(self, batch):
+        keys = [pair[3] for pair, (_, _, known), _ in batch if known is None]
+        cached = self.cache.get_many(keys) if self.cache is not None else {}
+        for pair, (employee_data, vacancy_data, known), cost in batch:
+            yield pair, (employee_data, vacancy_data, known if known is not None else cached.get(pair[3])), cost
+
+    def pending_pairs(self):
+        """
+        Yield the pairs to rescore with the inputs and the (priority,
+        estimated tokens, tokens per batch) of their LLM call, and discard
+        the suggestions that dropped out of the candidates. Cached scores are
+        looked up here, once per chunk of pairs, so worker threads never
+        touch the database.
+        """
+        recency_weight = get_setting('LLM_PRIORITY_RECENCY_WEIGHT')
+        half_life_days = get_setting('LLM_PRIORITY_HALF_LIFE_DAYS')
+        now = timezone.now()
+        columns = {vacancy.id: col for col, vacancy in enumerate(self.vacancies)}
+        vacancy_data = {}
+        batch = []
+        for row, employee in enumerate(self.employees):
+            employee_changed = employee.id in self.changed_employees
+            employee_deferred = self.deferred.get(employee.id, {})
+            employee_suggested = self.suggested.get(employee.id, set())
+            employee_data = None
+            pruned = []
+            print(f"\nProcessing employee: {employee}")
+            for col, vacancy in enumerate(self.vacancies):
+                candidate = self.candidates[row, col]
+                if (
+                    not employee_changed and vacancy.id not in self.changed_vacancies
+                    and vacancy.id not in employee_deferred
+                    # Unchanged pairs that moved into the candidates are scored as well
+                    and not (candidate and self.log.changed_since is not None and vacancy.id not in employee_suggested)
+                ):
+                    continue
+                if not candidate:
+                    if vacancy.id in employee_deferred:
+                        self.resolved.append(employee_deferred[vacancy.id])
+                    pruned.append(vacancy.id)
+                    continue
+                if employee_data is None:
+                    employee_data = SuggestionService.get_employee_data(employee)
+                    # Instructions and employee are sent once per batched call
+                    batch_tokens = estimate_tokens(
+                        BATCH_SYSTEM_PROMPT, build_batch_prompt(employee_data, []), response_tokens=0
+                    ) if self.batch_size > 1 else 0
+                if vacancy.id not in vacancy_data:
+                    vacancy_data[vacancy.id] = SuggestionService.get_vacancy_data(vacancy)
+                if self.text_proxy:
+                    key = None
+                    known = SuggestionService.get_text_proxy_score(self.text_scores[row, col])
+                    tokens = 0
+                else:
+                    prompt = build_prompt(employee_data, vacancy_data[vacancy.id])
+                    key = ScoreCache.make_key(self.backend.model, SYSTEM_PROMPT, prompt)
+                    known = None
+                    if self.batch_size > 1:
+                        tokens = estimate_tokens(
+                            format_vacancy(vacancy_data[vacancy.id]), response_tokens=ESTIMATED_BATCH_ITEM_TOKENS
+                        )
+                    else:
+                        tokens = estimate_tokens(SYSTEM_PROMPT, prompt)
+                changed_at = max(
+                    employee.updated_at, vacancy.updated_at,
+                    vacancy.company.updated_at if vacancy.company else vacancy.updated_at,
+                )
+                priority = float(self.ranking[row, col]) + recency_weight * recency(changed_at, now, half_life_days)
+                batch.append((
+                    (employee, vacancy, float(self.quantitative_scores[row, col]), key),
+                    (employee_data, vacancy_data[vacancy.id], known),
+                    (priority, tokens, batch_tokens),
+                ))
+                self.outstanding[employee.id] += 1
+
+            self.queued.append(employee.id)
+
+            for vacancy_id in employee_suggested:
+                col = columns.get(vacancy_id)
+                if col is not None and not self.candidates[row, col] and vacancy_id not in pruned:
+                    pruned.append(vacancy_id)
+            if pruned:
+                # Suggestions that dropped out of the candidates are outdated
+                self.writer.discard(employee.id, pruned)
+                self.counts['pairs_pruned'] += len(pruned)
+
+            if len(batch) >= self.writer.chunk_size:
+                yield from self.with_cached_scores(batch)
+                batch = []
+        yield from self.with_cached_scores(batch)
+
+    def scheduled_pairs(self):
+        """
+        Yield the pending pairs in the order they are scored. Pairs with a
+        known score cost nothing and go first; within a budget the others are
+        queued and drained highest priority first, and those left over are
+        deferred to the next run.
+        """
+        scheduler = self.scheduler
+        for pair, inputs, (priority, tokens, batch_tokens) in self.pending_pairs():
+            # Pairs are batched per employee
+            group = pair[0].id if self.batch_size > 1 else None
+            if inputs[2] is not None or scheduler.unlimited:
+                if inputs[2] is None:
+                    scheduler.spend(tokens, batch_tokens, group)
+                yield pair, inputs
+            else:
+                scheduler.push(priority, tokens, (pair, inputs), batch_tokens, group)
+        yield from scheduler.drain()
+
+        left = scheduler.deferred()
+        if left:
+            DeferredPair.objects.bulk_create(
+                [
+                    DeferredPair(employee=pair[0], vacancy=pair[1], log=self.log, priority=priority)
+                    for priority, (pair, _) in left
+                ],
+                update_conflicts=True,
+                unique_fields=['employee', 'vacancy'],
+                update_fields=['log', 'priority', 'deferred_at'],
+            )
+            print(f"LLM budget exhausted, deferred {len(left)} pairs to the next run")
+            # Deferred pairs are handled as far as the checkpoint is concerned
+            for _, ((employee, *_), _) in left:
+                self.outstanding[employee.id] -= 1
+        self.counts['pairs_deferred'] = len(left)
+
+    def batched_pairs(self):
+        """
+        Group the scheduled pairs that need an LLM call into batches of up to
+        ``LLM_BATCH_SIZE`` pairs of the same employee, the way the scheduler
+        accounted for them.
+        """
+        batches = {}
+        for pair, inputs in self.scheduled_pairs():
+            employee_id = pair[0].id
+            if inputs[2] is not None or self.batch_size == 1:
+                yield [pair], ([inputs],)
+                continue
+            if self.scheduler.unlimited and employee_id not in batches:
+                # Pairs stream employee by employee, earlier employees are complete
+                yield from batches.values()
+                batches.clear()
+            pairs, (batch,) = batches.setdefault(employee_id, ([], ([],)))
+            pairs.append(pair)
+            batch.append(inputs)
+            if len(batch) >= self.batch_size:
+                yield batches.pop(employee_id)
+        yield from batches.values()
+
+    def score_batch(self, batch):
+        """Return the ((score, explanation), from cache) of every pair and the LLM calls made."""
+        # Cached and text proxy scores need no LLM call and are not cached again
+        if batch[0][2] is not None:
+            return [(batch[0][2], True)], 0
+        employee_data = batch[0][0]
+        scores, calls = SuggestionService.get_llm_batch_scores(
+            employee_data, [vacancy_data for _, vacancy_data, _ in batch], self.backend
+        )
+        return [(score, False) for score in scores], calls
+
+    def flush_cache_entries(self) -> None:
+        if self.cache is not None and self.new_cache_entries:
+            self.cache.set_many(self.new_cache_entries)
+            self.new_cache_entries.clear()
+
+    def score(self) -> None:
+        """Get the qualitative scores of the pending pairs concurrently and write their suggestions."""
+        counts, writer, backend = self.counts, self.writer, self.backend
+        # Weights of the quantitative and qualitative score per vacancy
+        blend_weights = {
+            vacancy.id: self.profile.weights_for(vacancy.expected_mastery)[len(QUANTITATIVE_FIELDS):].tolist()
+            for vacancy in self.vacancies
+        }
+        results = ConcurrentScorer().map(self.score_batch, self.batched_pairs())
+        with writer:
+            try:
+                for pairs, (scores, calls) in results:
+                    counts['llm_calls'] += calls
+                    for pair, ((qualitative_score, explanation), from_cache) in zip(pairs, scores):
+                        employee, vacancy, quantitative_score, key = pair
+                        try:
+                            print(f"  {employee} - {vacancy}: quantitative {quantitative_score}, qualitative {qualitative_score}")
+
+                            failed = (qualitative_score, explanation) == LLM_FALLBACK_SCORE
+                            if not from_cache and not failed:
+                                self.new_cache_entries[key] = (backend.model, qualitative_score, explanation)
+                                if len(self.new_cache_entries) >= writer.chunk_size:
+                                    self.flush_cache_entries()
+                            if not failed and vacancy.id in self.deferred.get(employee.id, {}):
+                                self.resolved.append(self.deferred[employee.id][vacancy.id])
+
+                            # Calculate total score
+                            quantitative_weight, qualitative_weight = blend_weights[vacancy.id]
+                            total_score = (
+                                quantitative_score * quantitative_weight +
+                                qualitative_score * qualitative_weight
+                            ) / (quantitative_weight + qualitative_weight)
+
+                            # Create or update suggestion in place
+                            writer.add(
+                                employee.id, vacancy.id,
+                                quantitative_score, qualitative_score, total_score, explanation
+                            )
+                        except Exception as e:
+                            print(f"    Error processing vacancy: {str(e)}")
+                            import traceback
+                            print(traceback.format_exc())
+                            continue  # Continue with next vacancy even if this one fails
+                        finally:
+                            self.outstanding[employee.id] -= 1
+            finally:
+                # Keep paid-for LLM results even when the run fails
+                self.flush_cache_entries()
+        # The deferred pairs scored or pruned are written by now
+        DeferredPair.objects.filter(pk__in=self.resolved).delete()
+        counts['suggestions_created'] = writer.created
+        counts['llm_tokens'] = round(self.scheduler.tokens)
+        counts['suggestions_updated'] = writer.updated
+        if self.cache is not None:
+            counts['llm_cache_hits'] = self.cache.hits
+            counts['llm_cache_misses'] = self.cache.misses
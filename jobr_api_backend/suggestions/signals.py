@@ -0,0 +1,133 @@
+"""
+Keep ``updated_at`` of employees and vacancies current when their matching
+data changes through related tables, so incremental suggestion runs can find
+the pairs that need rescoring, and rebuild their feature snapshots. Changes
+to ``FunctionSkill`` and ``SuggestionWeight`` also drop the cached function
+skill weights and compiled suggestion weights.
+"""
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from accounts.models import CustomUser, Employee, EmployeeLanguage, Company
+from common.signals import changed_m2m_rows
+from vacancies.models import Vacancy, VacancyLanguage, Function, FunctionSkill
+from .conf import get_setting
+from .features import log_feature_changes, refresh_employee_features, refresh_vacancy_features
+from .models import EmployeeFeatures, SuggestionWeight
+from .skill_weights import clear_function_skill_weights
+from .weights import clear_weight_profile
+
+REFRESH_FEATURES = {
+    Employee: refresh_employee_features,
+    Vacancy: refresh_vacancy_features,
+}
+
+
+def refresh(model, ids):
+    """Rebuild the feature snapshots of the given rows."""
+    if ids:
+        REFRESH_FEATURES[model](model.objects.filter(pk__in=ids))
+
+
+def touch(model, ids):
+    """Mark the given rows as changed without triggering their save logic."""
+    if ids:
+        model.objects.filter(pk__in=ids).update(updated_at=timezone.now())
+        refresh(model, ids)
+
+
+def touch_m2m(model, sender, instance, action, reverse, pk_set):
+    touch(model, changed_m2m_rows(model, sender, instance, action, reverse, pk_set))
+
+
+@receiver(m2m_changed, sender=Employee.skill.through)
+@receiver(m2m_changed, sender=Employee.interests.through)
+def employee_relations_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    touch_m2m(Employee, sender, instance, action, reverse, pk_set)
+
+
+@receiver(m2m_changed, sender=Vacancy.skill.through)
+@receiver(m2m_changed, sender=Vacancy.languages.through)
+@receiver(m2m_changed, sender=Vacancy.questions.through)
+@receiver(m2m_changed, sender=Vacancy.descriptions.through)
+def vacancy_relations_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    touch_m2m(Vacancy, sender, instance, action, reverse, pk_set)
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_save, sender=Vacancy)
+def profile_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh(sender, [instance.pk])
+
+
+@receiver(post_save, sender=Company)
+def company_saved(sender, instance, raw=False, **kwargs):
+    # Vacancies without their own location are matched on the company's
+    if not raw:
+        refresh(Vacancy, instance.vacancies.values_list('id', flat=True))
+
+
+@receiver(m2m_changed, sender=Vacancy.contract_type.through)
+def vacancy_contract_types_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # Contract types are not scored, so the vacancy is not marked as changed
+    refresh(Vacancy, changed_m2m_rows(Vacancy, sender, instance, action, reverse, pk_set))
+
+
+@receiver(post_save, sender=VacancyLanguage)
+def vacancy_language_changed(sender, instance, created, **kwargs):
+    if not created:
+        touch(Vacancy, list(Vacancy.objects.filter(languages=instance).values_list('id', flat=True)))
+
+
+@receiver(post_save, sender=EmployeeLanguage)
+@receiver(post_delete, sender=EmployeeLanguage)
+def employee_language_changed(sender, instance, **kwargs):
+    touch(Employee, [instance.employee_id])
+
+
+@receiver(post_delete, sender=Employee)
+def employee_deleted(sender, instance, **kwargs):
+    # Deleting the employee's languages rebuilt its snapshot during the cascade
+    EmployeeFeatures.objects.filter(employee_id=instance.pk).delete()
+    log_feature_changes('employee', [instance.pk])
+
+
+@receiver(post_delete, sender=Vacancy)
+def vacancy_deleted(sender, instance, **kwargs):
+    # The snapshot went with the vacancy
+    log_feature_changes('vacancy', [instance.pk])
+
+
+@receiver(post_save, sender=CustomUser)
+def user_activation_changed(sender, instance, update_fields=None, **kwargs):
+    # Logins only update last_login; only full saves can reactivate a user
+    if update_fields is not None and 'is_active' not in update_fields:
+        return
+    touch(Employee, Employee.objects.filter(user=instance).values_list('id', flat=True))
+
+
+def function_skills_changed(vacancies):
+    clear_function_skill_weights()
+    # Weighted skill scores of these vacancies change with the weights
+    if get_setting('FUNCTION_SKILL_WEIGHTS'):
+        touch(Vacancy, vacancies.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=FunctionSkill)
+@receiver(post_delete, sender=FunctionSkill)
+def function_skill_changed(sender, instance, **kwargs):
+    function_skills_changed(Vacancy.objects.filter(function_id=instance.function_id))
+
+
+@receiver(m2m_changed, sender=Function.skills.through)
+def function_skills_m2m_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    function_ids = changed_m2m_rows(Function, sender, instance, action, reverse, pk_set)
+    if function_ids:
+        function_skills_changed(Vacancy.objects.filter(function_id__in=function_ids))
+
+
+@receiver(post_save, sender=SuggestionWeight)
+@receiver(post_delete, sender=SuggestionWeight)
+def suggestion_weight_changed(sender, **kwargs):
+    clear_weight_profile()
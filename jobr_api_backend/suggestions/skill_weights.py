@@ -0,0 +1,71 @@
+from threading import Lock
+from typing import List, Iterable
+
+import numpy as np
+from vacancies.models import FunctionSkill
+
+# Weight of a skill that has no FunctionSkill row for the vacancy's function,
+# the same as the default of FunctionSkill.weight
+DEFAULT_SKILL_WEIGHT = 1.0
+
+
+class FunctionSkillWeights:
+    """
+    Dense skill weight vectors per ``Function``, built from ``FunctionSkill``.
+
+    Every function gets one row over a shared vocabulary of skill ids, so
+    the weights of a vacancy's skills are a single fancy-index into that
+    row instead of a ``FunctionSkill`` query per vacancy.
+    """
+
+    def __init__(self, rows: Iterable[tuple]):
+        rows = list(rows)
+        self.function_index = {
+            function_id: i for i, function_id in enumerate(sorted({row[0] for row in rows}))
+        }
+        self.skill_index = {
+            skill_id: i for i, skill_id in enumerate(sorted({row[1] for row in rows}))
+        }
+        # One extra column holds the default weight for skills outside the vocabulary
+        self.vectors = np.full((len(self.function_index), len(self.skill_index) + 1), DEFAULT_SKILL_WEIGHT)
+        for function_id, skill_id, weight in rows:
+            self.vectors[self.function_index[function_id], self.skill_index[skill_id]] = weight
+
+    @classmethod
+    def load(cls) -> 'FunctionSkillWeights':
+        return cls(FunctionSkill.objects.values_list('function_id', 'skill_id', 'weight'))
+
+    def vector(self, function_id: int) -> np.ndarray:
+        """Return the weight vector of a function over the skill vocabulary."""
+        row = self.function_index.get(function_id)
+        if row is None:
+            return np.full(len(self.skill_index) + 1, DEFAULT_SKILL_WEIGHT)
+        return self.vectors[row]
+
+    def weights(self, function_id: int, skill_ids: List[int]) -> List[float]:
+        """Return the weights of the given skills for a function."""
+        if function_id is None or function_id not in self.function_index:
+            return [DEFAULT_SKILL_WEIGHT] * len(skill_ids)
+        missing = len(self.skill_index)
+        positions = [self.skill_index.get(skill_id, missing) for skill_id in skill_ids]
+        return self.vector(function_id)[positions].tolist()
+
+
+_weights = None
+_weights_lock = Lock()
+
+
+def get_function_skill_weights() -> FunctionSkillWeights:
+    """Return the process-wide function skill weights, loading them on first use."""
+    global _weights
+    with _weights_lock:
+        if _weights is None:
+            _weights = FunctionSkillWeights.load()
+        return _weights
+
+
+def clear_function_skill_weights() -> None:
+    """Drop the cached weights; called when FunctionSkill rows change."""
+    global _weights
+    with _weights_lock:
+        _weights = None
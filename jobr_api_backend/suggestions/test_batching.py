@@ -0,0 +1,142 @@
+import json
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.conf import settings
+from accounts.models import CustomUser, Employee, Company
+from vacancies.models import Vacancy
+from .llm import BATCH_SYSTEM_PROMPT, LLMBackend, StubBackend, build_batch_prompt, parse_batch_response
+from .models import AISuggestion, DeferredPair
+from .services import SuggestionService
+
+EMPLOYEE_DATA = {'biography': 'Chef', 'interests': ['food'], 'education': []}
+VACANCIES_DATA = [
+    {'description': f'Vacancy {i}', 'questions': [], 'company_description': 'Restaurant'} for i in range(3)
+]
+
+
+class CountingBackend(StubBackend):
+    def __init__(self):
+        self.calls = []
+
+    def complete(self, system_prompt, prompt, timeout):
+        self.calls.append(system_prompt)
+        return super().complete(system_prompt, prompt, timeout)
+
+
+class PartialBackend(LLMBackend):
+    """Backend whose batched responses only score the first vacancy."""
+    model = 'partial'
+
+    def __init__(self):
+        self.calls = []
+
+    def complete(self, system_prompt, prompt, timeout):
+        self.calls.append(system_prompt)
+        if system_prompt == BATCH_SYSTEM_PROMPT:
+            return 'Sure! [{"vacancy": 1, "score": 90, "explanation": "Great"}, {"vacancy": 2, "score": "n/a"}]'
+        return 'Score: 40\nExplanation: Single'
+
+
+class BatchPromptTests(SimpleTestCase):
+    def test_prompt_numbers_vacancies(self):
+        prompt = build_batch_prompt(EMPLOYEE_DATA, VACANCIES_DATA)
+
+        self.assertIn('- Biography: Chef', prompt)
+        for number in (1, 2, 3):
+            self.assertIn(f'Vacancy {number}:\n- Description: Vacancy {number - 1}', prompt)
+
+    def test_stub_scores_every_vacancy(self):
+        text = StubBackend().complete(BATCH_SYSTEM_PROMPT, build_batch_prompt(EMPLOYEE_DATA, VACANCIES_DATA), 1)
+
+        scores = parse_batch_response(text, 3)
+        self.assertEqual(sorted(scores), [0, 1, 2])
+        self.assertTrue(all(0 <= score <= 100 for score, _ in scores.values()))
+
+    def test_parse_json_in_prose(self):
+        text = 'Here you go:\n```json\n' + json.dumps([
+            {'vacancy': 2, 'score': 70, 'explanation': 'Fine'},
+            {'vacancy': 1, 'score': 120},
+        ]) + '\n```'
+
+        self.assertEqual(parse_batch_response(text, 2), {
+            0: (100, 'No detailed explanation available'),
+            1: (70, 'Fine'),
+        })
+
+    def test_parse_skips_invalid_items(self):
+        text = json.dumps([
+            {'vacancy': 1, 'score': 'high'},
+            {'vacancy': 4, 'score': 10},
+            {'vacancy': 2, 'score': 10, 'explanation': 'First'},
+            {'vacancy': 2, 'score': 20, 'explanation': 'Repeated'},
+            {'score': 30},
+            'Vacancy 3: 80',
+        ])
+
+        self.assertEqual(parse_batch_response(text, 3), {1: (10, 'First')})
+
+    def test_parse_garbage(self):
+        self.assertEqual(parse_batch_response('Score: 80', 2), {})
+        self.assertEqual(parse_batch_response('[not json]', 2), {})
+        self.assertEqual(parse_batch_response('{"vacancy": 1, "score": 80}', 2), {})
+
+    @override_settings(SUGGESTIONS={**settings.SUGGESTIONS, 'LLM_MAX_RETRIES': 0})
+    def test_missing_vacancies_fall_back_to_single_calls(self):
+        backend = PartialBackend()
+
+        scores, calls = SuggestionService.get_llm_batch_scores(EMPLOYEE_DATA, VACANCIES_DATA, backend)
+
+        self.assertEqual(scores, [(90, 'Great'), (40, 'Single'), (40, 'Single')])
+        self.assertEqual(calls, 3)
+        self.assertEqual(backend.calls.count(BATCH_SYSTEM_PROMPT), 1)
+
+
+@override_settings(SUGGESTIONS={**settings.SUGGESTIONS, 'LLM_BATCH_SIZE': 4})
+class BatchedGenerationTests(TestCase):
+    def setUp(self):
+        for i in range(2):
+            user = CustomUser.objects.create_user(
+                username=f'batch{i}@test.com',
+                email=f'batch{i}@test.com',
+                password='testpass123',
+                role='employee'
+            )
+            employee = Employee.objects.get(user=user)
+            employee.biography = f'Employee {i}'
+            employee.save()
+
+        company = Company.objects.create(name='Batch Company', description='Restaurant')
+        for i in range(6):
+            Vacancy.objects.create(company=company, title=f'Vacancy {i}', description=f'Vacancy {i}')
+
+    def generate(self, backend, **kwargs):
+        with patch('suggestions.services.get_backend', return_value=backend):
+            return SuggestionService.generate_suggestions(**kwargs)
+
+    def test_pairs_of_an_employee_share_calls(self):
+        backend = CountingBackend()
+        log = self.generate(backend)
+
+        # Six vacancies per employee in batches of four and two
+        self.assertEqual(backend.calls, [BATCH_SYSTEM_PROMPT] * 4)
+        self.assertEqual(log.llm_calls, 4)
+        self.assertEqual(log.suggestions_created, 12)
+        for suggestion in AISuggestion.objects.all():
+            self.assertTrue(suggestion.message.startswith('Stub score for vacancy'))
+
+        # Batched scores are cached per pair
+        backend = CountingBackend()
+        log = self.generate(backend, full=True)
+        self.assertEqual(backend.calls, [])
+        self.assertEqual(log.llm_cache_hits, 12)
+
+    def test_budget_counts_batched_calls(self):
+        with self.settings(SUGGESTIONS={**settings.SUGGESTIONS, 'LLM_CALL_BUDGET': 1, 'LLM_CACHE': False}):
+            backend = CountingBackend()
+            log = self.generate(backend)
+
+        self.assertEqual(len(backend.calls), 1)
+        self.assertEqual(log.suggestions_created, 4)
+        self.assertEqual(log.pairs_deferred, 8)
+        self.assertEqual(DeferredPair.objects.count(), 8)
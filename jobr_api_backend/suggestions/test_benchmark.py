@@ -0,0 +1,33 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from accounts.models import Company, Employee
+from vacancies.models import Vacancy
+from .models import AISuggestion
+
+
+class BenchmarkCommandTests(TestCase):
+    def test_reports_json_and_rolls_back(self):
+        out = StringIO()
+        call_command('benchmark_suggestions', employees=4, vacancies=3, skills=5, languages=2, functions=2, stdout=out)
+
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['pairs'], 12)
+        self.assertEqual(report['llm_pairs'] + report['pairs_pruned'], 12)
+        self.assertGreater(report['queries'], 0)
+        self.assertGreater(report['peak_rss_mb'], 0)
+        self.assertEqual(set(report['stage_seconds']), {'load', 'quantitative', 'qualitative'})
+
+        self.assertFalse(Employee.objects.exists())
+        self.assertFalse(Vacancy.objects.exists())
+        self.assertFalse(AISuggestion.objects.exists())
+
+    def test_refuses_to_run_next_to_real_data(self):
+        Vacancy.objects.create(company=Company.objects.create(name='Real Company'), title='Real vacancy')
+
+        with self.assertRaises(CommandError):
+            call_command('benchmark_suggestions', employees=2, vacancies=2, stdout=StringIO())
+        self.assertFalse(AISuggestion.objects.exists())
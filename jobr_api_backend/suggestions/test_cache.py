@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.conf import settings
+from django.utils import timezone
+from accounts.models import CustomUser, Employee, Company
+from vacancies.models import Vacancy
+from .cache import ScoreCache
+from .llm import LLMBackend, StubBackend
+from .models import LLMScoreCache
+from .services import SuggestionService
+
+
+EMPLOYEE_DATA = {'biography': 'Chef', 'interests': ['food'], 'education': []}
+VACANCY_DATA = {'description': 'Cook', 'questions': [], 'company_description': 'Restaurant'}
+
+
+class CountingBackend(StubBackend):
+    def __init__(self):
+        self.calls = 0
+
+    def complete(self, system_prompt, prompt, timeout):
+        self.calls += 1
+        return super().complete(system_prompt, prompt, timeout)
+
+
+class BrokenBackend(LLMBackend):
+    model = 'broken'
+
+    def complete(self, system_prompt, prompt, timeout):
+        raise ConnectionError('LLM unavailable')
+
+
+@override_settings(SUGGESTIONS={**settings.SUGGESTIONS, 'LLM_MAX_RETRIES': 0})
+class ScoreCacheTests(TestCase):
+    def test_key_depends_on_model_and_prompt(self):
+        key = ScoreCache.make_key('gpt-4', 'system', 'prompt')
+
+        self.assertEqual(key, ScoreCache.make_key('gpt-4', 'system', 'prompt'))
+        self.assertNotEqual(key, ScoreCache.make_key('gpt-4o', 'system', 'prompt'))
+        self.assertNotEqual(key, ScoreCache.make_key('gpt-4', 'system', 'prompt '))
+
+    def test_get_many_counts_hits_and_misses(self):
+        cache = ScoreCache()
+        cache.set('a' * 64, 'stub', 70.0, 'Good')
+
+        self.assertEqual(cache.get_many(['a' * 64, 'b' * 64]), {'a' * 64: (70.0, 'Good')})
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_evict_keeps_most_recently_used(self):
+        now = timezone.now()
+        for i in range(5):
+            entry = LLMScoreCache.objects.create(key=str(i) * 64, model='stub', score=i, explanation='')
+            LLMScoreCache.objects.filter(pk=entry.pk).update(last_used_at=now - timedelta(minutes=i))
+
+        evicted = ScoreCache(max_entries=3).evict()
+
+        self.assertEqual(evicted, 2)
+        self.assertEqual(
+            set(LLMScoreCache.objects.values_list('score', flat=True)),
+            {0.0, 1.0, 2.0}
+        )
+
+    def test_llm_score_consults_cache(self):
+        backend = CountingBackend()
+        cache = ScoreCache()
+
+        first = SuggestionService.get_llm_score(EMPLOYEE_DATA, VACANCY_DATA, backend, cache)
+        second = SuggestionService.get_llm_score(EMPLOYEE_DATA, VACANCY_DATA, backend, cache)
+
+        self.assertEqual(first, second)
+        self.assertEqual(backend.calls, 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_fallback_score_is_not_cached(self):
+        SuggestionService.get_llm_score(EMPLOYEE_DATA, VACANCY_DATA, BrokenBackend(), ScoreCache())
+        self.assertFalse(LLMScoreCache.objects.exists())
+
+
+@override_settings(SUGGESTIONS={**settings.SUGGESTIONS, 'LLM_BACKEND': 'suggestions.llm.StubBackend'})
+class CachedGenerationTests(TestCase):
+    def setUp(self):
+        company = Company.objects.create(name='Cache Company', description='Restaurant')
+        for i in range(2):
+            user = CustomUser.objects.create_user(
+                username=f'cache{i}@test.com',
+                email=f'cache{i}@test.com',
+                password='testpass123',
+                role='employee'
+            )
+            employee = Employee.objects.get(user=user)
+            employee.biography = f'Biography {i}'
+            employee.save()
+            Vacancy.objects.create(company=company, title=f'Vacancy {i}', description=f'Description {i}')
+
+    def test_rerun_is_served_from_cache(self):
+        first = SuggestionService.generate_suggestions()
+        self.assertEqual((first.llm_cache_hits, first.llm_cache_misses), (0, 4))
+        self.assertEqual(LLMScoreCache.objects.count(), 4)
+
+        second = SuggestionService.generate_suggestions(full=True)
+        self.assertEqual((second.llm_cache_hits, second.llm_cache_misses), (4, 0))
+        self.assertEqual(second.suggestions_updated, 4)
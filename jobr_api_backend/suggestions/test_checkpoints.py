@@ -0,0 +1,102 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.conf import settings
+from accounts.models import CustomUser, Employee, Company
+from vacancies.models import Vacancy
+from .models import AISuggestion, SuggestionGenerationLog, SuggestionCheckpoint
+from .services import SuggestionService
+
+
+class FailingLLM:
+    """Stand-in for get_llm_score that fails from the given call on."""
+
+    def __init__(self, fail_from=None):
+        self.fail_from = fail_from
+        self.calls = 0
+
+    def __call__(self, employee_data, vacancy_data, backend=None):
+        self.calls += 1
+        if self.fail_from is not None and self.calls >= self.fail_from:
+            raise RuntimeError('LLM outage')
+        return 50.0, 'Stub'
+
+
+@override_settings(SUGGESTIONS={
+    **settings.SUGGESTIONS,
+    'LLM_CACHE': False,
+    'LLM_MAX_IN_FLIGHT': 1,
+    'WRITE_CHUNK_SIZE': 2,
+})
+class CheckpointTests(TestCase):
+    def setUp(self):
+        self.employees = []
+        for i in range(4):
+            user = CustomUser.objects.create_user(
+                username=f'checkpoint{i}@test.com',
+                email=f'checkpoint{i}@test.com',
+                password='testpass123',
+                role='employee'
+            )
+            self.employees.append(Employee.objects.get(user=user))
+
+        company = Company.objects.create(name='Checkpoint Company')
+        for i in range(2):
+            Vacancy.objects.create(company=company, title=f'Vacancy {i}')
+
+    def generate(self, llm, **kwargs):
+        with patch.object(SuggestionService, 'get_llm_score', side_effect=llm):
+            return SuggestionService.generate_suggestions(**kwargs)
+
+    def test_failed_run_checkpoints_finished_employees(self):
+        with self.assertRaises(RuntimeError):
+            self.generate(FailingLLM(fail_from=5))
+
+        log = SuggestionGenerationLog.objects.get()
+        checkpoint = log.checkpoints.get()
+        self.assertFalse(log.is_successful)
+        self.assertEqual(checkpoint.last_employee_id, self.employees[1].id)
+        self.assertEqual(log.pairs_done, 4)
+
+    def test_resume_continues_after_checkpoint(self):
+        with self.assertRaises(RuntimeError):
+            self.generate(FailingLLM(fail_from=5))
+        failed = SuggestionGenerationLog.objects.get()
+
+        llm = FailingLLM()
+        log = self.generate(llm, resume=True)
+
+        self.assertTrue(log.is_successful)
+        self.assertEqual(log.resumed_from, failed)
+        self.assertEqual(log.watermark, failed.watermark)
+        self.assertEqual(llm.calls, 4)
+        self.assertEqual(log.suggestions_created, 4)
+        self.assertEqual(AISuggestion.objects.count(), 8)
+        self.assertEqual(log.checkpoints.get().last_employee_id, self.employees[-1].id)
+
+    def test_resume_chains_failed_runs(self):
+        with self.assertRaises(RuntimeError):
+            self.generate(FailingLLM(fail_from=5))
+        with self.assertRaises(RuntimeError):
+            self.generate(FailingLLM(fail_from=3), resume=True)
+
+        llm = FailingLLM()
+        self.generate(llm, resume=True)
+
+        self.assertEqual(llm.calls, 2)
+        self.assertEqual(AISuggestion.objects.count(), 8)
+
+    def test_resume_after_successful_run_starts_a_new_run(self):
+        self.generate(FailingLLM())
+
+        log = self.generate(FailingLLM(), resume=True, full=True)
+
+        self.assertIsNone(log.resumed_from)
+        self.assertEqual(log.suggestions_updated, 8)
+
+
+class CheckpointCoverageTests(SimpleTestCase):
+    def test_covers_employees_of_its_shard_up_to_the_checkpoint(self):
+        checkpoint = SuggestionCheckpoint(shard_index=1, shard_count=2, last_employee_id=5)
+
+        self.assertEqual([i for i in range(1, 9) if checkpoint.covers(i)], [1, 3, 5])
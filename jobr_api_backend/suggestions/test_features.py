@@ -0,0 +1,95 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from accounts.models import CustomUser, Employee, EmployeeLanguage, Company
+from vacancies.models import Vacancy, Language, VacancyLanguage, Skill, ContractType
+from .features import refresh_stale_features
+from .models import EmployeeFeatures, VacancyFeatures
+
+
+class FeatureSnapshotTests(TestCase):
+    def setUp(self):
+        self.dutch = Language.objects.create(name='Dutch')
+        self.french = Language.objects.create(name='French')
+        self.cooking = Skill.objects.create(name='cooking')
+        self.serving = Skill.objects.create(name='serving')
+        self.company = Company.objects.create(name='Feature Company', latitude=51.05, longitude=3.72)
+
+        user = CustomUser.objects.create_user(
+            username='features@test.com',
+            email='features@test.com',
+            password='testpass123',
+            role='employee'
+        )
+        self.employee = Employee.objects.get(user=user)
+        self.vacancy = Vacancy.objects.create(company=self.company, title='Cook')
+
+    def test_employee_snapshot_follows_relations(self):
+        self.employee.skill.add(self.serving, self.cooking)
+        EmployeeLanguage.objects.create(employee=self.employee, language=self.french, mastery='native')
+        EmployeeLanguage.objects.create(employee=self.employee, language=self.dutch, mastery='beginner')
+
+        features = EmployeeFeatures.objects.get(employee=self.employee)
+        self.assertTrue(features.is_active)
+        self.assertEqual(features.skill_ids, sorted([self.cooking.id, self.serving.id]))
+        self.assertEqual(features.language_ids, [self.dutch.id, self.french.id])
+        self.assertEqual(features.language_masteries, [25, 100])
+
+        self.employee.skill.remove(self.serving)
+        self.employee.user.is_active = False
+        self.employee.user.save()
+
+        features.refresh_from_db()
+        self.assertEqual(features.skill_ids, [self.cooking.id])
+        self.assertFalse(features.is_active)
+
+    def test_vacancy_snapshot_follows_relations(self):
+        self.vacancy.skill.add(self.cooking)
+        requirement = VacancyLanguage.objects.create(language=self.dutch, mastery='Intermediate')
+        self.vacancy.languages.add(requirement)
+        self.vacancy.contract_type.add(ContractType.objects.create(name='Student'))
+
+        features = VacancyFeatures.objects.get(vacancy=self.vacancy)
+        self.assertEqual(features.skill_ids, [self.cooking.id])
+        self.assertEqual((features.language_ids, features.language_masteries), ([self.dutch.id], [50]))
+        self.assertEqual(len(features.contract_type_ids), 1)
+        # Without its own location a vacancy is where its company is
+        self.assertEqual((features.latitude, features.longitude), (51.05, 3.72))
+
+        requirement.mastery = 'Expert'
+        requirement.save()
+        self.company.latitude, self.company.longitude = 50.85, 4.35
+        self.company.save()
+
+        features.refresh_from_db()
+        self.assertEqual(features.language_masteries, [100])
+        self.assertEqual((features.latitude, features.longitude), (50.85, 4.35))
+
+    def test_stale_snapshots_are_refreshed(self):
+        Employee.skill.through.objects.bulk_create([
+            Employee.skill.through(employee=self.employee, skill=self.cooking)
+        ])
+        Employee.objects.filter(pk=self.employee.pk).update(city_name='Gent', latitude=51.05, longitude=3.72)
+        self.assertEqual(EmployeeFeatures.objects.get(employee=self.employee).skill_ids, [])
+
+        # Bulk writes that bump updated_at are picked up
+        Employee.objects.filter(pk=self.employee.pk).update(updated_at=timezone.now())
+        VacancyFeatures.objects.all().delete()
+
+        self.assertEqual(refresh_stale_features(), (1, 1))
+        features = EmployeeFeatures.objects.get(employee=self.employee)
+        self.assertEqual(features.skill_ids, [self.cooking.id])
+        self.assertEqual((features.latitude, features.longitude), (51.05, 3.72))
+        self.assertTrue(VacancyFeatures.objects.filter(vacancy=self.vacancy).exists())
+        self.assertEqual(refresh_stale_features(), (0, 0))
+
+    def test_refresh_command(self):
+        EmployeeFeatures.objects.all().delete()
+        out = StringIO()
+
+        call_command('refresh_features', stdout=out)
+
+        self.assertIn('1 employees and 1 vacancies', out.getvalue())
+        self.assertTrue(EmployeeFeatures.objects.filter(employee=self.employee).exists())
@@ -0,0 +1,106 @@
+from django.core.cache import cache
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from accounts.models import CustomUser, Employee, Company, CompanyUser
+from vacancies.models import Vacancy
+from .models import AISuggestion, SuggestionGenerationLog
+
+
+@override_settings(SUGGESTIONS={**settings.SUGGESTIONS, 'FEED_SIZE': 4})
+class SuggestionFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.employee_user = CustomUser.objects.create_user(
+            username='feed@test.com',
+            email='feed@test.com',
+            password='testpass123',
+            role='employee'
+        )
+        self.employee = Employee.objects.get(user=self.employee_user)
+        other = Employee.objects.get(user=CustomUser.objects.create_user(
+            username='other@test.com',
+            email='other@test.com',
+            password='testpass123',
+            role='employee'
+        ))
+
+        self.employer_user = CustomUser.objects.create_user(
+            username='employer@test.com',
+            email='employer@test.com',
+            password='testpass123',
+            role='employer'
+        )
+        self.company = Company.objects.create(name='Feed Company')
+        CompanyUser.objects.create(company=self.company, user=self.employer_user, role='owner')
+        other_company = Company.objects.create(name='Other Company')
+
+        # Ties on total_score are ordered by id
+        scores = [90, 80, 80, 70, 60, 60, 50]
+        for i, score in enumerate(scores):
+            vacancy = Vacancy.objects.create(company=self.company, title=f'Vacancy {i}')
+            self.create_suggestion(self.employee, vacancy, score)
+        self.create_suggestion(other, Vacancy.objects.create(company=other_company, title='Elsewhere'), 99)
+
+    def tearDown(self):
+        cache.clear()
+
+    def create_suggestion(self, employee, vacancy, score):
+        return AISuggestion.objects.create(
+            employee=employee, vacancy=vacancy,
+            quantitative_score=score, qualitative_score=score, total_score=score, message='Feed'
+        )
+
+    def read_feed(self, user, page_size):
+        self.client.force_authenticate(user=user)
+        url = reverse('suggestion-list') + f'?page_size={page_size}'
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def expected(self, queryset):
+        return list(queryset.order_by('-total_score', '-id').values_list('id', flat=True))
+
+    def test_pages_cover_the_feed_and_beyond_in_order(self):
+        for page_size in (1, 2, 3, 5, 100):
+            self.assertEqual(
+                self.read_feed(self.employee_user, page_size),
+                self.expected(AISuggestion.objects.filter(employee=self.employee)),
+            )
+
+    def test_employer_sees_suggestions_of_their_companies(self):
+        ids = self.read_feed(self.employer_user, 3)
+
+        self.assertEqual(ids, self.expected(AISuggestion.objects.filter(vacancy__company=self.company)))
+
+    def test_feed_is_served_from_cache_until_a_run_completes(self):
+        self.client.force_authenticate(user=self.employee_user)
+        url = reverse('suggestion-list') + '?page_size=2'
+        self.client.get(url)
+
+        best = AISuggestion.objects.get(total_score=90)
+        best.total_score = 10
+        best.save()
+        # Only the latest run is looked up
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.data['results'][0]['id'], best.id)
+
+        SuggestionGenerationLog.objects.create(completed_at=timezone.now(), is_successful=True)
+        response = self.client.get(url)
+        self.assertNotEqual(response.data['results'][0]['id'], best.id)
+
+    def test_invalid_cursor(self):
+        self.client.force_authenticate(user=self.employee_user)
+
+        response = self.client.get(reverse('suggestion-list'), {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,126 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.conf import settings
+from accounts.models import CustomUser, Employee, Company
+from vacancies.models import Vacancy, Skill
+from .models import AISuggestion, EmployeeFeatures, SuggestionWeight, SuggestionGenerationLog
+from .services import SuggestionService
+
+
+@override_settings(SUGGESTIONS={**settings.SUGGESTIONS, 'LLM_CACHE': False})
+@patch.object(SuggestionService, 'get_llm_score', return_value=(50.0, 'Stub'))
+class IncrementalGenerationTests(TestCase):
+    def setUp(self):
+        self.employees = []
+        for i in range(2):
+            user = CustomUser.objects.create_user(
+                username=f'incremental{i}@test.com',
+                email=f'incremental{i}@test.com',
+                password='testpass123',
+                role='employee'
+            )
+            self.employees.append(Employee.objects.get(user=user))
+
+        company = Company.objects.create(name='Incremental Company')
+        self.vacancies = [
+            Vacancy.objects.create(company=company, title=f'Vacancy {i}')
+            for i in range(3)
+        ]
+        self.skill = Skill.objects.create(name='cooking')
+
+    def test_first_run_is_full_rebuild(self, llm):
+        log = SuggestionService.generate_suggestions()
+
+        self.assertTrue(log.is_successful)
+        self.assertTrue(log.is_full_rebuild)
+        self.assertEqual(log.suggestions_created, 6)
+        self.assertEqual(llm.call_count, 6)
+
+    def test_unchanged_run_rescores_nothing(self, llm):
+        SuggestionService.generate_suggestions()
+        llm.reset_mock()
+
+        log = SuggestionService.generate_suggestions()
+
+        self.assertFalse(log.is_full_rebuild)
+        self.assertEqual(llm.call_count, 0)
+        self.assertEqual(AISuggestion.objects.count(), 6)
+
+    def test_only_changed_employee_is_rescored(self, llm):
+        SuggestionService.generate_suggestions()
+        suggestion_ids = set(AISuggestion.objects.values_list('id', flat=True))
+        llm.reset_mock()
+
+        self.employees[0].skill.add(self.skill)
+        log = SuggestionService.generate_suggestions()
+
+        self.assertEqual(llm.call_count, 3)
+        self.assertEqual(log.suggestions_updated, 3)
+        self.assertEqual(log.suggestions_created, 0)
+        self.assertEqual(set(AISuggestion.objects.values_list('id', flat=True)), suggestion_ids)
+
+    def test_only_changed_vacancy_is_rescored(self, llm):
+        SuggestionService.generate_suggestions()
+        llm.reset_mock()
+
+        self.vacancies[1].skill.add(self.skill)
+        SuggestionService.generate_suggestions()
+
+        self.assertEqual(llm.call_count, 2)
+
+    def test_reverse_clear_marks_rows_changed(self, llm):
+        self.employees[0].skill.add(self.skill)
+        self.vacancies[1].skill.add(self.skill)
+        log = SuggestionService.generate_suggestions()
+
+        self.skill.employee_set.clear()
+        self.skill.vacancy_set.clear()
+
+        self.assertEqual(
+            SuggestionService.get_changed_since(log.watermark),
+            ({self.employees[0].id}, {self.vacancies[1].id})
+        )
+        self.assertEqual(EmployeeFeatures.objects.get(employee=self.employees[0]).skill_ids, [])
+
+    def test_new_vacancy_is_scored(self, llm):
+        SuggestionService.generate_suggestions()
+        llm.reset_mock()
+
+        Vacancy.objects.create(company=self.vacancies[0].company, title='New')
+        log = SuggestionService.generate_suggestions()
+
+        self.assertEqual(log.suggestions_created, 2)
+        self.assertEqual(AISuggestion.objects.count(), 8)
+
+    def test_weight_change_triggers_full_rescore(self, llm):
+        SuggestionService.generate_suggestions()
+        llm.reset_mock()
+
+        SuggestionWeight.objects.create(name='hard_skills', weight=40, field_type='quantitative')
+        log = SuggestionService.generate_suggestions()
+
+        self.assertTrue(log.is_full_rebuild)
+        self.assertEqual(llm.call_count, 6)
+
+    def test_deactivated_employee_suggestions_are_removed(self, llm):
+        SuggestionService.generate_suggestions()
+
+        user = self.employees[1].user
+        user.is_active = False
+        user.save()
+        SuggestionService.generate_suggestions()
+
+        self.assertFalse(AISuggestion.objects.filter(employee=self.employees[1]).exists())
+        self.assertEqual(AISuggestion.objects.count(), 3)
+
+    def test_failed_run_is_logged(self, llm):
+        with patch.object(SuggestionService, 'get_changed_since', side_effect=RuntimeError('boom')):
+            SuggestionService.generate_suggestions()
+            with self.assertRaises(RuntimeError):
+                SuggestionService.generate_suggestions()
+
+        log = SuggestionGenerationLog.objects.first()
+        self.assertFalse(log.is_successful)
+        self.assertEqual(log.error_message, 'boom')
+        self.assertIsNotNone(log.completed_at)
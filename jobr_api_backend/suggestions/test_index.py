@@ -0,0 +1,239 @@
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from accounts.models import CustomUser, Employee, EmployeeLanguage, Company
+from vacancies.models import Vacancy, Language, VacancyLanguage, Skill
+from .index import MatchIndex, match_index
+from .scoring import QuantitativeScorer
+from .services import SuggestionService
+from .weights import WeightProfile
+
+
+class MatchIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        rng = random.Random(7)
+        languages = [Language.objects.create(name=name) for name in ('Dutch', 'French', 'English')]
+        skills = [Skill.objects.create(name=f'skill {i}') for i in range(6)]
+        company = Company.objects.create(name='Index Company', latitude=51.05, longitude=3.72)
+
+        self.employees = []
+        for i in range(6):
+            user = CustomUser.objects.create_user(
+                username=f'index{i}@test.com',
+                email=f'index{i}@test.com',
+                password='testpass123',
+                role='employee'
+            )
+            employee = Employee.objects.get(user=user)
+            employee.skill.set(rng.sample(skills, rng.randint(0, 3)))
+            for language in rng.sample(languages, rng.randint(0, 2)):
+                EmployeeLanguage.objects.create(
+                    employee=employee, language=language,
+                    mastery=rng.choice(['beginner', 'intermediate', 'advanced', 'native'])
+                )
+            if i % 3:
+                # Spread around Brussels, some of them out of reach
+                Employee.objects.filter(pk=employee.pk).update(
+                    latitude=50.85 + rng.uniform(-1, 1), longitude=4.35 + rng.uniform(-1, 1),
+                    updated_at=timezone.now()
+                )
+            self.employees.append(employee)
+
+        self.vacancies = []
+        for i in range(8):
+            vacancy = Vacancy.objects.create(
+                company=company, title=f'Vacancy {i}', expected_mastery=rng.choice([None, 'Beginner', 'Advanced'])
+            )
+            if i % 2:
+                Vacancy.objects.filter(pk=vacancy.pk).update(
+                    latitude=50.85 + rng.uniform(-1, 1), longitude=4.35 + rng.uniform(-1, 1)
+                )
+            vacancy.skill.set(rng.sample(skills, rng.randint(0, 3)))
+            for language in rng.sample(languages, rng.randint(0, 2)):
+                vacancy.languages.add(VacancyLanguage.objects.create(
+                    language=language, mastery=rng.choice(['Beginner', 'Intermediate', 'Advanced', 'Expert'])
+                ))
+            self.vacancies.append(vacancy)
+
+    def test_posting_lists(self):
+        index = MatchIndex.build()
+
+        for vacancy in self.vacancies:
+            for skill in vacancy.skill.all():
+                self.assertIn(vacancy.id, index.vacancies_by_skill[skill.id])
+        for employee in self.employees:
+            for skill in employee.skill.all():
+                self.assertIn(employee.id, index.employees_by_skill[skill.id])
+
+    def test_overlap_is_symmetric(self):
+        index = MatchIndex.build()
+
+        for employee in self.employees:
+            for vacancy_id, count in index.vacancy_overlap(employee.id).items():
+                self.assertEqual(index.employee_overlap(vacancy_id)[employee.id], count)
+
+    def test_build_query_count_is_constant(self):
+        # Rows updated with querysets are refreshed by the first build
+        MatchIndex.build()
+
+        with self.assertNumQueries(4):
+            MatchIndex.build()
+
+    def test_matches_equal_matrix_scores(self):
+        weights = WeightProfile.compile([
+            ('distance', None, 'quantitative', 10),
+            ('languages', None, 'quantitative', 30),
+            ('hard_skills', 'advanced', 'quantitative', 5),
+        ])
+        index = MatchIndex.build()
+        scores = QuantitativeScorer(
+            [index.employee_profile(employee_id) for employee_id in index.employee_ids],
+            [index.vacancy_profile(vacancy_id) for vacancy_id in index.vacancy_ids],
+        ).quantitative_scores(weights)
+
+        for row, employee_id in enumerate(index.employee_ids):
+            matches = dict(index.matches_for_employee(employee_id, weights))
+            for col, vacancy_id in enumerate(index.vacancy_ids):
+                self.assertAlmostEqual(matches.get(vacancy_id, 0), scores[row, col], places=9)
+
+    def test_vacancy_matches_equal_matrix_scores(self):
+        weights = WeightProfile.compile([('distance', None, 'quantitative', 10)])
+        index = MatchIndex.build()
+        scores = QuantitativeScorer(
+            [index.employee_profile(employee_id) for employee_id in index.employee_ids],
+            [index.vacancy_profile(vacancy_id) for vacancy_id in index.vacancy_ids],
+        ).quantitative_scores(weights)
+
+        for col, vacancy_id in enumerate(index.vacancy_ids):
+            matches = dict(index.matches_for_vacancy(vacancy_id, weights))
+            for row, employee_id in enumerate(index.employee_ids):
+                self.assertAlmostEqual(matches.get(employee_id, 0), scores[row, col], places=9)
+
+    def test_distance_scores_equal_haversine(self):
+        index = MatchIndex.build()
+        scorer = QuantitativeScorer(
+            [index.employee_profile(employee_id) for employee_id in index.employee_ids],
+            [index.vacancy_profile(vacancy_id) for vacancy_id in index.vacancy_ids],
+        )
+        scores = scorer.distance_scores()
+
+        self.assertTrue(scores.any())
+        for row, employee_id in enumerate(index.employee_ids):
+            for col, vacancy_id in enumerate(index.vacancy_ids):
+                if employee_id in index.employee_coordinates:
+                    expected = SuggestionService.calculate_distance_score(
+                        index.employee_coordinates[employee_id], index.vacancy_coordinates[vacancy_id]
+                    )
+                else:
+                    expected = 0
+                self.assertAlmostEqual(scores[row, col], expected, places=9)
+
+    def test_shared_index_is_updated_in_place(self):
+        with match_index() as index:
+            pass
+        with self.assertNumQueries(0), match_index() as unchanged:
+            self.assertIs(unchanged, index)
+
+        skill = Skill.objects.create(name='new skill')
+        self.employees[0].skill.add(skill)
+
+        with match_index() as updated:
+            self.assertIs(updated, index)
+            self.assertEqual(index.employees_by_skill[skill.id], {self.employees[0].id})
+
+    def test_updates_follow_locations_activity_and_deletions(self):
+        with match_index() as index:
+            pass
+        company = Company.objects.get(name='Index Company')
+        company.latitude, company.longitude = 51.2, 4.4
+        company.save()
+        user = self.employees[1].user
+        user.is_active = False
+        user.save()
+        self.vacancies[2].delete()
+
+        with match_index() as updated:
+            self.assertIs(updated, index)
+            moved = list(Vacancy.objects.filter(latitude__isnull=True).values_list('id', flat=True))
+            self.assertTrue(moved)
+            for vacancy_id in moved:
+                self.assertEqual(index.vacancy_coordinates[vacancy_id], (51.2, 4.4))
+            self.assertNotIn(self.employees[1].id, index.employee_ids)
+            self.assertNotIn(self.vacancies[2].id, index.vacancy_ids)
+
+    def test_updated_index_equals_rebuilt_index(self):
+        rng = random.Random(3)
+        skills = list(Skill.objects.all())
+        weights = WeightProfile.compile([('distance', None, 'quantitative', 10)])
+        with match_index() as index:
+            pass
+
+        for employee in self.employees[:3]:
+            employee.skill.set(rng.sample(skills, 2))
+        for vacancy in self.vacancies[:3]:
+            vacancy.skill.set(rng.sample(skills, 1))
+            vacancy.languages.clear()
+
+        with match_index() as updated:
+            self.assertIs(updated, index)
+            rebuilt = MatchIndex.build()
+            self.assertEqual(index.employee_ids, rebuilt.employee_ids)
+            self.assertEqual(index.vacancy_ids, rebuilt.vacancy_ids)
+            self.assertEqual(index.open_vacancy_ids, rebuilt.open_vacancy_ids)
+            for employee_id in index.employee_ids:
+                self.assertEqual(
+                    index.matches_for_employee(employee_id, weights), rebuilt.matches_for_employee(employee_id, weights)
+                )
+
+    def test_language_required_twice_counts_twice(self):
+        weights = WeightProfile.compile([
+            ('distance', None, 'quantitative', 0),
+            ('languages', None, 'quantitative', 1),
+            ('hard_skills', None, 'quantitative', 0),
+        ])
+        dutch = Language.objects.create(name='Flemish')
+        EmployeeLanguage.objects.create(employee=self.employees[0], language=dutch, mastery='intermediate')
+        vacancy = Vacancy.objects.create(company=Company.objects.get(name='Index Company'), title='Twice')
+        for mastery in ('Beginner', 'Expert'):
+            vacancy.languages.add(VacancyLanguage.objects.create(language=dutch, mastery=mastery))
+
+        index = MatchIndex.build()
+        expected = SuggestionService.calculate_language_score(
+            [{'language': dutch.id, 'mastery': 'intermediate'}],
+            [{'language': dutch.id, 'mastery': 'Beginner'}, {'language': dutch.id, 'mastery': 'Expert'}],
+        )
+        self.assertEqual(expected, 75)
+        self.assertAlmostEqual(dict(index.matches_for_employee(self.employees[0].id, weights))[vacancy.id], expected)
+        self.assertAlmostEqual(dict(index.matches_for_vacancy(vacancy.id, weights))[self.employees[0].id], expected)
+
+    @override_settings(SUGGESTIONS={**settings.SUGGESTIONS, 'STALE_FEATURES_CHECK_INTERVAL': 0})
+    def test_shared_index_picks_up_rows_changed_without_signals(self):
+        with match_index() as index:
+            pass
+        skill = Skill.objects.create(name='bulk skill')
+        Employee.skill.through.objects.bulk_create([
+            Employee.skill.through(employee=self.employees[0], skill=skill)
+        ])
+        Employee.objects.filter(pk=self.employees[0].pk).update(updated_at=timezone.now())
+
+        with match_index() as updated:
+            self.assertIs(updated, index)
+            self.assertEqual(index.employees_by_skill[skill.id], {self.employees[0].id})
+
+    def test_matches_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(user=self.employees[0].user)
+
+        response = client.get(reverse('suggestion-matches'), {'limit': 3})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLessEqual(len(response.data), 3)
+        scores = [match['quantitative_score'] for match in response.data]
+        self.assertEqual(scores, sorted(scores, reverse=True))
@@ -0,0 +1,114 @@
+import threading
+import time
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.conf import settings
+from accounts.models import CustomUser, Employee, Company
+from vacancies.models import Vacancy
+from .llm import (
+    LLMBackend, StubBackend, ConcurrentScorer, build_prompt, complete_with_retry, parse_response
+)
+from .models import AISuggestion
+from .services import SuggestionService
+
+
+EMPLOYEE_DATA = {'biography': 'Chef', 'interests': ['food'], 'education': []}
+VACANCY_DATA = {'description': 'Cook', 'questions': [], 'company_description': 'Restaurant'}
+
+
+class FlakyBackend(LLMBackend):
+    """Backend failing a fixed number of times before answering."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+        self.timeouts = []
+
+    def complete(self, system_prompt, prompt, timeout):
+        self.calls += 1
+        self.timeouts.append(timeout)
+        if self.calls <= self.failures:
+            raise TimeoutError('Request timed out')
+        return 'Score: 80\nExplanation: Good match'
+
+
+@override_settings(SUGGESTIONS={**settings.SUGGESTIONS, 'LLM_MAX_RETRIES': 2, 'LLM_TIMEOUT': 5})
+class LLMBackendTests(SimpleTestCase):
+    def test_incomplete_backend_cannot_be_created(self):
+        class IncompleteBackend(LLMBackend):
+            model = 'incomplete'
+
+        with self.assertRaises(TypeError):
+            IncompleteBackend()
+
+    def test_stub_backend_is_deterministic(self):
+        prompt = build_prompt(EMPLOYEE_DATA, VACANCY_DATA)
+        first = StubBackend().complete('system', prompt, 1)
+        self.assertEqual(first, StubBackend().complete('system', prompt, 1))
+
+        score, explanation = parse_response(first)
+        self.assertTrue(0 <= score <= 100)
+        self.assertTrue(explanation.startswith('Stub score'))
+
+    def test_retries_until_success(self):
+        backend = FlakyBackend(failures=2)
+        text = complete_with_retry(backend, 'system', 'prompt')
+
+        self.assertEqual(backend.calls, 3)
+        self.assertEqual(backend.timeouts, [5, 5, 5])
+        self.assertEqual(parse_response(text), (80.0, 'Good match'))
+
+    def test_gives_up_after_max_retries(self):
+        backend = FlakyBackend(failures=5)
+        with self.assertRaises(TimeoutError):
+            complete_with_retry(backend, 'system', 'prompt')
+        self.assertEqual(backend.calls, 3)
+
+    def test_llm_score_falls_back_when_backend_fails(self):
+        score, explanation = SuggestionService.get_llm_score(
+            EMPLOYEE_DATA, VACANCY_DATA, backend=FlakyBackend(failures=5)
+        )
+        self.assertEqual(score, 50.0)
+        self.assertEqual(explanation, 'Error occurred while generating score')
+
+
+class ConcurrentScorerTests(SimpleTestCase):
+    def test_limits_calls_in_flight(self):
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+
+        def score(value):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.01)
+            with lock:
+                state['running'] -= 1
+            return value * 2
+
+        results = dict(ConcurrentScorer(max_in_flight=3).map(score, ((i, (i,)) for i in range(20))))
+
+        self.assertEqual(results, {i: i * 2 for i in range(20)})
+        self.assertLessEqual(state['peak'], 3)
+        self.assertGreater(state['peak'], 1)
+
+
+@override_settings(SUGGESTIONS={**settings.SUGGESTIONS, 'LLM_BACKEND': 'suggestions.llm.StubBackend'})
+class StubBackendGenerationTests(TestCase):
+    def test_generate_with_stub_backend(self):
+        user = CustomUser.objects.create_user(
+            username='llm@test.com',
+            email='llm@test.com',
+            password='testpass123',
+            role='employee'
+        )
+        employee = Employee.objects.get(user=user)
+        company = Company.objects.create(name='LLM Company', description='Restaurant')
+        for i in range(3):
+            Vacancy.objects.create(company=company, title=f'Vacancy {i}', description='Cook')
+
+        log = SuggestionService.generate_suggestions()
+
+        self.assertEqual(log.suggestions_created, 3)
+        for suggestion in AISuggestion.objects.filter(employee=employee):
+            self.assertTrue(suggestion.message.startswith('Stub score'))
@@ -0,0 +1,58 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.conf import settings
+from accounts.models import CustomUser, Employee, EmployeeLanguage, Company
+from vacancies.models import Vacancy, Language, VacancyLanguage, Skill, ProfileInterest, VacancyQuestion
+from .models import AISuggestion
+from .services import SuggestionService
+
+
+@override_settings(SUGGESTIONS={
+    **settings.SUGGESTIONS,
+    'LLM_BACKEND': 'suggestions.llm.StubBackend',
+    'CANDIDATES_PER_EMPLOYEE': 2,
+    'CANDIDATES_PER_VACANCY': None,
+})
+class GenerationQueryCountTests(TestCase):
+    def setUp(self):
+        self.dutch = Language.objects.create(name='Dutch')
+        self.cooking = Skill.objects.create(name='cooking')
+        self.interest = ProfileInterest.objects.create(name='food')
+        self.company = Company.objects.create(name='Query Company', description='Restaurant')
+
+    def populate(self, n_employees, n_vacancies):
+        start = Employee.objects.count()
+        for i in range(start, start + n_employees):
+            user = CustomUser.objects.create_user(
+                username=f'queries{i}@test.com',
+                email=f'queries{i}@test.com',
+                password='testpass123',
+                role='employee'
+            )
+            employee = Employee.objects.get(user=user)
+            employee.skill.add(self.cooking)
+            employee.interests.add(self.interest)
+            EmployeeLanguage.objects.create(employee=employee, language=self.dutch, mastery='advanced')
+
+        for i in range(n_vacancies):
+            vacancy = Vacancy.objects.create(company=self.company, title=f'Vacancy {i}', description='Cook')
+            vacancy.skill.add(self.cooking)
+            vacancy.questions.add(VacancyQuestion.objects.create(question=f'Question {i}'))
+            vacancy.languages.add(VacancyLanguage.objects.create(language=self.dutch, mastery='Intermediate'))
+
+    def count_generation_queries(self):
+        AISuggestion.objects.all().delete()
+        with CaptureQueriesContext(connection) as queries:
+            SuggestionService.generate_suggestions(full=True)
+        return len(queries)
+
+    def test_query_count_is_independent_of_population(self):
+        self.populate(2, 3)
+        small = self.count_generation_queries()
+
+        self.populate(6, 9)
+        large = self.count_generation_queries()
+
+        self.assertEqual(AISuggestion.objects.count(), 8 * 2)
+        self.assertEqual(small, large)
@@ -0,0 +1,161 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.conf import settings
+from rest_framework.test import APIClient, APIRequestFactory
+from accounts.models import CustomUser, Employee, ProfileOption
+from accounts.serializers import UserSerializer
+from vacancies.models import Vacancy, Skill, Function, Location
+from . import realtime
+from .feed import feed_cache_key
+from .index import MatchIndex, match_index
+from .models import AISuggestion
+from .services import SuggestionService
+
+
+class CountingLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, employee_data, vacancy_data, backend=None):
+        self.calls += 1
+        return 80.0, 'Real-time'
+
+
+@override_settings(SUGGESTIONS={
+    **settings.SUGGESTIONS,
+    'LLM_CACHE': False,
+    'REALTIME_WORKERS': 0,
+    'CANDIDATES_PER_VACANCY': 1,
+})
+class RealtimeScoringTests(TestCase):
+    def setUp(self):
+        self.cooking = Skill.objects.create(name='cooking')
+        self.employees = []
+        for i in range(2):
+            user = CustomUser.objects.create_user(
+                username=f'realtime{i}@test.com',
+                email=f'realtime{i}@test.com',
+                password='testpass123',
+                role=ProfileOption.EMPLOYEE
+            )
+            self.employees.append(Employee.objects.get(user=user))
+        self.employees[0].skill.add(self.cooking)
+
+        self.employer = CustomUser.objects.create_user(
+            username='realtime-employer@test.com',
+            email='realtime-employer@test.com',
+            password='testpass123',
+            role=ProfileOption.EMPLOYER
+        )
+        # Fields the vacancy serializer requires on every write
+        self.required = {
+            'expected_mastery': 'Beginner',
+            'location_id': Location.objects.create(name='Gent').id,
+            'function_id': Function.objects.create(name='Cook').id,
+        }
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.employer)
+        self.llm = CountingLLM()
+        patcher = patch.object(SuggestionService, 'get_llm_score', side_effect=self.llm)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_created_vacancy_is_scored(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/vacancies/vacancies/', {'title': 'Cook', 'description': 'Cook', **self.required}, format='json'
+            )
+
+        self.assertEqual(response.status_code, 201)
+        suggestion = AISuggestion.objects.get(vacancy_id=response.data['id'])
+        self.assertEqual((suggestion.qualitative_score, suggestion.message), (80.0, 'Real-time'))
+        self.assertEqual(self.llm.calls, 1)
+
+    def test_updated_vacancy_is_scored_against_best_candidates(self):
+        vacancy = Vacancy.objects.create(company=self.employer.selected_company, title='Cook')
+        vacancy.skill.add(self.cooking)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                f'/api/vacancies/vacancies/{vacancy.id}/', {'title': 'Chef', **self.required}, format='json'
+            )
+
+        self.assertEqual(response.status_code, 200)
+        # Only the employee with the skill is among the candidates
+        self.assertEqual(
+            list(AISuggestion.objects.filter(vacancy=vacancy).values_list('employee_id', flat=True)),
+            [self.employees[0].id]
+        )
+
+    def test_profile_update_scores_employee(self):
+        vacancy = Vacancy.objects.create(company=self.employer.selected_company, title='Cook')
+        employee = self.employees[1]
+        request = APIRequestFactory().patch('/')
+        serializer = UserSerializer(
+            employee.user, data={'employee_profile': {'biography': 'Chef'}}, partial=True, context={'request': request}
+        )
+        serializer.is_valid(raise_exception=True)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            serializer.save()
+
+        self.assertTrue(AISuggestion.objects.filter(employee=employee, vacancy=vacancy).exists())
+
+    def test_jobs_wait_for_commit(self):
+        vacancy = Vacancy.objects.create(company=self.employer.selected_company, title='Cook')
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            realtime.enqueue_vacancy_scoring(vacancy.id)
+            self.assertFalse(AISuggestion.objects.exists())
+
+        self.assertEqual(len(callbacks), 1)
+        with self.settings(SUGGESTIONS={**settings.SUGGESTIONS, 'REALTIME_SCORING': False}):
+            with self.captureOnCommitCallbacks() as callbacks:
+                realtime.enqueue_vacancy_scoring(vacancy.id)
+        self.assertEqual(callbacks, [])
+
+    def test_scoring_invalidates_feeds(self):
+        vacancy = Vacancy.objects.create(company=self.employer.selected_company, title='Cook')
+        vacancy.skill.add(self.cooking)
+        for user in (self.employer, self.employees[0].user):
+            cache.set(feed_cache_key(user), [])
+
+        realtime.score_vacancy(vacancy.id)
+
+        for user in (self.employer, self.employees[0].user):
+            self.assertIsNone(cache.get(feed_cache_key(user)))
+
+    def test_jobs_update_the_index_in_place(self):
+        cache.clear()
+        vacancy = Vacancy.objects.create(company=self.employer.selected_company, title='Cook')
+        with match_index() as index:
+            pass
+        vacancy.skill.add(self.cooking)
+
+        with patch.object(MatchIndex, 'build') as build:
+            realtime.score_vacancy(vacancy.id)
+            realtime.score_employee(self.employees[0].id)
+
+        build.assert_not_called()
+        self.assertIn(vacancy.id, index.vacancies_by_skill[self.cooking.id])
+        self.assertTrue(AISuggestion.objects.filter(employee=self.employees[0], vacancy=vacancy).exists())
+
+    def test_inactive_employee_is_not_scored(self):
+        Vacancy.objects.create(company=self.employer.selected_company, title='Cook')
+        user = self.employees[0].user
+        user.is_active = False
+        user.save()
+
+        self.assertEqual(realtime.score_employee(self.employees[0].id), 0)
+
+    @override_settings(SUGGESTIONS={**settings.SUGGESTIONS, 'REALTIME_WORKERS': 2})
+    def test_queued_jobs_are_not_submitted_twice(self):
+        with patch.object(realtime, 'get_executor') as get_executor:
+            realtime.submit('vacancy', 1)
+            realtime.submit('vacancy', 1)
+            realtime.submit('employee', 1)
+
+        self.assertEqual(get_executor.return_value.submit.call_count, 2)
+        realtime._queued.clear()
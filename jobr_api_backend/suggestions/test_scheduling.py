@@ -0,0 +1,144 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.conf import settings
+from django.utils import timezone
+from accounts.models import CustomUser, Employee, Company
+from vacancies.models import Vacancy, Skill
+from .models import AISuggestion, DeferredPair
+from .scheduling import LLMScheduler, estimate_tokens, recency
+from .services import LLM_FALLBACK_SCORE, SuggestionService
+
+
+class LLMSchedulerTests(SimpleTestCase):
+    def test_drains_highest_priority_first(self):
+        scheduler = LLMScheduler(max_calls=10)
+        for priority, item in [(10, 'low'), (90, 'high'), (50, 'middle'), (50, 'middle again')]:
+            scheduler.push(priority, 100, item)
+
+        self.assertEqual(list(scheduler.drain()), ['high', 'middle', 'middle again', 'low'])
+        self.assertEqual((scheduler.calls, scheduler.tokens), (4, 400))
+
+    def test_call_budget_defers_the_rest(self):
+        scheduler = LLMScheduler(max_calls=2)
+        for priority in [10, 30, 20, 40]:
+            scheduler.push(priority, 100, priority)
+
+        self.assertEqual(list(scheduler.drain()), [40, 30])
+        self.assertEqual(scheduler.deferred(), [(20, 20), (10, 10)])
+        self.assertEqual(len(scheduler), 0)
+
+    def test_token_budget(self):
+        scheduler = LLMScheduler(max_tokens=250)
+        for priority, tokens in [(4, 100), (3, 100), (2, 100), (1, 50)]:
+            scheduler.push(priority, tokens, priority)
+
+        # The cheap pair still fits after the third did not
+        self.assertEqual(list(scheduler.drain()), [4, 3, 1])
+        self.assertEqual(scheduler.tokens, 250)
+        self.assertEqual(scheduler.deferred(), [(2, 2)])
+
+    def test_batched_pairs_share_calls(self):
+        scheduler = LLMScheduler(max_calls=2, batch_size=2)
+        for priority, group in [(90, 'a'), (80, 'b'), (70, 'a'), (60, 'a'), (50, 'b')]:
+            scheduler.push(priority, 10, (group, priority), batch_tokens=100, group=group)
+
+        # 'a' opens a call that 70 joins and 'b' opens the second one that 50 joins;
+        # 60 would need a third call
+        self.assertEqual(list(scheduler.drain()), [('a', 90), ('b', 80), ('a', 70), ('b', 50)])
+        self.assertEqual((scheduler.calls, scheduler.tokens), (2, 240))
+        self.assertEqual(scheduler.deferred(), [(60, ('a', 60))])
+
+    def test_unlimited(self):
+        self.assertTrue(LLMScheduler().unlimited)
+        self.assertFalse(LLMScheduler(max_tokens=0).unlimited)
+
+    def test_estimates(self):
+        self.assertEqual(estimate_tokens('a' * 8, 'b' * 5), 2 + 2 + 150)
+        now = timezone.now()
+        self.assertEqual(recency(now, now, 7), 100)
+        self.assertAlmostEqual(recency(now - timedelta(days=14), now, 7), 25)
+
+
+class RecordingLLM:
+    """Stand-in for get_llm_score that records which biographies it scored."""
+
+    def __init__(self):
+        self.scored = []
+
+    def __call__(self, employee_data, vacancy_data, backend=None):
+        self.scored.append((employee_data['biography'], vacancy_data['description']))
+        return 50.0, 'Stub'
+
+
+@override_settings(SUGGESTIONS={
+    **settings.SUGGESTIONS,
+    'LLM_CACHE': False,
+    'LLM_MAX_IN_FLIGHT': 1,
+    'LLM_CALL_BUDGET': 2,
+})
+class BudgetedRunTests(TestCase):
+    def setUp(self):
+        cooking = Skill.objects.create(name='cooking')
+        self.employees = []
+        for i in range(3):
+            user = CustomUser.objects.create_user(
+                username=f'budget{i}@test.com',
+                email=f'budget{i}@test.com',
+                password='testpass123',
+                role='employee'
+            )
+            employee = Employee.objects.get(user=user)
+            employee.biography = f'employee {i}'
+            employee.save()
+            self.employees.append(employee)
+        self.employees[0].skill.add(cooking)
+
+        company = Company.objects.create(name='Budget Company')
+        self.cook = Vacancy.objects.create(company=company, title='Cook', description='cook')
+        self.cook.skill.add(cooking)
+        Vacancy.objects.create(company=company, title='Anything', description='anything')
+
+    def generate(self, llm, **kwargs):
+        with patch.object(SuggestionService, 'get_llm_score', side_effect=llm):
+            return SuggestionService.generate_suggestions(**kwargs)
+
+    def test_budget_scores_best_pairs_and_defers_the_rest(self):
+        llm = RecordingLLM()
+        log = self.generate(llm)
+
+        self.assertEqual(len(llm.scored), 2)
+        # Employees without the skill are the worst cooks
+        self.assertNotIn(('employee 1', 'cook'), llm.scored)
+        self.assertNotIn(('employee 2', 'cook'), llm.scored)
+        self.assertEqual((log.llm_calls, log.pairs_deferred), (2, 4))
+        self.assertEqual(DeferredPair.objects.filter(log=log).count(), 4)
+        self.assertEqual(AISuggestion.objects.count(), 2)
+
+    def test_next_run_scores_deferred_pairs(self):
+        self.generate(RecordingLLM())
+
+        llm = RecordingLLM()
+        log = self.generate(llm)
+        self.assertFalse(log.is_full_rebuild)
+        self.assertEqual(len(llm.scored), 2)
+        self.assertEqual(DeferredPair.objects.count(), 2)
+
+        with self.settings(SUGGESTIONS={**settings.SUGGESTIONS, 'LLM_CALL_BUDGET': None}):
+            llm = RecordingLLM()
+            log = self.generate(llm)
+
+        self.assertEqual(len(llm.scored), 2)
+        self.assertEqual((log.llm_calls, log.pairs_deferred), (2, 0))
+        self.assertFalse(DeferredPair.objects.exists())
+        self.assertEqual(AISuggestion.objects.count(), 6)
+
+    def test_failed_deferred_pairs_stay_deferred(self):
+        self.generate(RecordingLLM())
+        deferred = set(DeferredPair.objects.values_list('employee_id', 'vacancy_id'))
+
+        with self.settings(SUGGESTIONS={**settings.SUGGESTIONS, 'LLM_CALL_BUDGET': None}):
+            self.generate(lambda *args, **kwargs: LLM_FALLBACK_SCORE)
+
+        self.assertEqual(set(DeferredPair.objects.values_list('employee_id', 'vacancy_id')), deferred)
@@ -0,0 +1,231 @@
+import random
+from unittest.mock import patch
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.conf import settings
+from django.utils import timezone
+from accounts.models import CustomUser, Employee, EmployeeLanguage, Company
+from vacancies.models import Vacancy, Language, VacancyLanguage, Skill
+from .models import AISuggestion
+from .scoring import QuantitativeScorer, best_rows, select_candidates
+from .services import SuggestionService
+from .weights import WeightProfile
+
+
+EMPLOYEE_MASTERIES = ['beginner', 'intermediate', 'advanced', 'native']
+VACANCY_MASTERIES = ['Beginner', 'Intermediate', 'Advanced', 'Expert']
+LANGUAGES = ['Dutch', 'French', 'English', 'German', 'Spanish']
+SKILLS = ['cooking', 'cleaning', 'serving', 'bartending', 'cashier', 'driving', 'stocking']
+
+
+def random_profile(rng, masteries):
+    return {
+        'languages': [
+            {'language': rng.choice(LANGUAGES), 'mastery': rng.choice(masteries)}
+            for _ in range(rng.randint(0, 4))
+        ],
+        'skills': [rng.choice(SKILLS) for _ in range(rng.randint(0, 5))],
+    }
+
+
+class QuantitativeScorerParityTests(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(42)
+        self.employees = [random_profile(rng, EMPLOYEE_MASTERIES) for _ in range(40)]
+        self.vacancies = [random_profile(rng, VACANCY_MASTERIES) for _ in range(30)]
+        self.scorer = QuantitativeScorer(self.employees, self.vacancies)
+
+    def test_language_scores_match_per_pair(self):
+        scores = self.scorer.language_scores()
+        for row, employee in enumerate(self.employees):
+            for col, vacancy in enumerate(self.vacancies):
+                expected = SuggestionService.calculate_language_score(
+                    employee['languages'], vacancy['languages']
+                )
+                self.assertAlmostEqual(scores[row, col], expected, places=9)
+
+    def test_skills_scores_match_per_pair(self):
+        scores = self.scorer.skills_scores()
+        for row, employee in enumerate(self.employees):
+            for col, vacancy in enumerate(self.vacancies):
+                expected = SuggestionService.calculate_skills_score(
+                    employee['skills'], vacancy['skills']
+                )
+                self.assertAlmostEqual(scores[row, col], expected, places=9)
+
+    def test_row_slice_matches_full_matrix(self):
+        weights = WeightProfile.compile([
+            ('distance', None, 'quantitative', 10),
+            ('languages', None, 'quantitative', 30),
+        ])
+        full = self.scorer.quantitative_scores(weights)
+        block = self.scorer.quantitative_scores(weights, rows=slice(5, 15))
+        self.assertEqual(block.shape, (10, len(self.vacancies)))
+        self.assertTrue((full[5:15] == block).all())
+
+    def test_empty_population(self):
+        scorer = QuantitativeScorer([], [])
+        self.assertEqual(scorer.quantitative_scores(WeightProfile.compile([])).shape, (0, 0))
+
+
+class SelectCandidatesTests(SimpleTestCase):
+    def setUp(self):
+        self.scores = np.array([
+            [90, 10, 50, 20],
+            [80, 70, 60, 95],
+            [10, 20, 30, 40],
+        ], dtype=float)
+
+    def test_top_k_per_employee(self):
+        mask = select_candidates(self.scores, per_employee=2)
+        self.assertEqual(mask.tolist(), [
+            [True, False, True, False],
+            [True, False, False, True],
+            [False, False, True, True],
+        ])
+
+    def test_union_with_top_k_per_vacancy(self):
+        mask = select_candidates(self.scores, per_employee=1, per_vacancy=1)
+        # Vacancy 1 is nobody's favourite but still gets its best employee
+        self.assertEqual(mask.tolist(), [
+            [True, False, False, False],
+            [False, True, True, True],
+            [False, False, False, True],
+        ])
+
+    def test_no_limit_keeps_every_pair(self):
+        self.assertTrue(select_candidates(self.scores).all())
+        self.assertTrue(select_candidates(self.scores, per_employee=10).all())
+
+    def test_best_rows_ranked_in_chunks(self):
+        best = best_rows(lambda rows: self.scores[rows], 3, 4, k=2, chunk_size=1)
+        self.assertEqual(best.tolist(), [[0, 1, 1, 1], [1, 2, 0, 2]])
+
+    def test_rows_of_a_shard_match_the_full_mask(self):
+        rng = np.random.default_rng(1)
+        # Few distinct values, so ties have to be broken the same way
+        scores = rng.integers(0, 4, (30, 12)).astype(float)
+        full = select_candidates(scores, per_employee=2, per_vacancy=3)
+        vacancy_best = best_rows(lambda rows: scores[rows], 30, 12, k=3, chunk_size=7)
+
+        rows = np.arange(1, 30, 3)
+        mask = select_candidates(scores[rows], per_employee=2, per_vacancy=3, rows=rows, vacancy_best=vacancy_best)
+        self.assertEqual(mask.tolist(), full[rows].tolist())
+
+
+class GenerateSuggestionsScoringTests(TestCase):
+    def setUp(self):
+        user = CustomUser.objects.create_user(
+            username='scoring@test.com',
+            email='scoring@test.com',
+            password='testpass123',
+            role='employee'
+        )
+        self.employee = Employee.objects.get(user=user)
+        dutch = Language.objects.create(name='Dutch')
+        cooking = Skill.objects.create(name='cooking')
+        EmployeeLanguage.objects.create(employee=self.employee, language=dutch, mastery='intermediate')
+        self.employee.skill.add(cooking)
+
+        company = Company.objects.create(name='Scoring Company')
+        self.vacancy = Vacancy.objects.create(company=company, title='Cook')
+        self.vacancy.languages.add(VacancyLanguage.objects.create(language=dutch, mastery='Advanced'))
+        self.vacancy.skill.add(cooking, Skill.objects.create(name='cleaning'))
+
+    @patch.object(SuggestionService, 'get_llm_score', return_value=(50.0, 'Stub'))
+    def test_generate_uses_batch_scores(self, _):
+        SuggestionService.generate_suggestions()
+
+        suggestion = AISuggestion.objects.get(employee=self.employee, vacancy=self.vacancy)
+        language_score = SuggestionService.calculate_language_score(
+            [{'language': 'Dutch', 'mastery': 'intermediate'}],
+            [{'language': 'Dutch', 'mastery': 'Advanced'}],
+        )
+        skills_score = SuggestionService.calculate_skills_score(['cooking'], ['cooking', 'cleaning'])
+        self.assertAlmostEqual(
+            suggestion.quantitative_score,
+            (language_score * 20 + skills_score * 20) / 60
+        )
+
+
+@override_settings(SUGGESTIONS={
+    **settings.SUGGESTIONS, 'CANDIDATES_PER_EMPLOYEE': 1, 'CANDIDATES_PER_VACANCY': None
+})
+class CandidateRetrievalTests(TestCase):
+    def setUp(self):
+        company = Company.objects.create(name='Candidate Company')
+        skills = [Skill.objects.create(name=f'skill {i}') for i in range(3)]
+        self.vacancies = []
+        for i, skill in enumerate(skills):
+            vacancy = Vacancy.objects.create(company=company, title=f'Vacancy {i}')
+            vacancy.skill.add(skill)
+            self.vacancies.append(vacancy)
+
+        self.employees = []
+        for i, skill in enumerate(skills):
+            user = CustomUser.objects.create_user(
+                username=f'candidate{i}@test.com',
+                email=f'candidate{i}@test.com',
+                password='testpass123',
+                role='employee'
+            )
+            employee = Employee.objects.get(user=user)
+            employee.skill.add(skill)
+            self.employees.append(employee)
+
+    @patch.object(SuggestionService, 'get_llm_score', return_value=(50.0, 'Stub'))
+    def test_only_top_candidates_are_scored(self, llm):
+        log = SuggestionService.generate_suggestions()
+
+        self.assertEqual(llm.call_count, 3)
+        self.assertEqual(log.pairs_pruned, 6)
+        self.assertEqual(
+            set(AISuggestion.objects.values_list('employee_id', 'vacancy_id')),
+            {(employee.id, vacancy.id) for employee, vacancy in zip(self.employees, self.vacancies)}
+        )
+
+    @patch.object(SuggestionService, 'get_llm_score', return_value=(50.0, 'Stub'))
+    def test_pruned_pair_loses_stale_suggestion(self, llm):
+        SuggestionService.generate_suggestions()
+
+        # Employee 0 now matches vacancy 1 best, so vacancy 0 drops out
+        self.employees[0].skill.set(self.vacancies[1].skill.all())
+        SuggestionService.generate_suggestions()
+
+        self.assertEqual(
+            list(AISuggestion.objects.filter(employee=self.employees[0]).values_list('vacancy_id', flat=True)),
+            [self.vacancies[1].id]
+        )
+
+    @patch.object(SuggestionService, 'get_llm_score', return_value=(50.0, 'Stub'))
+    def test_unchanged_pair_moving_into_candidates_is_scored(self, llm):
+        # Employee 0 matches vacancy 0 fully and half of vacancy 1
+        self.employees[0].skill.add(*self.vacancies[1].skill.all())
+        self.vacancies[1].skill.add(Skill.objects.create(name='other'))
+        SuggestionService.generate_suggestions()
+
+        # Only vacancy 0 changes, leaving unchanged vacancy 1 the best match of employee 0
+        self.vacancies[0].skill.set([Skill.objects.create(name='new')])
+        SuggestionService.generate_suggestions()
+
+        self.assertEqual(
+            list(AISuggestion.objects.filter(employee=self.employees[0]).values_list('vacancy_id', flat=True)),
+            [self.vacancies[1].id]
+        )
+
+    @patch.object(SuggestionService, 'get_llm_score', return_value=(50.0, 'Stub'))
+    def test_unchanged_pair_dropping_out_loses_stale_suggestion(self, llm):
+        Employee.objects.filter(pk=self.employees[0].pk).update(latitude=50.85, longitude=4.35, updated_at=timezone.now())
+        SuggestionService.generate_suggestions()
+
+        # Only vacancy 1 changes, but it now beats vacancy 0 for employee 0
+        self.vacancies[1].latitude, self.vacancies[1].longitude = 50.86, 4.36
+        self.vacancies[1].save()
+        self.vacancies[1].skill.set(self.vacancies[0].skill.all())
+        SuggestionService.generate_suggestions()
+
+        self.assertEqual(
+            list(AISuggestion.objects.filter(employee=self.employees[0]).values_list('vacancy_id', flat=True)),
+            [self.vacancies[1].id]
+        )
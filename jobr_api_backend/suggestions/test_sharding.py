@@ -0,0 +1,146 @@
+import random
+from io import StringIO
+from unittest.mock import patch
+
+import numpy as np
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.conf import settings
+from accounts.models import CustomUser, Employee, Company
+from vacancies.models import Skill, Vacancy
+from .management.commands.generate_suggestions import parse_shard
+from .models import AISuggestion, SuggestionGenerationLog
+from .services import ShardRun, SuggestionService
+from .weights import WeightProfile
+
+
+class InlineExecutor:
+    """Stand-in for ProcessPoolExecutor that runs shards in the test process."""
+
+    def __init__(self, max_workers, mp_context):
+        self.max_workers = max_workers
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, fn, *args):
+        from concurrent.futures import Future
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def run_shard_inline(log_id, shard_index, shard_count):
+    log = SuggestionGenerationLog.objects.get(pk=log_id)
+    return SuggestionService.run_shard(log, shard_index, shard_count)
+
+
+@override_settings(SUGGESTIONS={**settings.SUGGESTIONS, 'LLM_CACHE': False})
+@patch.object(SuggestionService, 'get_llm_score', return_value=(50.0, 'Stub'))
+class ShardedGenerationTests(TestCase):
+    def setUp(self):
+        self.employees = []
+        for i in range(5):
+            user = CustomUser.objects.create_user(
+                username=f'shard{i}@test.com',
+                email=f'shard{i}@test.com',
+                password='testpass123',
+                role='employee'
+            )
+            self.employees.append(Employee.objects.get(user=user))
+
+        company = Company.objects.create(name='Shard Company')
+        for i in range(2):
+            Vacancy.objects.create(company=company, title=f'Vacancy {i}')
+
+    def test_shards_cover_employees_once(self, llm):
+        logs = [SuggestionService.generate_suggestions(shard=(index, 3)) for index in range(3)]
+
+        self.assertEqual(llm.call_count, 10)
+        self.assertEqual(sum(log.suggestions_created for log in logs), 10)
+        self.assertEqual(AISuggestion.objects.count(), 10)
+        for index, log in enumerate(logs):
+            self.assertEqual((log.shard_index, log.shard_count), (index, 3))
+            shard_employees = [employee for employee in self.employees if employee.id % 3 == index]
+            self.assertEqual(log.suggestions_created, 2 * len(shard_employees))
+
+    def test_shard_continues_from_its_own_last_run(self, llm):
+        SuggestionService.generate_suggestions(shard=(0, 2))
+
+        # Shard 1 has never run, so it still rebuilds its employees
+        self.assertTrue(SuggestionService.generate_suggestions(shard=(1, 2)).is_full_rebuild)
+        self.assertFalse(SuggestionService.generate_suggestions(shard=(0, 2)).is_full_rebuild)
+
+    def test_unsharded_run_ignores_sharded_runs(self, llm):
+        SuggestionService.generate_suggestions(shard=(0, 2))
+
+        log = SuggestionService.generate_suggestions()
+
+        self.assertTrue(log.is_full_rebuild)
+
+    @patch('suggestions.services.run_shard_process', side_effect=run_shard_inline)
+    @patch('suggestions.services.ProcessPoolExecutor', InlineExecutor)
+    def test_workers_merge_counts_into_one_log(self, shard_process, llm):
+        log = SuggestionService.generate_suggestions(workers=3)
+
+        self.assertEqual(shard_process.call_count, 3)
+        self.assertEqual(log.suggestions_created, 10)
+        self.assertIsNone(log.shard_count)
+        self.assertEqual(SuggestionGenerationLog.objects.count(), 1)
+        self.assertEqual(AISuggestion.objects.count(), 10)
+
+
+@override_settings(SUGGESTIONS={**settings.SUGGESTIONS, 'CANDIDATES_PER_EMPLOYEE': 1, 'CANDIDATES_PER_VACANCY': 2})
+class ShardRunStageTests(TestCase):
+    def setUp(self):
+        rng = random.Random(5)
+        skills = [Skill.objects.create(name=f'skill {i}') for i in range(4)]
+        for i in range(7):
+            user = CustomUser.objects.create_user(
+                username=f'stage{i}@test.com',
+                email=f'stage{i}@test.com',
+                password='testpass123',
+                role='employee'
+            )
+            Employee.objects.get(user=user).skill.set(rng.sample(skills, rng.randint(0, 2)))
+        company = Company.objects.create(name='Stage Company')
+        for i in range(4):
+            Vacancy.objects.create(company=company, title=f'Vacancy {i}').skill.set(rng.sample(skills, 2))
+        self.log = SuggestionGenerationLog.objects.create(weights=WeightProfile.compile([]).as_dict())
+
+    def ranked(self, *shard):
+        run = ShardRun(self.log, *shard)
+        run.load()
+        run.rank()
+        return run
+
+    def test_shard_ranks_only_its_rows(self):
+        unsharded = self.ranked()
+        self.assertEqual(unsharded.candidates.shape, (7, 4))
+
+        for index in range(3):
+            shard = self.ranked(index, 3)
+            rows = [row for row, employee in enumerate(unsharded.employees) if employee.id % 3 == index]
+            self.assertEqual(shard.employees, [unsharded.employees[row] for row in rows])
+            self.assertEqual(shard.quantitative_scores.shape, (len(rows), 4))
+            self.assertTrue(np.allclose(shard.quantitative_scores, unsharded.quantitative_scores[rows]))
+            # The best employees per vacancy are still ranked against everyone
+            self.assertEqual(shard.candidates.tolist(), unsharded.candidates[rows].tolist())
+
+
+class ShardArgumentTests(SimpleTestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard('2/4'), (2, 4))
+
+    def test_invalid_shard(self):
+        for value in ('4/4', '-1/4', '1/0', 'one/two', '1'):
+            with self.assertRaises(CommandError):
+                parse_shard(value)
+
+    def test_shard_and_workers_are_exclusive(self):
+        with self.assertRaises(CommandError):
+            call_command('generate_suggestions', shard='0/2', workers=2, stdout=StringIO())
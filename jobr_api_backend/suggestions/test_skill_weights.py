@@ -0,0 +1,132 @@
+import random
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.conf import settings
+from accounts.models import CustomUser, Employee, Company
+from vacancies.models import Vacancy, Skill, Function, FunctionSkill
+from .index import MatchIndex
+from .scoring import QuantitativeScorer
+from .services import SuggestionService
+from .weights import WeightProfile
+from . import skill_weights
+from .skill_weights import FunctionSkillWeights, get_function_skill_weights
+
+SKILLS = ['cooking', 'cleaning', 'serving', 'bartending', 'cashier']
+
+
+class WeightedSkillsScoreTests(SimpleTestCase):
+    def test_weights_change_the_score(self):
+        score = SuggestionService.calculate_skills_score(
+            ['cooking'], ['cooking', 'cleaning'], {'cooking': 3, 'cleaning': 1}
+        )
+        self.assertEqual(score, 75)
+
+    def test_unweighted_skills_count_once(self):
+        score = SuggestionService.calculate_skills_score(['cleaning'], ['cooking', 'cleaning'], {'cooking': 3})
+        self.assertEqual(score, 25)
+
+    def test_zero_weights_cannot_be_missed(self):
+        score = SuggestionService.calculate_skills_score([], ['cooking'], {'cooking': 0})
+        self.assertEqual(score, 100)
+
+    def test_matrix_matches_per_pair(self):
+        rng = random.Random(3)
+        employees = [
+            {'languages': [], 'skills': rng.sample(SKILLS, rng.randint(0, 4))} for _ in range(20)
+        ]
+        vacancies = []
+        for _ in range(15):
+            skills = rng.sample(SKILLS, rng.randint(0, 4))
+            vacancies.append({
+                'languages': [],
+                'skills': skills,
+                'skill_weights': {skill: rng.randint(0, 10) for skill in skills},
+            })
+
+        scores = QuantitativeScorer(employees, vacancies).skills_scores()
+
+        for row, employee in enumerate(employees):
+            for col, vacancy in enumerate(vacancies):
+                expected = SuggestionService.calculate_skills_score(
+                    employee['skills'], vacancy['skills'], vacancy['skill_weights']
+                )
+                self.assertAlmostEqual(scores[row, col], expected, places=9)
+
+
+class FunctionSkillWeightsTests(SimpleTestCase):
+    def test_vectors(self):
+        weights = FunctionSkillWeights([(1, 10, 5), (1, 11, 0), (2, 10, 2)])
+
+        self.assertEqual(weights.weights(1, [10, 11, 12]), [5, 0, 1])
+        self.assertEqual(weights.weights(2, [10, 11]), [2, 1])
+        self.assertEqual(weights.weights(3, [10]), [1])
+        self.assertEqual(weights.weights(None, [10]), [1])
+
+
+@override_settings(SUGGESTIONS={**settings.SUGGESTIONS, 'FUNCTION_SKILL_WEIGHTS': True})
+class FunctionWeightedMatchingTests(TestCase):
+    def setUp(self):
+        self.cooking = Skill.objects.create(name='cooking')
+        self.cleaning = Skill.objects.create(name='cleaning')
+        self.function = Function.objects.create(name='Cook')
+        self.weight = FunctionSkill.objects.create(function=self.function, skill=self.cooking, weight=3)
+
+        company = Company.objects.create(name='Weighted Company')
+        self.vacancy = Vacancy.objects.create(company=company, title='Cook', function=self.function)
+        self.vacancy.skill.add(self.cooking, self.cleaning)
+
+        user = CustomUser.objects.create_user(
+            username='weighted@test.com',
+            email='weighted@test.com',
+            password='testpass123',
+            role='employee'
+        )
+        self.employee = Employee.objects.get(user=user)
+        self.employee.skill.add(self.cooking)
+
+    def test_index_uses_function_weights(self):
+        index = MatchIndex.build()
+
+        self.assertEqual(
+            index.vacancy_profile(self.vacancy.id)['skill_weights'],
+            {self.cooking.id: 3, self.cleaning.id: 1}
+        )
+        weights = WeightProfile.compile([
+            ('distance', None, 'quantitative', 0),
+            ('languages', None, 'quantitative', 0),
+            ('hard_skills', None, 'quantitative', 1),
+        ])
+        self.assertEqual(index.matches_for_employee(self.employee.id, weights), [(self.vacancy.id, 75)])
+
+    def test_function_skill_change_invalidates_weights(self):
+        cached = get_function_skill_weights()
+        updated_at = self.vacancy.updated_at
+
+        self.weight.weight = 1
+        self.weight.save()
+
+        self.assertIsNone(skill_weights._weights)
+        self.assertIsNot(get_function_skill_weights(), cached)
+        self.vacancy.refresh_from_db()
+        self.assertGreater(self.vacancy.updated_at, updated_at)
+
+    def test_m2m_change_invalidates_weights(self):
+        get_function_skill_weights()
+
+        self.function.skills.add(self.cleaning, through_defaults={'weight': 5})
+
+        self.assertIsNone(skill_weights._weights)
+        self.assertEqual(get_function_skill_weights().weights(self.function.id, [self.cleaning.id]), [5])
+
+    def test_clearing_a_skill_from_its_functions_touches_only_their_vacancies(self):
+        frying = Skill.objects.create(name='frying')
+        self.function.skills.add(frying, through_defaults={'weight': 2})
+        # Lists the skill itself, but its function does not weigh it
+        other = Vacancy.objects.create(company=self.vacancy.company, title='Fryer')
+        other.skill.add(frying)
+        updated_at = dict(Vacancy.objects.values_list('pk', 'updated_at'))
+
+        frying.functions.clear()
+
+        self.assertGreater(Vacancy.objects.get(pk=self.vacancy.pk).updated_at, updated_at[self.vacancy.pk])
+        self.assertEqual(Vacancy.objects.get(pk=other.pk).updated_at, updated_at[other.pk])
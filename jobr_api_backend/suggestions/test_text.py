@@ -0,0 +1,91 @@
+from unittest.mock import patch
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.conf import settings
+from accounts.models import CustomUser, Employee, Company
+from vacancies.models import Vacancy, VacancyDescription
+from .models import AISuggestion
+from .services import SuggestionService
+from .text import TextVectorizer, text_similarity, tokenize
+
+
+class TextSimilarityTests(SimpleTestCase):
+    def test_tokenize(self):
+        self.assertEqual(
+            tokenize('Ervaren kok, crème brûlée!'),
+            ['ervaren', 'kok', 'creme', 'brulee', 'ervaren kok', 'kok creme', 'creme brulee'],
+        )
+
+    def test_vectors_are_normalized(self):
+        vectors = TextVectorizer().fit_transform(['koken in een restaurant', '', 'bar en restaurant'])
+
+        norms = np.sqrt(np.asarray(vectors.multiply(vectors).sum(axis=1)).ravel())
+        np.testing.assert_allclose(norms, [1, 0, 1])
+
+    def test_similarity(self):
+        scores = text_similarity(
+            ['Chef in a busy Italian restaurant', 'Warehouse forklift driver', ''],
+            ['Chef for our Italian restaurant', 'Forklift driver in a warehouse', 'Chef'],
+        )
+
+        self.assertEqual(scores.shape, (3, 3))
+        self.assertTrue((scores >= 0).all() and (scores <= 100).all())
+        # Every profile reads most like its own kind of vacancy
+        self.assertEqual(scores[0].argmax(), 0)
+        self.assertEqual(scores[1].argmax(), 1)
+        self.assertLess(scores[0, 1], scores[0, 0] / 2)
+        self.assertFalse(scores[2].any())
+
+    def test_identical_texts_score_100(self):
+        scores = text_similarity(['Barista met ervaring'], ['Barista met ervaring'])
+
+        self.assertAlmostEqual(scores[0, 0], 100)
+
+
+@override_settings(SUGGESTIONS={**settings.SUGGESTIONS, 'LLM_CACHE': False})
+class TextStageTests(TestCase):
+    def setUp(self):
+        user = CustomUser.objects.create_user(
+            username='text@test.com',
+            email='text@test.com',
+            password='testpass123',
+            role='employee'
+        )
+        self.employee = Employee.objects.get(user=user)
+        self.employee.biography = 'Pizza chef with years of wood fired oven experience'
+        self.employee.save()
+
+        company = Company.objects.create(name='Text Company')
+        self.driver = Vacancy.objects.create(company=company, title='Driver', description='Delivery van driver')
+        self.chef = Vacancy.objects.create(company=company, title='Chef', description='Restaurant kitchen')
+        self.chef.descriptions.add(VacancyDescription.objects.create(description='Pizza chef for our wood fired oven'))
+
+    @override_settings(SUGGESTIONS={**settings.SUGGESTIONS, 'LLM_CACHE': False, 'TEXT_PROXY': True})
+    def test_text_proxy_replaces_llm(self):
+        with patch.object(SuggestionService, 'get_llm_score') as llm:
+            SuggestionService.generate_suggestions()
+
+        llm.assert_not_called()
+        chef = AISuggestion.objects.get(vacancy=self.chef)
+        driver = AISuggestion.objects.get(vacancy=self.driver)
+        self.assertGreater(chef.qualitative_score, 0)
+        self.assertEqual(driver.qualitative_score, 0)
+        self.assertIn('text similarity', chef.message)
+
+    @override_settings(SUGGESTIONS={
+        **settings.SUGGESTIONS,
+        'LLM_CACHE': False,
+        'CANDIDATES_PER_EMPLOYEE': 1,
+        'CANDIDATES_PER_VACANCY': None,
+        'TEXT_RANKING_WEIGHT': 1,
+    })
+    @patch.object(SuggestionService, 'get_llm_score', return_value=(50.0, 'Stub'))
+    def test_text_similarity_ranks_candidates(self, llm):
+        # Both vacancies score the same quantitatively, so the text decides
+        log = SuggestionService.generate_suggestions()
+
+        self.assertEqual(llm.call_count, 1)
+        self.assertEqual(list(AISuggestion.objects.values_list('vacancy', flat=True)), [self.chef.id])
+        self.assertEqual(log.pairs_pruned, 1)
+        self.assertIn('text', log.stage_seconds)
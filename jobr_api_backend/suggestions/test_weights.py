@@ -0,0 +1,161 @@
+import numpy as np
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from accounts.models import Company, CustomUser, Employee
+from vacancies.models import Vacancy
+from .models import AISuggestion, SuggestionWeight
+from .scoring import QuantitativeScorer
+from .services import SuggestionService
+from . import weights
+from .weights import COLUMNS, WeightProfile, clear_weight_profile, get_weight_profile
+
+
+def column(name):
+    return COLUMNS.index(name)
+
+
+class WeightProfileTests(SimpleTestCase):
+    def test_defaults(self):
+        profile = WeightProfile.compile([])
+
+        self.assertEqual(profile.weights_for(None).tolist(), [20, 20, 20, 50, 50])
+        self.assertEqual(profile.weights_for('Expert').tolist(), [20, 20, 20, 50, 50])
+
+    def test_legacy_names(self):
+        profile = WeightProfile.compile([
+            ('language', None, 'quantitative', 30),
+            ('skills', None, 'quantitative', 5),
+        ])
+
+        self.assertEqual(profile.weights_for(None)[column('languages')], 30)
+        self.assertEqual(profile.weights_for(None)[column('hard_skills')], 5)
+
+    def test_mastery_level_overrides_default(self):
+        profile = WeightProfile.compile([
+            ('distance', None, 'quantitative', 10),
+            ('distance', 'expert', 'quantitative', 1),
+        ])
+
+        self.assertEqual(profile.weights_for('Beginner')[column('distance')], 10)
+        self.assertEqual(profile.weights_for('Expert')[column('distance')], 1)
+        self.assertEqual(profile.weights_for('unknown')[column('distance')], 10)
+
+    def test_blend_sums_field_types(self):
+        profile = WeightProfile.compile([
+            ('distance', None, 'quantitative', 10),
+            ('hard_skills', None, 'quantitative', 30),
+            ('soft_skills', None, 'qualitative', 60),
+            ('soft_skills', 'advanced', 'qualitative', 0),
+            ('skills', 'expert', 'quantitative', 5),
+        ], blend=True)
+
+        self.assertEqual(profile.weights_for(None)[column('quantitative')], 40)
+        self.assertEqual(profile.weights_for(None)[column('qualitative')], 60)
+        self.assertEqual(profile.weights_for('advanced')[column('qualitative')], 0)
+        self.assertEqual(profile.weights_for('expert')[column('quantitative')], 15)
+
+    def test_blend_leaves_out_unscored_quantitative_fields(self):
+        profile = WeightProfile.compile([
+            ('availability', None, 'quantitative', 25),
+            ('functions', None, 'quantitative', 25),
+            ('distance', 'beginner', 'quantitative', 10),
+        ], blend=True)
+
+        # Neither field is computed by the scorer, so the split stays even
+        self.assertEqual(profile.weights_for(None)[column('quantitative')], 50)
+        self.assertEqual(profile.weights_for('beginner')[column('quantitative')], 10)
+
+    def test_blend_is_even_unless_enabled(self):
+        profile = WeightProfile.compile([
+            ('distance', None, 'quantitative', 10),
+            ('soft_skills', None, 'qualitative', 60),
+        ])
+
+        self.assertEqual(profile.weights_for(None)[[column('quantitative'), column('qualitative')]].tolist(), [50, 50])
+
+    def test_dict_round_trip(self):
+        profile = WeightProfile.compile([
+            ('languages', None, 'quantitative', 7),
+            ('distance', 'intermediate', 'qualitative', 3),
+        ])
+
+        data = profile.as_dict()
+
+        self.assertEqual(data['default']['languages'], 7)
+        self.assertEqual(data['intermediate']['distance'], 3)
+        np.testing.assert_array_equal(WeightProfile.from_dict(data).matrix, profile.matrix)
+        # Runs stored before the weights were compiled fall back to the defaults
+        np.testing.assert_array_equal(WeightProfile.from_dict({'language': 30}).matrix, WeightProfile.compile([]).matrix)
+
+    def test_scorer_applies_vacancy_mastery(self):
+        employees = [{'languages': [], 'skills': ['cooking']}]
+        vacancies = [
+            {'languages': [], 'skills': ['cooking', 'cleaning'], 'mastery': None},
+            {'languages': [], 'skills': ['cooking', 'cleaning'], 'mastery': 'Expert'},
+        ]
+        profile = WeightProfile.compile([
+            ('distance', None, 'quantitative', 0),
+            ('languages', None, 'quantitative', 0),
+            ('hard_skills', None, 'quantitative', 1),
+            ('languages', 'expert', 'quantitative', 1),
+        ])
+
+        scores = QuantitativeScorer(employees, vacancies).quantitative_scores(profile)
+
+        # Without languages the vacancy scores 100 on them, diluting the expert skills score
+        self.assertEqual(scores.tolist(), [[50, 75]])
+
+
+class WeightProfileCacheTests(TestCase):
+    def test_weight_change_invalidates_profile(self):
+        weight = SuggestionWeight.objects.create(name='distance', weight=10, field_type='quantitative')
+        cached = get_weight_profile()
+        self.assertEqual(cached.weights_for(None)[column('distance')], 10)
+
+        weight.weight = 5
+        weight.save()
+
+        self.assertIsNone(weights._profile)
+        self.assertEqual(get_weight_profile().weights_for(None)[column('distance')], 5)
+
+        weight.delete()
+
+        self.assertEqual(get_weight_profile().weights_for(None)[column('distance')], 20)
+
+
+@override_settings(SUGGESTIONS={**settings.SUGGESTIONS, 'LLM_BACKEND': 'suggestions.llm.StubBackend'})
+class TotalScoreTests(TestCase):
+    def setUp(self):
+        SuggestionWeight.objects.create(name='distance', weight=10, field_type='quantitative')
+        SuggestionWeight.objects.create(name='soft_skills', weight=60, field_type='qualitative')
+        company = Company.objects.create(name='Total Company')
+        for i in range(2):
+            CustomUser.objects.create_user(
+                username=f'total{i}@test.com',
+                email=f'total{i}@test.com',
+                password='testpass123',
+                role='employee'
+            )
+            Vacancy.objects.create(company=company, title=f'Vacancy {i}')
+
+    def tearDown(self):
+        clear_weight_profile()
+
+    def totals(self):
+        SuggestionService.generate_suggestions(full=True)
+        return list(AISuggestion.objects.values_list('quantitative_score', 'qualitative_score', 'total_score'))
+
+    def test_total_is_the_mean_of_both_scores(self):
+        rows = self.totals()
+
+        self.assertEqual(len(rows), 4)
+        for quantitative, qualitative, total in rows:
+            self.assertAlmostEqual(total, (quantitative + qualitative) / 2)
+
+    def test_configured_blend_weighs_both_scores(self):
+        with override_settings(SUGGESTIONS={**settings.SUGGESTIONS, 'BLEND_CONFIGURED_WEIGHTS': True}):
+            clear_weight_profile()
+            rows = self.totals()
+
+        for quantitative, qualitative, total in rows:
+            self.assertAlmostEqual(total, (quantitative * 10 + qualitative * 60) / 70)
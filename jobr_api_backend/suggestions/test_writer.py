@@ -0,0 +1,74 @@
+from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from accounts.models import CustomUser, Employee, Company
+from vacancies.models import Vacancy
+from .models import AISuggestion
+from .writer import SuggestionWriter
+
+
+class SuggestionWriterTests(TestCase):
+    def setUp(self):
+        user = CustomUser.objects.create_user(
+            username='writer@test.com',
+            email='writer@test.com',
+            password='testpass123',
+            role='employee'
+        )
+        self.employee = Employee.objects.get(user=user)
+        company = Company.objects.create(name='Writer Company')
+        self.vacancies = [
+            Vacancy.objects.create(company=company, title=f'Vacancy {i}')
+            for i in range(5)
+        ]
+
+    def write(self, writer, score):
+        for vacancy in self.vacancies:
+            writer.add(self.employee.id, vacancy.id, score, score, score, f'Score {score}')
+
+    def test_flushes_in_chunks(self):
+        with CaptureQueriesContext(connection) as queries:
+            with SuggestionWriter(chunk_size=2) as writer:
+                self.write(writer, 60)
+
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual((writer.created, writer.updated), (5, 0))
+        self.assertEqual(AISuggestion.objects.count(), 5)
+
+    def test_upserts_existing_rows_in_place(self):
+        with SuggestionWriter() as writer:
+            self.write(writer, 60)
+        ids = set(AISuggestion.objects.values_list('id', flat=True))
+
+        with SuggestionWriter() as writer:
+            self.write(writer, 80)
+
+        self.assertEqual((writer.created, writer.updated), (0, 5))
+        self.assertEqual(set(AISuggestion.objects.values_list('id', flat=True)), ids)
+        self.assertEqual(set(AISuggestion.objects.values_list('total_score', flat=True)), {80.0})
+        self.assertEqual(AISuggestion.objects.first().message, 'Score 80')
+
+    def test_flushes_buffer_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with SuggestionWriter(chunk_size=100) as writer:
+                self.write(writer, 60)
+                raise RuntimeError('LLM outage')
+
+        self.assertEqual(AISuggestion.objects.count(), 5)
+
+    def test_discards_in_one_statement(self):
+        with SuggestionWriter() as writer:
+            self.write(writer, 60)
+
+        with CaptureQueriesContext(connection) as queries:
+            with SuggestionWriter() as writer:
+                writer.discard(self.employee.id, [self.vacancies[0].id])
+                writer.discard(self.employee.id, [self.vacancies[1].id, self.vacancies[2].id])
+
+        deletes = [q for q in queries.captured_queries if q['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 1)
+        self.assertEqual(
+            set(AISuggestion.objects.values_list('vacancy_id', flat=True)),
+            {self.vacancies[3].id, self.vacancies[4].id}
+        )
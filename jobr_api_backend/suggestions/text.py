@@ -0,0 +1,98 @@
+import re
+import unicodedata
+import zlib
+from typing import List
+
+import numpy as np
+from scipy import sparse
+
+TOKEN_RE = re.compile(r'[a-z0-9]{2,}')
+
+# Feature space of the hashed n-grams; collisions are rare at this size
+N_FEATURES = 2 ** 20
+
+
+def tokenize(text: str) -> List[str]:
+    """Return the word unigrams and bigrams of a text, lowercased and without accents."""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode().lower()
+    words = TOKEN_RE.findall(text)
+    return words + [f'{first} {second}' for first, second in zip(words, words[1:])]
+
+
+def employee_text(employee) -> str:
+    return employee.biography or ''
+
+
+def vacancy_text(vacancy) -> str:
+    """Return the description of a vacancy with its generated descriptions."""
+    return '\n'.join(
+        [vacancy.description or ''] + [description.description for description in vacancy.descriptions.all()]
+    )
+
+
+class TextVectorizer:
+    """
+    TF-IDF vectors of hashed word n-grams.
+
+    N-grams are hashed into a fixed feature space, so there is no vocabulary
+    to build or store. Term frequencies are dampened logarithmically, weighed
+    by their inverse document frequency over all texts vectorized together
+    and normalized, so the product of two vectors is their cosine similarity.
+    """
+
+    def __init__(self, n_features: int = N_FEATURES):
+        self.n_features = n_features
+
+    def counts(self, texts: List[str]) -> sparse.csr_matrix:
+        rows, cols = [], []
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                rows.append(row)
+                # crc32 is stable across processes, unlike hash()
+                cols.append(zlib.crc32(token.encode()) % self.n_features)
+        counts = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)), shape=(len(texts), self.n_features)
+        )
+        counts.sum_duplicates()
+        return counts
+
+    def fit_transform(self, texts: List[str]) -> sparse.csr_matrix:
+        vectors = self.counts(texts)
+        vectors.data = 1 + np.log(vectors.data)
+
+        document_frequency = np.bincount(vectors.indices, minlength=self.n_features)
+        idf = np.log((1 + len(texts)) / (1 + document_frequency)) + 1
+        vectors = sparse.csr_matrix(vectors.multiply(idf))
+
+        norms = np.sqrt(np.asarray(vectors.multiply(vectors).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sparse.csr_matrix(sparse.diags(1 / norms) @ vectors)
+
+
+class TextSimilarity:
+    """
+    Text similarity of employees × vacancies, from 0 to 100, computed for
+    some employee rows at a time.
+
+    Both sides are vectorized together, so n-grams that appear in many
+    profiles and vacancies count for little.
+    """
+
+    def __init__(self, employee_texts: List[str], vacancy_texts: List[str]):
+        vectors = TextVectorizer().fit_transform(list(employee_texts) + list(vacancy_texts))
+        self.employees = vectors[:len(employee_texts)]
+        self.vacancies = vectors[len(employee_texts):].T.tocsr()
+
+    def scores(self, rows=None) -> np.ndarray:
+        """Return the similarity of the employees at ``rows``, a slice or array of positions, or of all."""
+        employees = self.employees if rows is None else self.employees[rows]
+        # Clip rounding errors of identical texts
+        return np.minimum((employees @ self.vacancies).toarray() * 100, 100)
+
+
+def text_similarity(employee_texts: List[str], vacancy_texts: List[str]) -> np.ndarray:
+    """
+    Return the text similarity of every employee × vacancy pair, from 0 to 100,
+    with one sparse matrix product; see ``TextSimilarity``.
+    """
+    return TextSimilarity(employee_texts, vacancy_texts).scores()
@@ -1,7 +1,16 @@
-from rest_framework import viewsets, permissions, mixins
+from django.core.cache import cache
+from rest_framework import viewsets, permissions, mixins, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
+from accounts.models import Employee
+from vacancies.models import Vacancy
+from .conf import get_setting
+from .feed import SuggestionFeedPagination, feed_cache_key, suggestions_for
+from .index import match_index
 from .models import AISuggestion
 from .serializers import AISuggestionSerializer
+from .weights import get_weight_profile
 
 
 class AISuggestionViewSet(mixins.ListModelMixin,
@@ -15,19 +24,74 @@ class AISuggestionViewSet(mixins.ListModelMixin,
     queryset = AISuggestion.objects.all()
     serializer_class = AISuggestionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = SuggestionFeedPagination
 
     def get_queryset(self):
         """
         Filter suggestions based on the user's role.
         """
-        user = self.request.user
-        queryset = AISuggestion.objects.all()
-
-        if user.role == 'employee':
-            return queryset.filter(employee__user=user)
-        elif user.role == 'employer':
-            return queryset.filter(vacancy__company__user=user)
-        elif user.is_staff:
-            return queryset
-        
-        return AISuggestion.objects.none()
+        return suggestions_for(self.request.user)
+
+    def get_feed(self) -> list:
+        """
+        Return the user's best ``FEED_SIZE`` suggestions, serialized and in
+        order, from the cache or else from the database.
+        """
+        key = feed_cache_key(self.request.user)
+        feed = cache.get(key)
+        if feed is None:
+            suggestions = self.get_queryset().order_by(*self.paginator.ordering)[:get_setting('FEED_SIZE')]
+            feed = [dict(row) for row in self.get_serializer(suggestions, many=True).data]
+            cache.set(key, feed, get_setting('FEED_CACHE_TIMEOUT'))
+        return feed
+
+    def list(self, request, *args, **kwargs):
+        """
+        List the user's suggestions best first, with keyset pagination.
+
+        Pages within the cached feed are served without querying the
+        suggestions; pages past it are read from the database, starting
+        right after the cursor.
+        """
+        paginator = self.paginator
+        position = paginator.decode_position(request)
+        feed = self.get_feed()
+        rows = feed if position is None else [row for row in feed if paginator.follows(row, position)]
+
+        # A feed shorter than FEED_SIZE holds every suggestion of the user
+        if len(rows) > paginator.get_page_size(request) or len(feed) < get_setting('FEED_SIZE'):
+            page = paginator.paginate_rows(rows, request)
+        else:
+            page = self.get_serializer(paginator.paginate_queryset(self.get_queryset(), request, self), many=True).data
+        return paginator.get_paginated_response(page)
+
+    @action(detail=False, methods=['get'])
+    def matches(self, request):
+        """
+        Return the vacancies that best match the requesting employee on skills
+        and languages, computed on demand from the in-memory match index.
+        """
+        employee = Employee.objects.filter(user=request.user).first()
+        if employee is None:
+            return Response(
+                {'error': 'Only employees can request matches'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), 100)
+        except ValueError:
+            return Response(
+                {'error': 'limit must be a number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        with match_index() as index:
+            matches = index.matches_for_employee(employee.id, get_weight_profile(), limit)
+        titles = dict(
+            Vacancy.objects.filter(id__in=[vacancy_id for vacancy_id, _ in matches]).values_list('id', 'title')
+        )
+        return Response([
+            {'vacancy': vacancy_id, 'title': titles.get(vacancy_id), 'quantitative_score': score}
+            for vacancy_id, score in matches
+        ])
@@ -0,0 +1,133 @@
+from threading import Lock
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from .conf import get_setting
+from .models import SuggestionWeight
+
+# Fields of the quantitative score, in the order of the compiled columns
+QUANTITATIVE_FIELDS = ('distance', 'languages', 'hard_skills')
+# Weights of the quantitative and the qualitative score in the total score
+BLEND_COLUMNS = ('quantitative', 'qualitative')
+COLUMNS = QUANTITATIVE_FIELDS + BLEND_COLUMNS
+
+# Vacancy mastery levels a weight can apply to; None is the default row
+MASTERY_LEVELS = (None,) + tuple(level for level, _ in SuggestionWeight.MASTERY_CHOICES)
+LEVEL_INDEX = {level: i for i, level in enumerate(MASTERY_LEVELS)}
+
+DEFAULT_FIELD_WEIGHT = 20
+DEFAULT_BLEND_WEIGHT = 50
+
+# Names looked up before the weights were compiled, mapped to the model's choices
+LEGACY_NAMES = {'language': 'languages', 'skills': 'hard_skills'}
+
+
+class WeightProfile:
+    """
+    ``SuggestionWeight`` configuration compiled into a matrix.
+
+    There is one row per vacancy mastery level and one column per field in
+    ``COLUMNS``. A weight with a ``mastery_level`` applies to vacancies
+    expecting that level and overrides the weight without one. The
+    quantitative and qualitative columns weigh the two halves of the total
+    score, evenly unless ``blend`` is set. Then the quantitative one sums
+    the configured quantitative weights of the ``QUANTITATIVE_FIELDS`` the
+    scorer computes; other fields marked quantitative are not scored and do
+    not shift the balance. The qualitative one sums the configured
+    qualitative weights, which the LLM score covers. Either falls back to
+    ``DEFAULT_BLEND_WEIGHT`` when none are configured.
+
+    Scorers pick the rows of their vacancies once and then weigh whole
+    score matrices, instead of looking weights up per pair.
+    """
+
+    def __init__(self, matrix: np.ndarray):
+        self.matrix = matrix
+
+    @classmethod
+    def compile(cls, rows: Iterable[tuple], blend: bool = False) -> 'WeightProfile':
+        """Compile (name, mastery_level, field_type, weight) rows."""
+        configured = {}
+        for name, mastery_level, field_type, weight in rows:
+            configured[(LEGACY_NAMES.get(name, name), mastery_level or None)] = (field_type, weight)
+
+        matrix = np.empty((len(MASTERY_LEVELS), len(COLUMNS)))
+        for i, level in enumerate(MASTERY_LEVELS):
+            applying = {}
+            for (name, mastery_level), value in configured.items():
+                if mastery_level == level or (mastery_level is None and (name, level) not in configured):
+                    applying[name] = value
+
+            for j, field in enumerate(QUANTITATIVE_FIELDS):
+                matrix[i, j] = applying[field][1] if field in applying else DEFAULT_FIELD_WEIGHT
+            matrix[i, len(QUANTITATIVE_FIELDS):] = DEFAULT_BLEND_WEIGHT
+            if not blend:
+                continue
+            summed = {
+                'quantitative': [
+                    applying[field][1] for field in QUANTITATIVE_FIELDS
+                    if field in applying and applying[field][0] == 'quantitative'
+                ],
+                'qualitative': [weight for kind, weight in applying.values() if kind == 'qualitative'],
+            }
+            for j, field_type in enumerate(BLEND_COLUMNS, start=len(QUANTITATIVE_FIELDS)):
+                matrix[i, j] = sum(summed[field_type]) if summed[field_type] else DEFAULT_BLEND_WEIGHT
+        return cls(matrix)
+
+    @classmethod
+    def load(cls) -> 'WeightProfile':
+        return cls.compile(
+            SuggestionWeight.objects.values_list('name', 'mastery_level', 'field_type', 'weight'),
+            blend=get_setting('BLEND_CONFIGURED_WEIGHTS'),
+        )
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """Return the compiled weights per mastery level, as stored on a generation run."""
+        return {
+            level or 'default': dict(zip(COLUMNS, map(float, row)))
+            for level, row in zip(MASTERY_LEVELS, self.matrix)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Dict[str, float]]) -> 'WeightProfile':
+        """Rebuild a profile from ``as_dict``; levels or fields it lacks get the defaults."""
+        matrix = cls.compile([]).matrix
+        for i, level in enumerate(MASTERY_LEVELS):
+            row = data.get(level or 'default')
+            if isinstance(row, dict):
+                for j, column in enumerate(COLUMNS):
+                    matrix[i, j] = row.get(column, matrix[i, j])
+        return cls(matrix)
+
+    @staticmethod
+    def level(mastery: Optional[str]) -> int:
+        """Return the row of a vacancy's expected mastery, the default row if it has none."""
+        return LEVEL_INDEX.get(mastery.lower() if mastery else None, 0)
+
+    def weights_for(self, mastery: Optional[str]) -> np.ndarray:
+        """Return the weights of a vacancy with the given expected mastery, in ``COLUMNS`` order."""
+        return self.matrix[self.level(mastery)]
+
+    def vacancy_weights(self, masteries: List[Optional[str]]) -> np.ndarray:
+        """Return the weights of many vacancies, one row per vacancy."""
+        return self.matrix[[self.level(mastery) for mastery in masteries]].reshape(len(masteries), len(COLUMNS))
+
+
+_profile = None
+_profile_lock = Lock()
+
+
+def get_weight_profile() -> WeightProfile:
+    """Return the process-wide compiled weights, compiling them on first use."""
+    global _profile
+    with _profile_lock:
+        if _profile is None:
+            _profile = WeightProfile.load()
+        return _profile
+
+
+def clear_weight_profile() -> None:
+    """Drop the compiled weights; called when SuggestionWeight rows change."""
+    global _profile
+    with _profile_lock:
+        _profile = None
@@ -0,0 +1,21 @@
+def run_shard_process(log_id: int, shard_index: int, shard_count: int) -> dict:
+    """
+    Entry point of a shard worker process started by
+    ``SuggestionService.run_shards_in_processes``.
+
+    Worker processes are spawned, so Django is set up here and the models are
+    imported afterwards. The process opens its own database connections and
+    closes them before handing its counts back to the coordinator.
+    """
+    import django
+    django.setup()
+
+    from django.db import connections
+    from .models import SuggestionGenerationLog
+    from .services import SuggestionService
+
+    try:
+        log = SuggestionGenerationLog.objects.get(pk=log_id)
+        return SuggestionService.run_shard(log, shard_index, shard_count)
+    finally:
+        connections.close_all()
@@ -0,0 +1,92 @@
+from typing import Callable
+
+from django.db.models import Q
+from .conf import get_setting
+from .models import AISuggestion
+
+
+class SuggestionWriter:
+    """
+    Buffered writer that upserts suggestions in chunks.
+
+    Results are collected in memory and written with one
+    ``bulk_create(update_conflicts=True)`` statement per chunk, keyed on the
+    unique (employee, vacancy) pair. Suggestions to remove are buffered too
+    and deleted in one statement per flush. Use it as a context manager so
+    the remaining buffer is flushed at the end of a run and when it fails.
+    ``on_flush`` is called after every flush, once the buffered changes are
+    in the database.
+    """
+    UPDATE_FIELDS = ['quantitative_score', 'qualitative_score', 'total_score', 'message', 'updated_at']
+
+    def __init__(self, chunk_size: int = None, on_flush: Callable[[], None] = None):
+        self.chunk_size = chunk_size or get_setting('WRITE_CHUNK_SIZE')
+        self.on_flush = on_flush
+        self.buffer = {}
+        self.discarded = {}
+        self.discarded_count = 0
+        self.created = 0
+        self.updated = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+    def add(self, employee_id: int, vacancy_id: int, quantitative_score: float,
+            qualitative_score: float, total_score: float, message: str) -> None:
+        # A later result for the same pair replaces the buffered one
+        self.buffer[(employee_id, vacancy_id)] = AISuggestion(
+            employee_id=employee_id,
+            vacancy_id=vacancy_id,
+            quantitative_score=quantitative_score,
+            qualitative_score=qualitative_score,
+            total_score=total_score,
+            message=message,
+        )
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def discard(self, employee_id: int, vacancy_ids) -> None:
+        """Remove the suggestions of an employee for the given vacancies, if any."""
+        vacancy_ids = list(vacancy_ids)
+        self.discarded.setdefault(employee_id, []).extend(vacancy_ids)
+        self.discarded_count += len(vacancy_ids)
+        if self.discarded_count >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        self.write()
+        if self.on_flush is not None:
+            self.on_flush()
+
+    def write(self) -> None:
+        if self.discarded:
+            condition = Q()
+            for employee_id, vacancy_ids in self.discarded.items():
+                condition |= Q(employee_id=employee_id, vacancy_id__in=vacancy_ids)
+            AISuggestion.objects.filter(condition).delete()
+            self.discarded = {}
+            self.discarded_count = 0
+
+        if not self.buffer:
+            return
+
+        # bulk_create cannot tell inserts from updates, so look them up first
+        employee_ids = {employee_id for employee_id, _ in self.buffer}
+        vacancy_ids = {vacancy_id for _, vacancy_id in self.buffer}
+        existing = set(
+            AISuggestion.objects.filter(employee_id__in=employee_ids, vacancy_id__in=vacancy_ids)
+            .values_list('employee_id', 'vacancy_id')
+        ) & self.buffer.keys()
+
+        AISuggestion.objects.bulk_create(
+            self.buffer.values(),
+            update_conflicts=True,
+            unique_fields=['employee', 'vacancy'],
+            update_fields=self.UPDATE_FIELDS,
+        )
+        self.updated += len(existing)
+        self.created += len(self.buffer) - len(existing)
+        self.buffer = {}
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.3 on 2026-10-17 09:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancies', '0028_add_liked_vacancy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacancy',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.3 on 2026-10-17 03:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0050_company_search_document'),
+        ('vacancies', '0029_vacancy_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['latitude', 'longitude'], name='vacancy_coordinates'),
+        ),
+    ]
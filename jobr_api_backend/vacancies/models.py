@@ -302,6 +302,13 @@ class Vacancy(models.Model):
     responsibilities = models.JSONField(default=list, blank=True, help_text="List of responsibilities for this vacancy")
     latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Bounding-box prefilter of distance searches
+            models.Index(fields=['latitude', 'longitude'], name='vacancy_coordinates'),
+        ]
 
     def __str__(self):
         return self.title if self.title else "Untitled Vacancy"
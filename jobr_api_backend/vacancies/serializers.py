@@ -455,6 +455,19 @@ class VacancySerializer(serializers.ModelSerializer):
         # Handle all relationships and save
         return self._handle_relationships(instance, validated_data)
 
+
+class VacancyDistanceSerializer(VacancySerializer):
+    """Vacancy with its distance in km from the origin of a distance search."""
+    distance = serializers.SerializerMethodField()
+
+    class Meta(VacancySerializer.Meta):
+        fields = VacancySerializer.Meta.fields + ["distance"]
+
+    def get_distance(self, obj):
+        distance = getattr(obj, 'distance', None)
+        return round(distance, 2) if distance is not None else None
+
+
 class ApplySerializer(serializers.ModelSerializer):
     # Write operations (when creating/updating applications)
     employee_id = serializers.PrimaryKeyRelatedField(
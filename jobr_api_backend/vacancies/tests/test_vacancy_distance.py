@@ -0,0 +1,72 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from accounts.models import Company, CustomUser, Employee, ProfileOption
+from ..models import Vacancy
+
+
+class VacancyDistanceTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = CustomUser.objects.create_user(
+            username='seeker',
+            email='seeker@example.com',
+            password='testpass123',
+            role=ProfileOption.EMPLOYEE
+        )
+        self.client.force_authenticate(user=self.user)
+
+        company = Company.objects.create(name='Distance Company')
+        # From Brussels: Leuven ~25 km, Antwerp ~41 km, Ostend ~110 km
+        for title, latitude, longitude in [
+            ('Antwerp', 51.2194, 4.4025),
+            ('Leuven', 50.8798, 4.7005),
+            ('Ostend', 51.2154, 2.9286),
+            ('Nowhere', None, None),
+        ]:
+            Vacancy.objects.create(company=company, title=title, latitude=latitude, longitude=longitude)
+
+    def search(self, **params):
+        response = self.client.get(reverse('vacancy-filter'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['results']
+
+    def test_radius_around_coordinates(self):
+        vacancies = self.search(latitude=50.8503, longitude=4.3517, max_distance=50, sort_by_distance=1)
+
+        self.assertEqual([vacancy['title'] for vacancy in vacancies], ['Leuven', 'Antwerp'])
+        self.assertAlmostEqual(vacancies[0]['distance'], 25, delta=1)
+        self.assertAlmostEqual(vacancies[1]['distance'], 41, delta=1)
+
+    def test_sort_around_employee_city(self):
+        employee = Employee.objects.get(user=self.user)
+        employee.city_name = 'Brussel'
+        employee.save()
+        self.client.force_authenticate(user=CustomUser.objects.get(pk=self.user.pk))
+
+        vacancies = self.search(sort_by_distance=1)
+        self.assertEqual([vacancy['title'] for vacancy in vacancies], ['Leuven', 'Antwerp', 'Ostend', 'Nowhere'])
+        self.assertIsNone(vacancies[-1]['distance'])
+
+    def test_without_origin(self):
+        vacancies = self.search(sort_by_distance='true')
+
+        self.assertEqual(len(vacancies), 4)
+        self.assertTrue(all(vacancy['distance'] is None for vacancy in vacancies))
+
+        for params in [{'max_distance': 50}, {'latitude': 'north', 'longitude': 4}]:
+            response = self.client.get(reverse('vacancy-filter'), params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_sort_by_distance_is_a_boolean(self):
+        origin = {'latitude': 51.2, 'longitude': 2.9, 'max_distance': 200}
+        nearest = [vacancy['title'] for vacancy in self.search(sort_by_distance='true', **origin)]
+        self.assertEqual(nearest, ['Ostend', 'Antwerp', 'Leuven'])
+
+        unsorted = [vacancy['title'] for vacancy in self.search(sort_by_distance='false', **origin)]
+        self.assertEqual(sorted(unsorted), sorted(nearest))
+        self.assertNotEqual(unsorted, nearest)
+
+        response = self.client.get(reverse('vacancy-filter'), {'sort_by_distance': 'nearest', **origin})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,80 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from accounts.models import Company, CustomUser, Employee, ProfileOption
+from ..models import ContractType, Function, Sector, Skill, Vacancy
+from ..views import VacancyFacetsView
+
+
+class VacancyFacetsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        user = CustomUser.objects.create_user(
+            username='seeker',
+            email='seeker@example.com',
+            password='testpass123',
+            role=ProfileOption.EMPLOYEE
+        )
+        self.client.force_authenticate(user=user)
+        self.user = user
+
+        company = Company.objects.create(name='Facet Company')
+        self.horeca = Sector.objects.create(name='Horeca')
+        self.cook = Function.objects.create(name='Cook')
+        self.cook.sectors.add(self.horeca)
+        self.cooking = Skill.objects.create(name='Cooking')
+        self.baking = Skill.objects.create(name='Baking')
+        self.part_time = ContractType.objects.create(name='Part-time')
+
+        first = Vacancy.objects.create(company=company, title='First', function=self.cook)
+        first.skill.add(self.cooking, self.baking)
+        first.contract_type.add(self.part_time)
+        second = Vacancy.objects.create(company=company, title='Second')
+        second.skill.add(self.baking)
+
+    def facets(self, **params):
+        response = self.client.get(reverse('vacancy-filter-facets'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_counts_per_facet_value(self):
+        data = self.facets()
+
+        self.assertEqual(data['total'], 2)
+        self.assertEqual(data['facets']['skills'], {self.cooking.pk: 1, self.baking.pk: 2})
+        self.assertEqual(data['facets']['contract_type'], {self.part_time.pk: 1})
+        self.assertEqual(data['facets']['function'], {self.cook.pk: 1})
+        self.assertEqual(data['facets']['sector'], {self.horeca.pk: 1})
+        self.assertEqual(data['facets']['languages'], {})
+
+    def test_counts_of_other_facets_are_filtered(self):
+        data = self.facets(skills=f'{self.cooking.pk}')
+
+        self.assertEqual(data['total'], 1)
+        # Picking baking as well would add the second vacancy
+        self.assertEqual(data['facets']['skills'], {self.cooking.pk: 1, self.baking.pk: 2})
+        self.assertEqual(data['facets']['function'], {self.cook.pk: 1})
+
+        data = self.facets(contract_type=self.part_time.pk)
+        self.assertEqual(data['facets']['skills'], {self.cooking.pk: 1, self.baking.pk: 1})
+
+    def test_origin_is_left_out_of_the_cache_key_without_a_distance_filter(self):
+        employee = Employee.objects.get(user=self.user)
+        employee.city_name = 'Brussel'
+        employee.save()
+        located = APIClient()
+        located.force_authenticate(user=CustomUser.objects.get(pk=self.user.pk))
+
+        self.facets()
+        with patch.object(VacancyFacetsView, 'count_matching', return_value=0) as count_matching:
+            response = located.get(reverse('vacancy-filter-facets'))
+            count_matching.assert_not_called()
+            self.assertEqual(response.data['total'], 2)
+
+            located.get(reverse('vacancy-filter-facets'), {'max_distance': 10})
+            count_matching.assert_called()
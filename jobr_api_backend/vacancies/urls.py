@@ -4,6 +4,7 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     VacancyViewSet,
     VacancyFilterView,
+    VacancyFacetsView,
     LocationViewSet,
     ContractTypeViewSet,
     FunctionViewSet,
@@ -49,6 +50,7 @@ urlpatterns = [
     
     # Additional endpoints
     path('filter/', VacancyFilterView.as_view(), name='vacancy-filter'),
+    path('filter/facets/', VacancyFacetsView.as_view(), name='vacancy-filter-facets'),
     path('suggestions/', AIVacancySuggestionsView.as_view(), name='vacancy-suggestions'),
     path('company/<int:company_id>/vacancies/', CompanyVacanciesView.as_view(), name='company-vacancies'),
     
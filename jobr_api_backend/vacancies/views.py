@@ -1,9 +1,13 @@
-from rest_framework import viewsets, generics, status
+from rest_framework import viewsets, generics, serializers, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import ValidationError, PermissionDenied
+from django.db.models import Count, F
 from accounts.models import ProfileOption
+from common.facets import cached_facets
+from common.geo import bounding_box, haversine_expression
 from common.pagination import NoLimitPagination
+from suggestions.realtime import enqueue_vacancy_scoring
 from .models import (
     Location, ContractType, Function, Language,
     Question, Skill, Vacancy, FunctionSkill,
@@ -15,7 +19,7 @@ from .serializers import (
     LocationSerializer, ContractTypeSerializer,
     FunctionSerializer, LanguageSerializer,
     QuestionSerializer, SkillSerializer,
-    VacancySerializer, FunctionSkillSerializer,
+    VacancySerializer, VacancyDistanceSerializer, FunctionSkillSerializer,
     SalaryBenefitSerializer, SectorSerializer,
     ApplySerializer, FavoriteVacancySerializer, LikedVacancySerializer,
     JobListingPromptSerializer, ProfileInterestSerializer,
@@ -170,6 +174,7 @@ class VacancyViewSet(viewsets.ModelViewSet):
             raise ValidationError("You can only update vacancies for your selected company")
 
         serializer.save()
+        enqueue_vacancy_scoring(serializer.instance.pk)
 
     def perform_create(self, serializer):
         """Set company when creating a vacancy."""
@@ -179,6 +184,7 @@ class VacancyViewSet(viewsets.ModelViewSet):
         if not user.selected_company:
             raise ValidationError("Please select a company before creating a vacancy")
         serializer.save(company=user.selected_company, created_by=user)
+        enqueue_vacancy_scoring(serializer.instance.pk)
 
 class JobListingPromptViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for viewing job listing prompts."""
@@ -188,88 +194,147 @@ class JobListingPromptViewSet(viewsets.ReadOnlyModelViewSet):
     pagination_class = None
 
 class VacancyFilterView(generics.ListAPIView):
-    """View for filtering and sorting vacancies."""
-    serializer_class = VacancySerializer
+    """
+    View for filtering and sorting vacancies.
+
+    With ``max_distance`` (km) only vacancies within that distance of the
+    origin are returned, and a true ``sort_by_distance`` sorts them nearest
+    first. The origin is the ``latitude`` and ``longitude`` parameters, or
+    the employee's city; ``max_distance`` without an origin is rejected.
+    Every vacancy carries its ``distance`` in km from the origin, or null.
+    """
+    serializer_class = VacancyDistanceSerializer
     permission_classes = [IsAuthenticated]
 
-    def get_queryset(self):
-        """Filter and sort vacancies based on query parameters."""
-        queryset = Vacancy.objects.all()
+    def get_filters(self):
+        """Return the filters in the query parameters, with unset ones as None or []."""
+        params = self.request.query_params
+
+        def id_list(name):
+            values = params.get(name)
+            return [value.strip() for value in values.split(',') if value.strip()] if values else []
+
+        filters = {
+            'date': params.get('date') or None,
+            'start_time': params.get('start_time') or None,
+            'end_time': params.get('end_time') or None,
+            'sector': params.get('sector') or None,
+            'contract_type': params.get('contract_type') or None,
+            'skills': id_list('skills'),
+            'languages': id_list('languages'),
+            'function': params.get('function') or None,
+            'min_salary': params.get('min_salary') or None,
+            'max_salary': params.get('max_salary') or None,
+            'origin': self.get_origin(),
+            'max_distance': self.get_max_distance(),
+        }
+        if filters['max_distance'] is not None and filters['origin'] is None:
+            # Leaving the filter out would return vacancies at any distance
+            raise ValidationError({
+                'max_distance': 'No origin to measure from: pass latitude and longitude, or set a known city.'
+            })
+        return filters
+
+    def get_origin(self):
+        """
+        Return the [latitude, longitude] distances are measured from: the
+        latitude and longitude parameters, else the employee's geocoded city.
+        """
+        params = self.request.query_params
+        if params.get('latitude') and params.get('longitude'):
+            try:
+                return [float(params['latitude']), float(params['longitude'])]
+            except ValueError:
+                raise ValidationError({'latitude': 'Expected coordinates.'})
+        employee = getattr(self.request.user, 'employee_profile', None)
+        if employee is not None and employee.latitude is not None and employee.longitude is not None:
+            return [float(employee.latitude), float(employee.longitude)]
+        return None
+
+    def get_max_distance(self):
+        max_distance = self.request.query_params.get('max_distance')
+        if not max_distance:
+            return None
+        try:
+            return float(max_distance)
+        except ValueError:
+            raise ValidationError({'max_distance': 'Expected a distance in km.'})
+
+    def get_sort_by_distance(self):
+        sort_by_distance = self.request.query_params.get('sort_by_distance')
+        if not sort_by_distance:
+            return False
+        try:
+            return serializers.BooleanField().to_internal_value(sort_by_distance)
+        except ValidationError:
+            raise ValidationError({'sort_by_distance': 'Expected true or false.'})
+
+    def filter_vacancies(self, queryset, filters, exclude=None):
+        """Apply the set filters, except the ``exclude`` one, to a vacancy queryset."""
+        if exclude:
+            filters = {**filters, exclude: None}
 
         # Filter by date
-        date = self.request.query_params.get('date', None)
-        if date:
-            queryset = queryset.filter(date_times__date=date)
+        if filters['date']:
+            queryset = queryset.filter(date_times__date=filters['date'])
 
         # Filter by time range
-        start_time = self.request.query_params.get('start_time', None)
-        end_time = self.request.query_params.get('end_time', None)
-        if start_time and end_time:
+        if filters['start_time'] and filters['end_time']:
             queryset = queryset.filter(
-                date_times__start_time__lte=end_time,
-                date_times__end_time__gte=start_time
+                date_times__start_time__lte=filters['end_time'],
+                date_times__end_time__gte=filters['start_time']
             )
 
         # Filter by sector
-        sector = self.request.query_params.get('sector', None)
-        if sector:
-            queryset = queryset.filter(function__sectors__id=sector)
+        if filters['sector']:
+            queryset = queryset.filter(function__sectors__id=filters['sector'])
 
         # Filter by contract type
-        contract_type = self.request.query_params.get('contract_type', None)
-        if contract_type:
-            queryset = queryset.filter(contract_type__id=contract_type)
+        if filters['contract_type']:
+            queryset = queryset.filter(contract_type__id=filters['contract_type'])
 
         # Filter by skills
+        if filters['skills']:
+            queryset = queryset.filter(skill__id__in=filters['skills'])
 
-        skills_str = self.request.query_params.get('skills')
-        if skills_str:
-            skills = [skill.strip() for skill in skills_str.split(',') if skill.strip()]
-            queryset = queryset.filter(skill__id__in=skills)
-
-        language_str = self.request.query_params.get('languages')
-        if language_str:
-            languages = [language.strip() for language in language_str.split(',') if language.strip()]
-            queryset = queryset.filter(languages__language__id__in=languages)
+        if filters['languages']:
+            queryset = queryset.filter(languages__language__id__in=filters['languages'])
 
         # Filter by function
-        function = self.request.query_params.get('function', None)
-        if function:
-            queryset = queryset.filter(function_id=function)
+        if filters['function']:
+            queryset = queryset.filter(function_id=filters['function'])
 
         # Filter by salary range
-        min_salary = self.request.query_params.get('min_salary', None)
-        max_salary = self.request.query_params.get('max_salary', None)
-        if min_salary:
-            queryset = queryset.filter(salary__gte=float(min_salary))
-        if max_salary:
-            queryset = queryset.filter(salary__lte=float(max_salary))
-
-        # Filter by distance if user has location
-        # if hasattr(self.request.user, 'employee_profile'):
-        #     employee = self.request.user.employee_profile
-        #     # Get employee's location from their address
-        #     address = employee.address if hasattr(employee, 'address') else None
-        #     if address and address.latitude and address.longitude:
-        #         max_distance = float(self.request.query_params.get('max_distance', 50))  # Default 50km
-        #         queryset = queryset.filter(
-        #             company__address__latitude__isnull=False,
-        #             company__address__longitude__isnull=False
-        #         ).extra(
-        #             where=[
-        #                 """
-        #                 ST_Distance_Sphere(
-        #                     point(company_address.longitude, company_address.latitude),
-        #                     point(%s, %s)
-        #                 ) <= %s * 1000
-        #                 """
-        #             ],
-        #             params=[address.longitude, address.latitude, max_distance]
-        #         )
-
-        # Sort by salary
+        if filters['min_salary']:
+            queryset = queryset.filter(salary__gte=float(filters['min_salary']))
+        if filters['max_salary']:
+            queryset = queryset.filter(salary__lte=float(filters['max_salary']))
+
+        # Filter by distance, narrowing the rows on the indexed coordinates
+        # before the exact distances are computed
+        if filters['origin']:
+            latitude, longitude = filters['origin']
+            if filters['max_distance']:
+                min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, filters['max_distance'])
+                queryset = queryset.filter(
+                    latitude__range=(min_lat, max_lat),
+                    longitude__range=(min_lon, max_lon),
+                )
+            queryset = queryset.annotate(distance=haversine_expression(latitude, longitude))
+            if filters['max_distance']:
+                queryset = queryset.filter(distance__lte=filters['max_distance'])
+        return queryset
+
+    def get_queryset(self):
+        """Filter and sort vacancies based on query parameters."""
+        filters = self.get_filters()
+        queryset = self.filter_vacancies(Vacancy.objects.all(), filters)
+
+        # Sort by distance, vacancies without coordinates last, or by salary
         sort_by_salary = self.request.query_params.get('sort_by_salary', None)
-        if sort_by_salary:
+        if self.get_sort_by_distance() and filters['origin']:
+            queryset = queryset.order_by(F('distance').asc(nulls_last=True), 'id')
+        elif sort_by_salary:
             if sort_by_salary.lower() == 'desc':
                 queryset = queryset.order_by('-salary')
             else:
@@ -277,6 +342,56 @@ class VacancyFilterView(generics.ListAPIView):
 
         return queryset.distinct()
 
+class VacancyFacetsView(VacancyFilterView):
+    """
+    Count the vacancies matching the filters of VacancyFilterView per
+    skill, language, contract type, function and sector, with one grouped
+    query per facet.
+
+    The counts of a facet leave out the facet's own filter, so they tell
+    how many vacancies an option would add or keep when picked.
+    """
+    pagination_class = None
+    FACETS = {
+        'skills': 'skill',
+        'languages': 'languages__language',
+        'contract_type': 'contract_type',
+        'function': 'function',
+        'sector': 'function__sectors',
+    }
+
+    def count_matching(self, filters, exclude=None, field=None):
+        """Count the matching vacancies, in total or per value of ``field``."""
+        matching = Vacancy.objects.filter(
+            pk__in=self.filter_vacancies(Vacancy.objects.all(), filters, exclude).values('pk')
+        )
+        if field is None:
+            return matching.count()
+        return dict(
+            matching.filter(**{f'{field}__isnull': False})
+            .order_by()
+            .values(field)
+            .annotate(count=Count('pk', distinct=True))
+            .values_list(field, 'count')
+        )
+
+    def get(self, request, *args, **kwargs):
+        filters = self.get_filters()
+
+        def compute():
+            return {
+                'total': self.count_matching(filters),
+                'facets': {
+                    name: self.count_matching(filters, name, field) for name, field in self.FACETS.items()
+                },
+            }
+
+        # Without a distance filter the origin does not change the counts, and
+        # would give every employee a cache entry of their own
+        signature = filters if filters['max_distance'] else {**filters, 'origin': None}
+        return Response(cached_facets('vacancies', signature, compute))
+
+
 class ExperienceCompanyViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = ExperienceCompanySerializer
     permission_classes = [IsAuthenticated]